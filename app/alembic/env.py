@@ -14,6 +14,7 @@ from app.auth.models import Base
 from app.core.models import Base
 
 from app.config import settings
+from app.core.utils.partitions import is_partition
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -39,6 +40,16 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Yearly partitions are created by migrations and at runtime, the models only know their parents.
+    # Postgres also clones a foreign key to a partitioned table once for every partition it refers to.
+    if reflected and type_ == "table":
+        return not is_partition(name)
+    if reflected and type_ == "foreign_key_constraint":
+        return not is_partition(object.referred_table.name)
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -57,6 +68,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -77,7 +89,7 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,228 @@
+"""partition rounds and matches by draft date
+
+Revision ID: 14a276ef7bec
+Revises: ea5dbfaebe12
+Create Date: 2026-10-19 00:46:44.240917
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+BATCH_SIZE = 50_000
+# Yearly partitions are created up to this many years ahead, like the app's PARTITIONS_AHEAD_YEARS
+AHEAD_YEARS = 1
+
+# revision identifiers, used by Alembic.
+revision: str = '14a276ef7bec'
+down_revision: Union[str, None] = 'ea5dbfaebe12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ROUND_COLUMNS = ['id', 'number', 'draft_id', 'created_at', 'updated_at']
+MATCH_COLUMNS = [
+    'id', 'player_1_id', 'player_2_id', 'score', 'round_id', 'draft_id', 'created_at', 'updated_at', 'version'
+]
+
+
+def create_partitioned_tables(first_year: int, last_year: int) -> None:
+    """rounds_partitioned and matches_partitioned, swapped in once they caught up with the live tables."""
+    op.execute(
+        "CREATE TABLE rounds_partitioned ("
+        "id integer NOT NULL DEFAULT nextval('rounds_id_seq'::regclass), "
+        "number integer NOT NULL, "
+        "draft_id integer NOT NULL, "
+        "draft_date date NOT NULL, "
+        "created_at timestamp NOT NULL, "
+        "updated_at timestamp NOT NULL, "
+        "CONSTRAINT rounds_partitioned_pkey PRIMARY KEY (id, draft_date), "
+        "CONSTRAINT rounds_draft_id_fkey FOREIGN KEY (draft_id) REFERENCES drafts (id) ON DELETE CASCADE"
+        ") PARTITION BY RANGE (draft_date)"
+    )
+    op.execute(
+        "CREATE TABLE matches_partitioned ("
+        "id integer NOT NULL DEFAULT nextval('matches_id_seq'::regclass), "
+        "player_1_id integer NOT NULL, "
+        "player_2_id integer NOT NULL, "
+        "score varchar, "
+        "round_id integer NOT NULL, "
+        "draft_id integer NOT NULL, "
+        "draft_date date NOT NULL, "
+        "created_at timestamp NOT NULL, "
+        "updated_at timestamp NOT NULL, "
+        "version integer NOT NULL DEFAULT 1, "
+        "CONSTRAINT matches_partitioned_pkey PRIMARY KEY (id, draft_date), "
+        "CONSTRAINT check_different_players CHECK (player_1_id <> player_2_id), "
+        "CONSTRAINT matches_player_1_id_fkey FOREIGN KEY (player_1_id) REFERENCES players (id), "
+        "CONSTRAINT matches_player_2_id_fkey FOREIGN KEY (player_2_id) REFERENCES players (id), "
+        "CONSTRAINT matches_draft_id_fkey FOREIGN KEY (draft_id) REFERENCES drafts (id) ON DELETE CASCADE, "
+        "CONSTRAINT matches_round_id_fkey FOREIGN KEY (round_id, draft_date) "
+        "REFERENCES rounds_partitioned (id, draft_date) ON DELETE CASCADE"
+        ") PARTITION BY RANGE (draft_date)"
+    )
+    for table in ('rounds', 'matches'):
+        for year in range(first_year, last_year + 1):
+            op.execute(
+                f"CREATE TABLE {table}_y{year} PARTITION OF {table}_partitioned "
+                f"FOR VALUES FROM ('{date(year, 1, 1)}') TO ('{date(year + 1, 1, 1)}')"
+            )
+        # Drafts dated beyond the created years land here until their partition exists
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table}_partitioned DEFAULT")
+
+    # Temporary names, the live tables' indexes still hold the final ones
+    op.create_index('ix_rounds_partitioned_id', 'rounds_partitioned', ['id'])
+    op.create_index(
+        'ix_rounds_partitioned_draft_id', 'rounds_partitioned', ['draft_id'], postgresql_include=['updated_at']
+    )
+    op.create_index('ix_matches_partitioned_id', 'matches_partitioned', ['id'])
+    op.create_index('ix_matches_partitioned_player_1_id', 'matches_partitioned', ['player_1_id'])
+    op.create_index('ix_matches_partitioned_player_2_id', 'matches_partitioned', ['player_2_id'])
+    op.create_index(
+        'ix_matches_partitioned_round_id', 'matches_partitioned', ['round_id'], postgresql_include=['updated_at']
+    )
+    op.create_index(
+        'ix_matches_partitioned_draft_id', 'matches_partitioned', ['draft_id'], postgresql_include=['updated_at']
+    )
+
+
+def create_mirror_trigger(table: str, columns: Sequence[str]) -> None:
+    """Replay writes to `table` on its partitioned copy, with the draft's date looked up on the way."""
+    listed = ', '.join(columns)
+    new_values = ', '.join(f'NEW.{column}' for column in columns)
+    updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in columns if column != 'id')
+    op.execute(
+        f"CREATE FUNCTION {table}_mirror() RETURNS trigger LANGUAGE plpgsql AS $$ "
+        f"BEGIN "
+        f"IF TG_OP = 'DELETE' THEN "
+        f"DELETE FROM {table}_partitioned WHERE id = OLD.id; "
+        f"ELSE "
+        f"INSERT INTO {table}_partitioned ({listed}, draft_date) "
+        f"SELECT {new_values}, drafts.date FROM drafts WHERE drafts.id = NEW.draft_id "
+        f"ON CONFLICT (id, draft_date) DO UPDATE SET {updates}; "
+        f"END IF; "
+        f"RETURN NULL; "
+        f"END $$"
+    )
+    op.execute(
+        f"CREATE TRIGGER {table}_mirror AFTER INSERT OR UPDATE OR DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION {table}_mirror()"
+    )
+
+
+def backfill(connection: sa.engine.Connection, table: str, columns: Sequence[str]) -> None:
+    """
+    Copy `table` into its partitioned copy in id ranges, every batch is committed on its own. Rows
+    the trigger already copied are skipped, FOR SHARE keeps a batch's rows from changing under it.
+    """
+    min_id, max_id = connection.execute(sa.text(f"SELECT min(id), max(id) FROM {table}")).one()
+    if min_id is None:
+        return
+    listed = ', '.join(columns)
+    selected = ', '.join(f'source.{column}' for column in columns)
+    for start in range(min_id, max_id + 1, BATCH_SIZE):
+        connection.execute(
+            sa.text(
+                f"INSERT INTO {table}_partitioned ({listed}, draft_date) "
+                f"SELECT {selected}, drafts.date FROM {table} AS source "
+                f"JOIN drafts ON drafts.id = source.draft_id "
+                f"WHERE source.id >= :start AND source.id < :stop "
+                f"FOR SHARE OF source "
+                f"ON CONFLICT DO NOTHING"
+            ),
+            {"start": start, "stop": start + BATCH_SIZE},
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    connection = op.get_bind()
+    this_year = date.today().year
+    first_year = connection.execute(sa.text("SELECT extract(year FROM min(date))::int FROM drafts")).scalar()
+    create_partitioned_tables(min(first_year or this_year, this_year), this_year + AHEAD_YEARS)
+    create_mirror_trigger('rounds', ROUND_COLUMNS)
+
+    # Short transactions keep row locks brief on the live tables. Every round is copied before
+    # matches are, so the matches trigger and backfill always find the round they reference.
+    with op.get_context().autocommit_block():
+        backfill(connection, 'rounds', ROUND_COLUMNS)
+        create_mirror_trigger('matches', MATCH_COLUMNS)
+        backfill(connection, 'matches', MATCH_COLUMNS)
+
+    # The copies are complete and kept in sync, the swap only holds the locks for a few renames
+    op.execute("LOCK TABLE rounds, matches IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER SEQUENCE rounds_id_seq OWNED BY rounds_partitioned.id")
+    op.execute("ALTER SEQUENCE matches_id_seq OWNED BY matches_partitioned.id")
+    op.execute("DROP TABLE matches")
+    op.execute("DROP TABLE rounds")
+    op.execute("DROP FUNCTION rounds_mirror(), matches_mirror()")
+    for table, columns in (
+        ('rounds', ['id', 'draft_id']),
+        ('matches', ['id', 'player_1_id', 'player_2_id', 'round_id', 'draft_id']),
+    ):
+        op.execute(f"ALTER TABLE {table}_partitioned RENAME TO {table}")
+        op.execute(f"ALTER INDEX {table}_partitioned_pkey RENAME TO {table}_pkey")
+        for column in columns:
+            op.execute(f"ALTER INDEX ix_{table}_partitioned_{column} RENAME TO ix_{table}_{column}")
+    # The copies have no statistics yet, the planner would guess until autovacuum analyzes them
+    op.execute("ANALYZE rounds, matches")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Copied back in one transaction, writes wait for it
+    op.execute("LOCK TABLE rounds, matches IN ACCESS EXCLUSIVE MODE")
+    op.execute(
+        "CREATE TABLE rounds_plain ("
+        "id integer NOT NULL DEFAULT nextval('rounds_id_seq'::regclass), "
+        "number integer NOT NULL, "
+        "draft_id integer NOT NULL, "
+        "created_at timestamp NOT NULL, "
+        "updated_at timestamp NOT NULL, "
+        "CONSTRAINT rounds_plain_pkey PRIMARY KEY (id), "
+        "CONSTRAINT rounds_draft_id_fkey FOREIGN KEY (draft_id) REFERENCES drafts (id) ON DELETE CASCADE"
+        ")"
+    )
+    op.execute(
+        "CREATE TABLE matches_plain ("
+        "id integer NOT NULL DEFAULT nextval('matches_id_seq'::regclass), "
+        "player_1_id integer NOT NULL, "
+        "player_2_id integer NOT NULL, "
+        "created_at timestamp NOT NULL, "
+        "updated_at timestamp NOT NULL, "
+        "score varchar, "
+        "round_id integer NOT NULL, "
+        "draft_id integer NOT NULL, "
+        "version integer NOT NULL DEFAULT 1, "
+        "CONSTRAINT matches_plain_pkey PRIMARY KEY (id), "
+        "CONSTRAINT check_different_players CHECK (player_1_id <> player_2_id), "
+        "CONSTRAINT matches_player_1_id_fkey FOREIGN KEY (player_1_id) REFERENCES players (id), "
+        "CONSTRAINT matches_player_2_id_fkey FOREIGN KEY (player_2_id) REFERENCES players (id), "
+        "CONSTRAINT matches_draft_id_fkey FOREIGN KEY (draft_id) REFERENCES drafts (id) ON DELETE CASCADE, "
+        "CONSTRAINT matches_round_id_fkey FOREIGN KEY (round_id) REFERENCES rounds_plain (id) ON DELETE CASCADE"
+        ")"
+    )
+    op.execute(f"INSERT INTO rounds_plain ({', '.join(ROUND_COLUMNS)}) SELECT {', '.join(ROUND_COLUMNS)} FROM rounds")
+    op.execute(
+        f"INSERT INTO matches_plain ({', '.join(MATCH_COLUMNS)}) SELECT {', '.join(MATCH_COLUMNS)} FROM matches"
+    )
+    op.execute("ALTER SEQUENCE rounds_id_seq OWNED BY rounds_plain.id")
+    op.execute("ALTER SEQUENCE matches_id_seq OWNED BY matches_plain.id")
+    # Dropping the partitioned tables drops their partitions
+    op.execute("DROP TABLE matches")
+    op.execute("DROP TABLE rounds")
+    for table, columns in (
+        ('rounds', ['id', 'draft_id']),
+        ('matches', ['id', 'player_1_id', 'player_2_id', 'round_id', 'draft_id']),
+    ):
+        op.execute(f"ALTER TABLE {table}_plain RENAME TO {table}")
+        op.execute(f"ALTER INDEX {table}_plain_pkey RENAME TO {table}_pkey")
+        op.create_index(f'ix_{table}_id', table, ['id'])
+    op.create_index('ix_rounds_draft_id', 'rounds', ['draft_id'], postgresql_include=['updated_at'])
+    op.create_index('ix_matches_player_1_id', 'matches', ['player_1_id'])
+    op.create_index('ix_matches_player_2_id', 'matches', ['player_2_id'])
+    op.create_index('ix_matches_round_id', 'matches', ['round_id'], postgresql_include=['updated_at'])
+    op.create_index('ix_matches_draft_id', 'matches', ['draft_id'], postgresql_include=['updated_at'])
@@ -0,0 +1,72 @@
+"""add matches draft_id
+
+Revision ID: 415e01e09d20
+Revises: 50f6961bc8d9
+Create Date: 2026-10-19 00:12:37.841763
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+BATCH_SIZE = 50_000
+
+# revision identifiers, used by Alembic.
+revision: str = '415e01e09d20'
+down_revision: Union[str, None] = '50f6961bc8d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def backfill(connection: sa.engine.Connection) -> None:
+    """Copy rounds.draft_id onto matches in id ranges, every batch is committed on its own."""
+    min_id, max_id = connection.execute(sa.text("SELECT min(id), max(id) FROM matches")).one()
+    if min_id is None:
+        return
+    for start in range(min_id, max_id + 1, BATCH_SIZE):
+        connection.execute(
+            sa.text(
+                "UPDATE matches SET draft_id = rounds.draft_id FROM rounds "
+                "WHERE rounds.id = matches.round_id AND matches.draft_id IS NULL "
+                "AND matches.id >= :start AND matches.id < :stop"
+            ),
+            {"start": start, "stop": start + BATCH_SIZE},
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('matches', sa.Column('draft_id', sa.Integer(), nullable=True))
+
+    # Short transactions keep row locks brief on a live table
+    with op.get_context().autocommit_block():
+        backfill(op.get_bind())
+        op.create_index(
+            'ix_matches_draft_id', 'matches', ['draft_id'], unique=False, postgresql_include=['updated_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+    # Catch rows inserted by the old code during the backfill
+    op.execute(
+        "UPDATE matches SET draft_id = rounds.draft_id FROM rounds "
+        "WHERE rounds.id = matches.round_id AND matches.draft_id IS NULL"
+    )
+    op.create_foreign_key('matches_draft_id_fkey', 'matches', 'drafts', ['draft_id'], ['id'], postgresql_not_valid=True)
+    # A validated CHECK lets SET NOT NULL skip its own full table scan
+    op.execute("ALTER TABLE matches ADD CONSTRAINT matches_draft_id_not_null CHECK (draft_id IS NOT NULL) NOT VALID")
+    # Committing the NOT VALID constraints releases the ALTERs' ACCESS EXCLUSIVE lock. Each VALIDATE then
+    # runs in its own transaction and only takes SHARE UPDATE EXCLUSIVE, so writes go on while it scans.
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE matches VALIDATE CONSTRAINT matches_draft_id_fkey")
+        op.execute("ALTER TABLE matches VALIDATE CONSTRAINT matches_draft_id_not_null")
+    op.alter_column('matches', 'draft_id', nullable=False)
+    op.drop_constraint('matches_draft_id_not_null', 'matches', type_='check')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('matches_draft_id_fkey', 'matches', type_='foreignkey')
+    op.drop_index('ix_matches_draft_id', table_name='matches', postgresql_include=['updated_at'])
+    op.drop_column('matches', 'draft_id')
@@ -0,0 +1,38 @@
+"""add league members
+
+Revision ID: 429433c7dc5f
+Revises: d6db8f678110
+Create Date: 2026-10-19 15:10:23.904518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '429433c7dc5f'
+down_revision: Union[str, None] = 'd6db8f678110'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'league_members',
+        sa.Column('league_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['league_id'], ['leagues.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('league_id', 'user_id'),
+    )
+    # Every active user could write before, the existing ones keep writing in the default league
+    op.execute("INSERT INTO league_members (league_id, user_id, created_at) SELECT 1, id, now() FROM users")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('league_members')
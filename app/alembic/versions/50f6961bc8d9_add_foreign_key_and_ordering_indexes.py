@@ -0,0 +1,61 @@
+"""add foreign key and ordering indexes
+
+Revision ID: 50f6961bc8d9
+Revises: d3f4a49b195f
+Create Date: 2026-10-19 00:09:47.241389
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '50f6961bc8d9'
+down_revision: Union[str, None] = 'd3f4a49b195f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tables writable while the indexes build, it can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_draft_players_player_id', 'draft_players', ['player_id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_drafts_date_id', 'drafts', ['date', 'id'], unique=False, postgresql_include=['updated_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_matches_player_1_id', 'matches', ['player_1_id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_matches_player_2_id', 'matches', ['player_2_id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_matches_round_id', 'matches', ['round_id'], unique=False, postgresql_include=['updated_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_rounds_draft_id', 'rounds', ['draft_id'], unique=False, postgresql_include=['updated_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_rounds_draft_id', table_name='rounds', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_matches_round_id', table_name='matches', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_matches_player_2_id', table_name='matches', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_matches_player_1_id', table_name='matches', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_drafts_date_id', table_name='drafts', postgresql_concurrently=True, if_exists=True)
+        op.drop_index(
+            'ix_draft_players_player_id', table_name='draft_players', postgresql_concurrently=True, if_exists=True
+        )
@@ -0,0 +1,95 @@
+"""add sync tombstones and updated_at indexes
+
+Revision ID: 5ee710a4cc96
+Revises: 14a276ef7bec
+Create Date: 2026-10-19 01:11:55.819717
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5ee710a4cc96'
+down_revision: Union[str, None] = '14a276ef7bec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# GET /sync reads the rows changed since a timestamp from each of these
+PLAIN_TABLES = ['drafts', 'players', 'draft_players']
+PARTITIONED_TABLES = ['rounds', 'matches']
+# Deletes of these are recorded, their children are only ever deleted with their draft
+TOMBSTONED_TABLES = ['drafts', 'players']
+
+
+def partitions(table: str) -> list[str]:
+    result = op.get_bind().execute(
+        sa.text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table) ORDER BY 1"),
+        {'table': table},
+    )
+    return list(result.scalars())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tombstones_deleted_at', 'tombstones', ['deleted_at'], unique=False)
+    # Statement level with a transition table, a bulk delete inserts its tombstones in one go. Archiving
+    # sets draft_mtg.archiving, archived drafts can still be read and aren't deleted for clients.
+    op.execute(
+        "CREATE FUNCTION record_tombstones() RETURNS trigger LANGUAGE plpgsql AS $$ "
+        "BEGIN "
+        "IF current_setting('draft_mtg.archiving', true) IS DISTINCT FROM 'on' THEN "
+        "INSERT INTO tombstones (table_name, row_id) SELECT TG_TABLE_NAME, id FROM deleted_rows; "
+        "END IF; "
+        "RETURN NULL; "
+        "END $$"
+    )
+    for table in TOMBSTONED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_tombstones AFTER DELETE ON {table} "
+            "REFERENCING OLD TABLE AS deleted_rows FOR EACH STATEMENT EXECUTE FUNCTION record_tombstones()"
+        )
+
+    # CONCURRENTLY keeps the tables writable while the indexes build, it can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for table in PLAIN_TABLES:
+            op.create_index(
+                f'ix_{table}_updated_at', table, ['updated_at'], unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+        # Partitioned tables can't build an index concurrently: create it invalid on the parent only,
+        # build it concurrently on every partition and attach those, which makes the parent's valid
+        for table in PARTITIONED_TABLES:
+            op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON ONLY {table} (updated_at)")
+            for partition in partitions(table):
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{partition}_updated_at ON {partition} (updated_at)"
+                )
+                op.execute(f"ALTER INDEX ix_{table}_updated_at ATTACH PARTITION ix_{partition}_updated_at")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in reversed(PARTITIONED_TABLES):
+            # Drops the partitions' indexes with it
+            op.drop_index(f'ix_{table}_updated_at', table_name=table, if_exists=True)
+        for table in reversed(PLAIN_TABLES):
+            op.drop_index(f'ix_{table}_updated_at', table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    for table in reversed(TOMBSTONED_TABLES):
+        op.execute(f"DROP TRIGGER {table}_tombstones ON {table}")
+    op.execute("DROP FUNCTION record_tombstones()")
+    op.drop_index('ix_tombstones_deleted_at', table_name='tombstones')
+    op.drop_table('tombstones')
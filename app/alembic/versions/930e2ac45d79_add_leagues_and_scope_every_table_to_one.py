@@ -0,0 +1,156 @@
+"""add leagues and scope every table to one
+
+Revision ID: 930e2ac45d79
+Revises: 5ee710a4cc96
+Create Date: 2026-10-19 01:21:31.572487
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '930e2ac45d79'
+down_revision: Union[str, None] = '5ee710a4cc96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SCOPED_TABLES = ['players', 'drafts', 'draft_players', 'rounds', 'matches', 'tombstones']
+# The leagues' own rows, the other tables copy league_id from their draft
+LEAGUE_TABLES = ['players', 'drafts']
+PARTITIONED_TABLES = ['rounds', 'matches']
+# Indexes of the plain tables as (name, table, columns, unique, include), each replaced by one leading with league_id
+OLD_INDEXES = [
+    ('ix_players_name', 'players', ['name'], True, []),
+    ('ix_players_updated_at', 'players', ['updated_at'], False, []),
+    ('ix_drafts_name', 'drafts', ['name'], True, []),
+    ('ix_drafts_date_id', 'drafts', ['date', 'id'], False, ['updated_at']),
+    ('ix_drafts_updated_at', 'drafts', ['updated_at'], False, []),
+    ('ix_draft_players_updated_at', 'draft_players', ['updated_at'], False, []),
+]
+NEW_INDEXES = [
+    ('ix_players_league_id_name', 'players', ['league_id', 'name'], True, []),
+    ('ix_players_league_id_id', 'players', ['league_id', 'id'], True, ['updated_at']),
+    ('ix_players_league_id_updated_at', 'players', ['league_id', 'updated_at'], False, []),
+    ('ix_drafts_league_id_name', 'drafts', ['league_id', 'name'], True, []),
+    ('ix_drafts_league_id_date_id', 'drafts', ['league_id', 'date', 'id'], False, ['updated_at']),
+    ('ix_drafts_league_id_updated_at', 'drafts', ['league_id', 'updated_at'], False, []),
+    ('ix_draft_players_league_id_updated_at', 'draft_players', ['league_id', 'updated_at'], False, []),
+    ('ix_tombstones_league_id_deleted_at', 'tombstones', ['league_id', 'deleted_at'], False, []),
+]
+
+
+def partitions(table: str) -> list[str]:
+    result = op.get_bind().execute(
+        sa.text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table) ORDER BY 1"),
+        {'table': table},
+    )
+    return list(result.scalars())
+
+
+def create_indexes(indexes: list[tuple[str, str, list[str], bool, list[str]]]) -> None:
+    for name, table, columns, unique, include in indexes:
+        op.create_index(
+            name, table, columns, unique=unique, postgresql_include=include,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def create_partitioned_index(table: str, column: str) -> None:
+    """
+    Partitioned tables can't build an index concurrently: create it invalid on the parent only, build
+    it concurrently on every partition and attach those, which makes the parent's valid.
+    """
+    suffix = column.replace(', ', '_')
+    op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_{suffix} ON ONLY {table} ({column})")
+    for partition in partitions(table):
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{partition}_{suffix} ON {partition} ({column})")
+        op.execute(f"ALTER INDEX ix_{table}_{suffix} ATTACH PARTITION ix_{partition}_{suffix}")
+
+
+def record_tombstones(columns: str, values: str) -> None:
+    op.execute(
+        "CREATE OR REPLACE FUNCTION record_tombstones() RETURNS trigger LANGUAGE plpgsql AS $$ "
+        "BEGIN "
+        "IF current_setting('draft_mtg.archiving', true) IS DISTINCT FROM 'on' THEN "
+        f"INSERT INTO tombstones ({columns}) SELECT {values} FROM deleted_rows; "
+        "END IF; "
+        "RETURN NULL; "
+        "END $$"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'leagues',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('slug', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('slug'),
+    )
+    # Gets id 1, the app's DEFAULT_LEAGUE_ID
+    op.execute("INSERT INTO leagues (slug, name, created_at) VALUES ('default', 'Default', now())")
+
+    for table in SCOPED_TABLES:
+        # A constant default is kept in the catalog, existing rows join the default league without a rewrite.
+        # New rows have to name their league.
+        op.execute(f"ALTER TABLE {table} ADD COLUMN league_id integer NOT NULL DEFAULT 1")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN league_id DROP DEFAULT")
+    for table in LEAGUE_TABLES:
+        # NOT VALID skips checking the existing rows under the ADD COLUMN's ACCESS EXCLUSIVE lock
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_league_id_fkey "
+            "FOREIGN KEY (league_id) REFERENCES leagues (id) NOT VALID"
+        )
+    record_tombstones('league_id, table_name, row_id', 'league_id, TG_TABLE_NAME, id')
+
+    # Outside the transaction, once the columns are committed and their locks released: every VALIDATE
+    # runs in its own transaction under SHARE UPDATE EXCLUSIVE, which doesn't block writes. CONCURRENTLY
+    # keeps the tables writable while the indexes build, it can't run inside a transaction either.
+    with op.get_context().autocommit_block():
+        for table in LEAGUE_TABLES:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_league_id_fkey")
+        create_indexes(NEW_INDEXES)
+        for table in PARTITIONED_TABLES:
+            create_partitioned_index(table, 'league_id, updated_at')
+        for name, table, *_ in OLD_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        for table in PARTITIONED_TABLES:
+            # Drops the partitions' indexes with it
+            op.drop_index(f'ix_{table}_updated_at', table_name=table, if_exists=True)
+
+    # A draft's players have to play in its league, the foreign key needs ix_players_league_id_id
+    op.execute(
+        "ALTER TABLE draft_players ADD CONSTRAINT draft_players_league_id_player_id_fkey "
+        "FOREIGN KEY (league_id, player_id) REFERENCES players (league_id, id) NOT VALID"
+    )
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TABLE draft_players VALIDATE CONSTRAINT draft_players_league_id_player_id_fkey")
+    op.drop_constraint('draft_players_player_id_fkey', 'draft_players', type_='foreignkey')
+
+
+def downgrade() -> None:
+    """Downgrade schema. Fails if names that are unique per league repeat across leagues."""
+    op.create_foreign_key('draft_players_player_id_fkey', 'draft_players', 'players', ['player_id'], ['id'])
+    op.drop_constraint('draft_players_league_id_player_id_fkey', 'draft_players', type_='foreignkey')
+
+    with op.get_context().autocommit_block():
+        create_indexes(OLD_INDEXES)
+        for table in PARTITIONED_TABLES:
+            create_partitioned_index(table, 'updated_at')
+        for table in reversed(PARTITIONED_TABLES):
+            op.drop_index(f'ix_{table}_league_id_updated_at', table_name=table, if_exists=True)
+        for name, table, *_ in reversed(NEW_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    record_tombstones('table_name, row_id', 'TG_TABLE_NAME, id')
+    for table in reversed(SCOPED_TABLES):
+        # Drops the foreign keys to leagues with it
+        op.drop_column(table, 'league_id')
+    op.drop_table('leagues')
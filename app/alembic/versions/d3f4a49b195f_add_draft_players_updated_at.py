@@ -0,0 +1,33 @@
+"""add draft_players updated_at
+
+Revision ID: d3f4a49b195f
+Revises: 921e20dc6813
+Create Date: 2026-10-19 00:07:55.394378
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f4a49b195f'
+down_revision: Union[str, None] = '921e20dc6813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows get the migration time, new rows are stamped by the model like the other tables
+    op.add_column(
+        'draft_players',
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    )
+    op.alter_column('draft_players', 'updated_at', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('draft_players', 'updated_at')
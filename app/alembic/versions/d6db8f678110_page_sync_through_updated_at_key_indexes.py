@@ -0,0 +1,81 @@
+"""page sync through updated_at, key indexes
+
+Revision ID: d6db8f678110
+Revises: 930e2ac45d79
+Create Date: 2026-10-19 14:02:47.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6db8f678110'
+down_revision: Union[str, None] = '930e2ac45d79'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# GET /sync pages through every table by (updated_at, key), rows of one transaction share their updated_at
+PLAIN_KEYS = {'players': 'id', 'drafts': 'id', 'draft_players': 'draft_id, player_id'}
+PARTITIONED_KEYS = {'rounds': 'id', 'matches': 'id'}
+
+
+def partitions(table: str) -> list[str]:
+    result = op.get_bind().execute(
+        sa.text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table) ORDER BY 1"),
+        {'table': table},
+    )
+    return list(result.scalars())
+
+
+def index_name(table: str, columns: str) -> str:
+    return f"ix_{table}_{columns.replace(', ', '_')}"
+
+
+def create_index(table: str, columns: str) -> None:
+    op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name(table, columns)} ON {table} ({columns})")
+
+
+def create_partitioned_index(table: str, columns: str) -> None:
+    """
+    Partitioned tables can't build an index concurrently: create it invalid on the parent only, build
+    it concurrently on every partition and attach those, which makes the parent's valid.
+    """
+    name = index_name(table, columns)
+    op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} ({columns})")
+    for partition in partitions(table):
+        create_index(partition, columns)
+        op.execute(f"ALTER INDEX {name} ATTACH PARTITION {index_name(partition, columns)}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tables writable while the indexes build, it can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for table, key in PLAIN_KEYS.items():
+            create_index(table, f'league_id, updated_at, {key}')
+        for table, key in PARTITIONED_KEYS.items():
+            create_partitioned_index(table, f'league_id, updated_at, {key}')
+        for table in PLAIN_KEYS:
+            op.drop_index(f'ix_{table}_league_id_updated_at', table_name=table, postgresql_concurrently=True)
+        for table in PARTITIONED_KEYS:
+            # Drops the partitions' indexes with it
+            op.drop_index(f'ix_{table}_league_id_updated_at', table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in PLAIN_KEYS:
+            create_index(table, 'league_id, updated_at')
+        for table in PARTITIONED_KEYS:
+            create_partitioned_index(table, 'league_id, updated_at')
+        for table, key in PLAIN_KEYS.items():
+            op.drop_index(
+                index_name(table, f'league_id, updated_at, {key}'), table_name=table, postgresql_concurrently=True
+            )
+        for table, key in PARTITIONED_KEYS.items():
+            op.drop_index(index_name(table, f'league_id, updated_at, {key}'), table_name=table)
@@ -0,0 +1,31 @@
+"""add match and draft player versions
+
+Revision ID: e721da3f7102
+Revises: d9c746e57510
+Create Date: 2026-10-19 00:31:36.286125
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e721da3f7102'
+down_revision: Union[str, None] = 'd9c746e57510'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default is stored in the catalog, existing rows aren't rewritten
+    op.add_column('draft_players', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('matches', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('matches', 'version')
+    op.drop_column('draft_players', 'version')
@@ -0,0 +1,51 @@
+"""cascade draft deletes
+
+Revision ID: ea5dbfaebe12
+Revises: e721da3f7102
+Create Date: 2026-10-19 00:38:39.468996
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ea5dbfaebe12'
+down_revision: Union[str, None] = 'e721da3f7102'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (constraint, table, column, referred table) of every foreign key that follows a draft delete
+CASCADES = [
+    ('rounds_draft_id_fkey', 'rounds', 'draft_id', 'drafts'),
+    ('draft_players_draft_id_fkey', 'draft_players', 'draft_id', 'drafts'),
+    ('matches_draft_id_fkey', 'matches', 'draft_id', 'drafts'),
+    ('matches_round_id_fkey', 'matches', 'round_id', 'rounds'),
+]
+
+
+def replace_foreign_keys(ondelete: Union[str, None]) -> None:
+    for name, table, column, referred_table in CASCADES:
+        op.drop_constraint(name, table, type_='foreignkey')
+        # NOT VALID skips the full scan under the ACCESS EXCLUSIVE lock the drop takes
+        op.create_foreign_key(
+            name, table, referred_table, [column], ['id'], ondelete=ondelete, postgresql_not_valid=True
+        )
+    # Committing first releases those locks. Each VALIDATE then runs in its own transaction and only
+    # takes SHARE UPDATE EXCLUSIVE, so writes go on while it scans.
+    with op.get_context().autocommit_block():
+        for name, table, *_ in CASCADES:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    replace_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    replace_foreign_keys(None)
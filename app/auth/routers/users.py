@@ -1,7 +1,5 @@
-from typing import Any
-
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,13 +7,17 @@ from app.auth.models import User
 from app.auth.schemas import UserBase, UserCreate
 from app.auth.utils import get_current_active_user, get_current_admin_user, get_current_user, get_password_hash
 from app.core.utils.pagination import PaginationParams, get_pagination_params
-from app.db.database import get_db
+from app.core.utils.responses import JSONAdapter
+from app.db.database import get_db, get_uow
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+USER_JSON = JSONAdapter(UserBase)
+USER_LIST_JSON = JSONAdapter(list[UserBase])
+
 
-@router.post("")
-async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)) -> UserBase:
+@router.post("", response_model=UserBase)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)) -> Response:
     db_user = User(
         email=user.email,
         hashed_password=get_password_hash(user.password),
@@ -26,7 +28,7 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)) -> U
     try:
         await db.commit()
         await db.refresh(db_user)
-        return UserBase.model_validate(db_user)
+        return USER_JSON.response(db_user)
     except IntegrityError as err:
         await db.rollback()
         raise HTTPException(status_code=400, detail="Email already registered") from err
@@ -37,66 +39,66 @@ async def list_users(
     pagination: PaginationParams = Depends(get_pagination_params),
     db: AsyncSession = Depends(get_db),
     _: User = Depends(get_current_active_user),
-) -> Any:
+) -> Response:
     result = await db.execute(select(User).offset(pagination.skip).limit(pagination.limit))
     users = result.scalars().all()
-    return users
+    return USER_LIST_JSON.response(users)
 
 
 @router.get("/me", response_model=UserBase)
-async def get_me(current_user: User = Depends(get_current_user)) -> UserBase:
+async def get_me(current_user: User = Depends(get_current_user)) -> Response:
     """
     Get details of the currently authenticated user.
     """
-    return UserBase.model_validate(current_user)
+    return USER_JSON.response(current_user)
 
 
-@router.get("/{user_id}")
+@router.get("/{user_id}", response_model=UserBase)
 async def get_user(
     user_id: int, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_active_user)
-) -> UserBase:
+) -> Response:
     result = await db.execute(select(User).filter(User.id == user_id))
     user = result.scalar()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return UserBase.model_validate(user)
+    return USER_JSON.response(user)
 
 
-@router.put("/{user_id}")
+@router.put("/{user_id}", response_model=UserBase)
 async def update_user(
     user_id: int,
     user: UserCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
     current_user: User = Depends(get_current_active_user),
-) -> UserBase:
-    result = await db.execute(select(User).filter(User.id == user_id))
-    db_user = result.scalar()
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-
+) -> Response:
     if not current_user.is_admin and current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    db_user.email = user.email
-    db_user.hashed_password = get_password_hash(user.password)
+    stmt = (
+        update(User)
+        .filter(User.id == user_id)
+        .values(email=user.email, hashed_password=get_password_hash(user.password))
+        .returning(User)
+    )
+    try:
+        result = await db.execute(stmt, execution_options={"populate_existing": True})
+    except IntegrityError as err:
+        raise HTTPException(status_code=400, detail="Email already registered") from err
 
-    await db.commit()
-    await db.refresh(db_user)
-    return UserBase.model_validate(db_user)
+    db_user = result.scalar()
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return USER_JSON.response(db_user)
 
 
 @router.post("/{user_id}/promote-to-admin")
 async def promote_user_to_admin(
-    user_id: int, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_admin_user)
+    user_id: int, db: AsyncSession = Depends(get_uow), _: User = Depends(get_current_admin_user)
 ) -> dict[str, str]:
     """Promote an existing user to admin. Requires admin privileges."""
-    result = await db.execute(select(User).filter(User.id == user_id))
-    db_user = result.scalar()
-    if db_user is None:
+    result = await db.execute(update(User).filter(User.id == user_id).values(is_admin=True).returning(User.id))
+    if result.scalar() is None:
         raise HTTPException(status_code=404, detail="User not found")
-
-    db_user.is_admin = True
-    await db.commit()
     return {"message": "User promoted to admin successfully"}
 
 
@@ -116,13 +118,9 @@ async def delete_user(
 
 @router.post("/{user_id}/activate")
 async def activate_user(
-    user_id: int, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_admin_user)
+    user_id: int, db: AsyncSession = Depends(get_uow), _: User = Depends(get_current_admin_user)
 ) -> dict[str, str]:
-    result = await db.execute(select(User).filter(User.id == user_id))
-    db_user = result.scalar()
-    if db_user is None:
+    result = await db.execute(update(User).filter(User.id == user_id).values(is_active=True).returning(User.id))
+    if result.scalar() is None:
         raise HTTPException(status_code=404, detail="User not found")
-
-    db_user.is_active = True
-    await db.commit()
     return {"message": "User activated successfully"}
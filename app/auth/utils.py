@@ -10,7 +10,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth.models import User
 from app.auth.schemas import TokenData
 from app.config import settings
+from app.core.models import LeagueMember
 from app.db.database import get_db
+from app.db.leagues import league_of
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
@@ -83,3 +85,19 @@ async def get_current_admin_user(
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Forbidden, you must be an admin user")
     return current_user
+
+
+async def get_current_league_member(
+    current_user: Annotated[User, Depends(get_current_active_user)], db: AsyncSession = Depends(get_db)
+) -> User:
+    """The user of a write to the request's league, who has to be one of its members or an admin."""
+    if current_user.is_admin:
+        return current_user
+    result = await db.execute(
+        select(LeagueMember.user_id).where(
+            LeagueMember.league_id == league_of(db), LeagueMember.user_id == current_user.id
+        )
+    )
+    if result.scalar() is None:
+        raise HTTPException(status_code=403, detail="Forbidden, you must be a member of this league")
+    return current_user
@@ -0,0 +1,203 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Annotated, Any, Dict, List, Optional
+
+import typer
+
+from app.benchmarks.algorithms import measure_algorithms
+from app.benchmarks.dataset import DatasetSpec, seed_dataset
+from app.benchmarks.leagues import measure_league_isolation
+from app.benchmarks.load import SCENARIOS, run_benchmark
+from app.benchmarks.report import compare_reports, load_report, write_report
+from app.benchmarks.scaling import measure_scaling
+from app.benchmarks.serialization import measure_serialization
+from app.cli import available_cores
+from app.db.database import engine
+
+cli = typer.Typer(help="Endpoint load benchmarks against a local Postgres database.")
+
+
+async def _seed(spec: DatasetSpec) -> None:
+    info = await seed_dataset(engine, spec)
+    typer.echo(f"Seeded {info.players} players, {info.drafts} drafts, {info.rounds} rounds and {info.matches} matches.")
+
+
+async def _seed_and_run(
+    spec: DatasetSpec | None, endpoints: List[str], requests: int, concurrency: int, warmup: int, seed: int
+) -> Dict[str, Any]:
+    try:
+        if spec is not None:
+            await _seed(spec)
+        return await run_benchmark(engine, endpoints, requests, concurrency, warmup, seed)
+    finally:
+        await engine.dispose()
+
+
+async def _seed_only(spec: DatasetSpec) -> None:
+    try:
+        await _seed(spec)
+    finally:
+        await engine.dispose()
+
+
+def _check_regressions(baseline: Path, report: Dict[str, Any], tolerance: float) -> None:
+    regressions = compare_reports(load_report(baseline), report, tolerance)
+    for line in regressions:
+        typer.echo(f"REGRESSION {line}", err=True)
+    if regressions:
+        raise typer.Exit(code=1)
+    typer.echo(f"No regressions against {baseline} (tolerance {tolerance:.0%}).")
+
+
+@cli.command()
+def seed(
+    players: Annotated[int, typer.Option(help="Number of players")] = 200,
+    drafts: Annotated[int, typer.Option(help="Number of drafts")] = 10_000,
+    random_seed: Annotated[int, typer.Option("--seed", help="Random seed of the dataset")] = 42,
+    yes: Annotated[bool, typer.Option("--yes", help="Do not ask before truncating the database")] = False,
+) -> None:
+    """Truncate the configured database and fill it with a deterministic dataset."""
+    if not yes:
+        typer.confirm("This truncates all tables of the configured database. Continue?", abort=True)
+    asyncio.run(_seed_only(DatasetSpec(players=players, drafts=drafts, seed=random_seed)))
+
+
+@cli.command()
+def run(
+    output: Annotated[Path, typer.Option(help="Where to write the JSON report")] = Path("benchmark.json"),
+    endpoint: Annotated[Optional[List[str]], typer.Option(help="Endpoint to benchmark, repeatable")] = None,
+    requests: Annotated[int, typer.Option(help="Measured requests per endpoint")] = 500,
+    concurrency: Annotated[int, typer.Option(help="Concurrent clients")] = 16,
+    warmup: Annotated[int, typer.Option(help="Unmeasured requests per endpoint")] = 50,
+    random_seed: Annotated[int, typer.Option("--seed", help="Random seed of dataset and request mix")] = 42,
+    reseed: Annotated[bool, typer.Option(help="Reseed the database before running")] = False,
+    players: Annotated[int, typer.Option(help="Number of players when reseeding")] = 200,
+    drafts: Annotated[int, typer.Option(help="Number of drafts when reseeding")] = 10_000,
+    baseline: Annotated[Optional[Path], typer.Option(help="Report to compare against")] = None,
+    tolerance: Annotated[float, typer.Option(help="Allowed relative regression, 0.1 == 10%")] = 0.1,
+) -> None:
+    """Benchmark endpoints and write throughput and latency percentiles as JSON."""
+    endpoints = endpoint or list(SCENARIOS)
+    unknown = set(endpoints) - set(SCENARIOS)
+    if unknown:
+        raise typer.BadParameter(f"Unknown endpoints: {', '.join(sorted(unknown))}", param_hint="--endpoint")
+
+    spec = None
+    if reseed:
+        spec = DatasetSpec(players=players, drafts=drafts, seed=random_seed)
+
+    report = asyncio.run(_seed_and_run(spec, endpoints, requests, concurrency, warmup, random_seed))
+    write_report(report, output)
+    typer.echo(json.dumps(report["endpoints"], indent=2))
+
+    if baseline is not None:
+        _check_regressions(baseline, report, tolerance)
+
+
+@cli.command()
+def scaling(
+    output: Annotated[Path, typer.Option(help="Where to write the JSON report")] = Path("scaling.json"),
+    workers: Annotated[Optional[List[int]], typer.Option(help="Worker count to measure, repeatable")] = None,
+    endpoint: Annotated[Optional[List[str]], typer.Option(help="Endpoint to benchmark, repeatable")] = None,
+    requests: Annotated[int, typer.Option(help="Measured requests per endpoint")] = 1000,
+    concurrency: Annotated[int, typer.Option(help="Concurrent clients")] = 64,
+    warmup: Annotated[int, typer.Option(help="Unmeasured requests per endpoint")] = 100,
+    random_seed: Annotated[int, typer.Option("--seed", help="Random seed of the request mix")] = 42,
+    port: Annotated[int, typer.Option(help="Port of the benchmarked server")] = 8765,
+) -> None:
+    """Measure throughput of `draft_mtg serve` over real HTTP with 1 to N worker processes."""
+    worker_counts = workers or sorted({1, 2, available_cores()})
+    endpoints = endpoint or ["read_draft", "list_drafts"]
+
+    async def _measure() -> Dict[str, Any]:
+        try:
+            return await measure_scaling(
+                engine, worker_counts, endpoints, requests, concurrency, warmup, random_seed, port
+            )
+        finally:
+            await engine.dispose()
+
+    report = asyncio.run(_measure())
+    write_report(report, output)
+    typer.echo(json.dumps(report["speedup"], indent=2))
+
+
+@cli.command()
+def leagues(
+    output: Annotated[Path, typer.Option(help="Where to write the JSON report")] = Path("leagues.json"),
+    drafts: Annotated[int, typer.Option(help="Drafts of the default league")] = 1000,
+    other_drafts: Annotated[
+        Optional[List[int]], typer.Option(help="Size of the other league to measure at, repeatable")
+    ] = None,
+    endpoint: Annotated[Optional[List[str]], typer.Option(help="Endpoint to benchmark, repeatable")] = None,
+    requests: Annotated[int, typer.Option(help="Measured requests per endpoint")] = 500,
+    concurrency: Annotated[int, typer.Option(help="Concurrent clients")] = 16,
+    warmup: Annotated[int, typer.Option(help="Unmeasured requests per endpoint")] = 50,
+    random_seed: Annotated[int, typer.Option("--seed", help="Random seed of datasets and request mix")] = 42,
+    yes: Annotated[bool, typer.Option("--yes", help="Do not ask before truncating the database")] = False,
+) -> None:
+    """Benchmark the default league while another league grows, its latencies should stay flat."""
+    endpoints = endpoint or ["read_draft", "list_drafts"]
+    unknown = set(endpoints) - set(SCENARIOS)
+    if unknown:
+        raise typer.BadParameter(f"Unknown endpoints: {', '.join(sorted(unknown))}", param_hint="--endpoint")
+    if not yes:
+        typer.confirm("This truncates all tables of the configured database. Continue?", abort=True)
+
+    async def _measure() -> Dict[str, Any]:
+        try:
+            return await measure_league_isolation(
+                engine,
+                DatasetSpec(drafts=drafts, seed=random_seed),
+                other_drafts or [1000, 10_000, 50_000],
+                endpoints,
+                requests,
+                concurrency,
+                warmup,
+            )
+        finally:
+            await engine.dispose()
+
+    report = asyncio.run(_measure())
+    write_report(report, output)
+    typer.echo(json.dumps(report["default_league_slowdown"], indent=2))
+
+
+@cli.command()
+def serialization(
+    output: Annotated[Path, typer.Option(help="Where to write the JSON report")] = Path("serialization.json"),
+    size: Annotated[int, typer.Option(help="Rows of the list endpoints")] = 1000,
+    pod_size: Annotated[int, typer.Option(help="Players of the serialized draft")] = 12,
+    repeat: Annotated[int, typer.Option(help="Measured dumps per endpoint")] = 20,
+) -> None:
+    """Compare serialization cost per endpoint of FastAPI's default path and the precompiled adapters."""
+    report = measure_serialization(size, pod_size, repeat)
+    write_report(report, output)
+    typer.echo(json.dumps(report["endpoints"], indent=2))
+
+
+@cli.command()
+def algorithms(
+    output: Annotated[Path, typer.Option(help="Where to write the JSON report")] = Path("algorithms.json"),
+    repeat: Annotated[int, typer.Option(help="Measured runs per algorithm")] = 20,
+    random_seed: Annotated[int, typer.Option("--seed", help="Random seed of the inputs")] = 0,
+) -> None:
+    """Time the seating search against its budget and the Monte Carlo projections."""
+    report = measure_algorithms(repeat, random_seed)
+    write_report(report, output)
+    typer.echo(json.dumps(report["algorithms"], indent=2))
+
+
+@cli.command()
+def compare(
+    baseline: Annotated[Path, typer.Argument(help="Saved baseline report")],
+    current: Annotated[Path, typer.Argument(help="Report to check")],
+    tolerance: Annotated[float, typer.Option(help="Allowed relative regression, 0.1 == 10%")] = 0.1,
+) -> None:
+    """Exit with status 1 if `current` regressed against `baseline`."""
+    _check_regressions(baseline, load_report(current), tolerance)
+
+
+if __name__ == "__main__":
+    cli()
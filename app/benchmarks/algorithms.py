@@ -0,0 +1,59 @@
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.core.models import MatchResult
+from app.core.utils.drafts import schedule_pairings
+from app.core.utils.projections import simulate
+from app.core.utils.seating import PairIndex, optimize_seating
+
+
+def _summary(seconds: List[float]) -> Dict[str, float]:
+    return {"mean_ms": round(1000 * sum(seconds) / len(seconds), 3), "max_ms": round(1000 * max(seconds), 3)}
+
+
+def measure_seating(player_count: int, budget_ms: int, repeat: int, seed: int) -> Dict[str, Any]:
+    """Wall time of `optimize_seating` on random pair histories, it should stay close to its budget."""
+    rng = np.random.default_rng(seed)
+    player_ids = list(range(1, player_count + 1))
+    seconds = []
+    improved = 0
+    for _ in range(repeat):
+        weights = {(a, b): float(rng.random()) for a in player_ids for b in player_ids if a < b and rng.random() < 0.5}
+        start = time.perf_counter()
+        seating = optimize_seating(player_ids, PairIndex(player_ids, weights), budget_ms / 1000, rng)
+        seconds.append(time.perf_counter() - start)
+        improved += seating.repeat_score < seating.original_repeat_score
+    return {"players": player_count, "budget_ms": budget_ms, "improved": improved, **_summary(seconds)}
+
+
+def measure_projections(player_count: int, simulations: int, repeat: int, seed: int) -> Dict[str, Any]:
+    """Wall time of `simulate` for a draft whose matches are all still open."""
+    rng = np.random.default_rng(seed)
+    player_ids: List[Any] = list(range(1, player_count + 1))
+    pairings = schedule_pairings(player_ids + [None] * (player_count % 2))
+    matches = [
+        (player_1_id, player_2_id, MatchResult.BASE.value)
+        for pairs in pairings
+        for player_1_id, player_2_id in pairs
+        if None not in (player_1_id, player_2_id)
+    ]
+    probabilities = np.full((len(matches), 4), 0.25)
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        simulate(player_ids, matches, probabilities, simulations, rng)
+        seconds.append(time.perf_counter() - start)
+    return {"players": player_count, "simulations": simulations, **_summary(seconds)}
+
+
+def measure_algorithms(repeat: int = 20, seed: int = 0) -> Dict[str, Any]:
+    """Time the CPU bound helpers of the draft endpoints, no database needed."""
+    return {
+        "meta": {"repeat": repeat, "seed": seed},
+        "algorithms": {
+            "optimize_seating": measure_seating(16, 50, repeat, seed),
+            "simulate": measure_projections(12, 10_000, repeat, seed),
+        },
+    }
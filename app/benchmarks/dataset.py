@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.auth.models import User
+from app.auth.utils import get_password_hash
+from app.core.models import Draft, DraftPlayer, League, Match, MatchResult, Player, Round
+from app.core.utils.generator import GeneratorSpec, GeneratorStats, generate_history
+from app.db.leagues import DEFAULT_LEAGUE_ID
+
+BENCHMARK_USER_EMAIL = "benchmark@draft-mtg.local"
+BENCHMARK_USER_PASSWORD = "Benchmark123"
+
+FINISHED_RESULTS = [result for result in MatchResult if result != MatchResult.BASE]
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    players: int = 200
+    drafts: int = 10_000
+    in_progress_ratio: float = 0.05
+    seed: int = 42
+
+
+async def seed_dataset(engine: AsyncEngine, spec: DatasetSpec) -> GeneratorStats:
+    """
+    Replace the content of the database with a deterministic dataset described by `spec`, in the
+    default league. Sequences are restarted so the same spec always produces the same rows and ids.
+    """
+    tables = ", ".join(model.__tablename__ for model in (Match, Round, DraftPlayer, Draft, Player, User))
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        await conn.execute(delete(League).where(League.id != DEFAULT_LEAGUE_ID))
+        await conn.execute(
+            insert(User).values(
+                email=BENCHMARK_USER_EMAIL,
+                hashed_password=get_password_hash(BENCHMARK_USER_PASSWORD),
+                is_active=True,
+                is_admin=True,
+            )
+        )
+
+    generator_spec = GeneratorSpec(
+        players=spec.players,
+        drafts=spec.drafts,
+        in_progress=int(spec.drafts * spec.in_progress_ratio),
+        seed=spec.seed,
+        last_date=date(2025, 1, 1),
+    )
+    stats = await generate_history(engine, generator_spec)
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"ANALYZE {tables}"))
+
+    return stats
@@ -0,0 +1,81 @@
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.benchmarks.dataset import DatasetSpec, seed_dataset
+from app.benchmarks.load import run_benchmark
+from app.core.models import League
+from app.core.utils.generator import GeneratorSpec, generate_history
+from app.db.leagues import DEFAULT_LEAGUE
+
+OTHER_LEAGUE = "benchmark-other"
+
+
+async def measure_league_isolation(
+    engine: AsyncEngine,
+    spec: DatasetSpec,
+    other_drafts: List[int],
+    endpoints: List[str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> Dict[str, Any]:
+    """
+    Seed the default league with `spec`, then grow a second league to every size of `other_drafts` in
+    turn and benchmark `endpoints` in both leagues after each step. The default league's latencies
+    staying flat while the other league grows shows query cost follows a league's own size.
+    """
+    await seed_dataset(engine, spec)
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            insert(League).values(slug=OTHER_LEAGUE, name="Benchmark other league").returning(League.id)
+        )
+        other_league_id = result.scalar_one()
+
+    steps: Dict[str, Any] = {}
+    generated = 0
+    for size in sorted(other_drafts):
+        # Every step brings its own players, a growing league gets new regulars too. Its drafts span the
+        # default league's dates, more partitions would slow every league down regardless of its size.
+        generator_spec = GeneratorSpec(
+            players=spec.players,
+            drafts=size - generated,
+            seed=spec.seed + size,
+            drafts_per_week=GeneratorSpec.drafts_per_week * (size - generated) / spec.drafts,
+            last_date=date(2025, 1, 1),
+            league_id=other_league_id,
+        )
+        await generate_history(engine, generator_spec)
+        generated = size
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE"))
+
+        steps[str(size)] = {
+            league: (await run_benchmark(engine, endpoints, requests, concurrency, warmup, spec.seed, league=league))[
+                "endpoints"
+            ]
+            for league in (DEFAULT_LEAGUE, OTHER_LEAGUE)
+        }
+
+    first = steps[str(min(other_drafts))][DEFAULT_LEAGUE]
+    slowdown = {
+        size: {
+            name: round(stats["latency_ms"]["p50"] / first[name]["latency_ms"]["p50"], 2)
+            for name, stats in by_league[DEFAULT_LEAGUE].items()
+            if first[name]["latency_ms"]["p50"]
+        }
+        for size, by_league in steps.items()
+    }
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "concurrency": concurrency,
+            "requests_per_endpoint": requests,
+            "seed": spec.seed,
+            "default_league_drafts": spec.drafts,
+        },
+        "other_league_drafts": steps,
+        "default_league_slowdown": slowdown,
+    }
@@ -0,0 +1,173 @@
+import asyncio
+import itertools
+import platform
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+from sqlalchemy import exists, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.benchmarks.dataset import BENCHMARK_USER_EMAIL, BENCHMARK_USER_PASSWORD, FINISHED_RESULTS
+from app.benchmarks.report import EndpointStats
+from app.core.models import Draft, League, Match, MatchResult, Player
+from app.db.leagues import DEFAULT_LEAGUE, LEAGUE_HEADER
+from app.main import app
+
+BASE_URL = "http://benchmark"
+
+
+@dataclass
+class BenchmarkContext:
+    draft_count: int
+    finished_draft_ids: List[int]
+    open_match_ids: List[int]
+    player_ids: List[int]
+    run_id: str
+
+
+Call = Callable[[httpx.AsyncClient, BenchmarkContext, random.Random, int], Awaitable[httpx.Response]]
+
+
+async def _read_draft(client: httpx.AsyncClient, ctx: BenchmarkContext, rng: random.Random, _: int) -> httpx.Response:
+    return await client.get(f"/drafts/{rng.choice(ctx.finished_draft_ids)}")
+
+
+async def _list_drafts(client: httpx.AsyncClient, ctx: BenchmarkContext, rng: random.Random, _: int) -> httpx.Response:
+    skip = rng.randrange(max(ctx.draft_count - 100, 1))
+    return await client.get("/drafts", params={"skip": skip, "limit": 100})
+
+
+async def _create_draft(client: httpx.AsyncClient, ctx: BenchmarkContext, rng: random.Random, i: int) -> httpx.Response:
+    payload = {
+        "name": f"benchmark-{ctx.run_id}-{i}",
+        "date": date.today().isoformat(),
+        "player_ids": rng.sample(ctx.player_ids, 8),
+    }
+    return await client.post("/drafts", json=payload)
+
+
+async def _set_score(client: httpx.AsyncClient, ctx: BenchmarkContext, rng: random.Random, _: int) -> httpx.Response:
+    payload = {"score": rng.choice(FINISHED_RESULTS).value}
+    return await client.put(f"/matches/{rng.choice(ctx.open_match_ids)}", json=payload)
+
+
+async def _get_results(client: httpx.AsyncClient, ctx: BenchmarkContext, rng: random.Random, _: int) -> httpx.Response:
+    return await client.post(f"/drafts/{rng.choice(ctx.finished_draft_ids)}/results")
+
+
+SCENARIOS: Dict[str, Call] = {
+    "read_draft": _read_draft,
+    "list_drafts": _list_drafts,
+    "create_draft": _create_draft,
+    "set_score": _set_score,
+    "get_results": _get_results,
+}
+
+
+async def load_context(engine: AsyncEngine, league: str = DEFAULT_LEAGUE) -> BenchmarkContext:
+    """Ids the scenarios pick from, all of the league of slug `league`."""
+    open_match_exists = exists().where(Match.draft_id == Draft.id, Match.score == MatchResult.BASE.value)
+    async with engine.connect() as conn:
+        league_id = (await conn.execute(select(League.id).where(League.slug == league))).scalar_one()
+        drafts = select(Draft.id).where(Draft.league_id == league_id)
+        draft_count = (await conn.execute(select(func.count()).select_from(drafts.subquery()))).scalar_one()
+        finished_draft_ids = (await conn.execute(drafts.where(~open_match_exists))).scalars().all()
+        open_matches = select(Match.id).where(Match.league_id == league_id, Match.score == MatchResult.BASE.value)
+        open_match_ids = (await conn.execute(open_matches.limit(50_000))).scalars().all()
+        player_ids = (await conn.execute(select(Player.id).where(Player.league_id == league_id))).scalars().all()
+
+    return BenchmarkContext(
+        draft_count=draft_count,
+        finished_draft_ids=list(finished_draft_ids),
+        open_match_ids=list(open_match_ids),
+        player_ids=list(player_ids),
+        run_id=datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"),
+    )
+
+
+async def _authenticate(client: httpx.AsyncClient) -> None:
+    response = await client.post("/login", data={"username": BENCHMARK_USER_EMAIL, "password": BENCHMARK_USER_PASSWORD})
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    call: Call,
+    ctx: BenchmarkContext,
+    requests: int,
+    concurrency: int,
+    seed: int,
+    offset: int = 0,
+) -> tuple[EndpointStats, float]:
+    stats = EndpointStats()
+    counter = itertools.count(offset)
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed * 1000 + worker_id)
+        while (i := next(counter)) < offset + requests:
+            start = time.perf_counter()
+            response = await call(client, ctx, rng, i)
+            stats.latencies.append(time.perf_counter() - start)
+            if response.status_code == 503:
+                stats.shed += 1
+                # Back off like a well-behaved client, retrying at once would only feed the overload
+                await asyncio.sleep(float(response.headers.get("retry-after", 0)))
+            elif response.status_code >= 400:
+                stats.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(worker_id) for worker_id in range(concurrency)))
+    return stats, time.perf_counter() - start
+
+
+async def run_benchmark(
+    engine: AsyncEngine,
+    endpoints: List[str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+    base_url: str | None = None,
+    league: str = DEFAULT_LEAGUE,
+) -> Dict[str, Any]:
+    """
+    Drive every endpoint in `endpoints` in turn and return a JSON serializable report with
+    throughput and latency percentiles per endpoint. Requests go through an in-process ASGI
+    client unless `base_url` of a running server is given, all in the league of slug `league`.
+    """
+    ctx = await load_context(engine, league)
+    transport = httpx.ASGITransport(app=app) if base_url is None else None
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results: Dict[str, Any] = {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url or BASE_URL, limits=limits, timeout=None
+    ) as client:
+        await _authenticate(client)
+        client.headers[LEAGUE_HEADER] = league
+        for name in endpoints:
+            call = SCENARIOS[name]
+            if warmup:
+                await _drive(client, call, ctx, warmup, concurrency, seed, offset=requests)
+            stats, elapsed = await _drive(client, call, ctx, requests, concurrency, seed)
+            results[name] = stats.summary(elapsed)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "concurrency": concurrency,
+            "requests_per_endpoint": requests,
+            "seed": seed,
+            "dataset": {
+                "league": league,
+                "drafts": ctx.draft_count,
+                "players": len(ctx.player_ids),
+            },
+        },
+        "endpoints": results,
+    }
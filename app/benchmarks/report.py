@@ -0,0 +1,78 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Linear interpolation between closest ranks, `sorted_values` must be sorted ascending.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    # 503s of admission control, the server declining work it can't finish in time
+    shed: int = 0
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies_ms = sorted(latency * 1000 for latency in self.latencies)
+        total = len(latencies_ms)
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "shed": self.shed,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(latencies_ms) / total, 3) if total else 0.0,
+                **{f"p{pct}": round(percentile(latencies_ms, pct), 3) for pct in LATENCY_PERCENTILES},
+                "max": round(latencies_ms[-1], 3) if total else 0.0,
+            },
+        }
+
+
+def write_report(report: Dict[str, Any], path: Path) -> None:
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    report: Dict[str, Any] = json.loads(path.read_text())
+    return report
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Return a human readable line for every endpoint whose p95/p99 latency grew, or whose
+    throughput dropped, by more than `tolerance` (0.1 == 10%) relative to the baseline.
+    """
+    regressions = []
+    for name, base in baseline["endpoints"].items():
+        cur = current["endpoints"].get(name)
+        if cur is None:
+            continue
+
+        for pct in ("p95", "p99"):
+            base_latency = base["latency_ms"][pct]
+            cur_latency = cur["latency_ms"][pct]
+            if base_latency and cur_latency > base_latency * (1 + tolerance):
+                regressions.append(f"{name}: {pct} {base_latency:.2f}ms -> {cur_latency:.2f}ms")
+
+        base_rps = base["throughput_rps"]
+        cur_rps = cur["throughput_rps"]
+        if base_rps and cur_rps < base_rps * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base_rps:.1f}rps -> {cur_rps:.1f}rps")
+
+        if cur["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {cur['errors']}")
+
+    return regressions
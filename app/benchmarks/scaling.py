@@ -0,0 +1,86 @@
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.benchmarks.load import run_benchmark
+
+READY_TIMEOUT_SECONDS = 60
+
+
+async def _wait_until_ready(base_url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server did not become ready within {READY_TIMEOUT_SECONDS}s")
+
+
+def _stop(process: subprocess.Popen) -> None:
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=READY_TIMEOUT_SECONDS)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def measure_scaling(
+    engine: AsyncEngine,
+    worker_counts: List[int],
+    endpoints: List[str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+    port: int,
+) -> Dict[str, Any]:
+    """
+    Start `draft_mtg serve` with every worker count in turn, drive it over real HTTP and report
+    throughput per endpoint together with the speedup over the first worker count.
+    """
+    base_url = f"http://127.0.0.1:{port}"
+    per_workers: Dict[str, Any] = {}
+    for workers in worker_counts:
+        command = [sys.executable, "-m", "app.cli", "serve", "--host", "127.0.0.1", "--port", str(port)]
+        process = subprocess.Popen([*command, "--workers", str(workers)], env=os.environ.copy())
+        try:
+            await _wait_until_ready(base_url, process)
+            report = await run_benchmark(engine, endpoints, requests, concurrency, warmup, seed, base_url=base_url)
+        finally:
+            _stop(process)
+        per_workers[str(workers)] = report["endpoints"]
+
+    first = per_workers[str(worker_counts[0])]
+    speedup = {
+        str(workers): {
+            name: round(stats["throughput_rps"] / first[name]["throughput_rps"], 2)
+            for name, stats in per_workers[str(workers)].items()
+            if first[name]["throughput_rps"]
+        }
+        for workers in worker_counts
+    }
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "concurrency": concurrency,
+            "requests_per_endpoint": requests,
+            "seed": seed,
+        },
+        "workers": per_workers,
+        "speedup": speedup,
+    }
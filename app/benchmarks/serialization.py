@@ -0,0 +1,143 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import BaseModel
+
+from app.auth.models import User
+from app.auth.routers.users import USER_LIST_JSON
+from app.core.models import Color, Draft, DraftPlayer, Match, MatchResult, Player, Round
+from app.core.routers.drafts import DRAFT_FULL_JSON, DRAFT_LIST_JSON
+from app.core.routers.players import PLAYER_LIST_JSON
+from app.core.routers.rounds import MATCH_LIST_JSON
+from app.core.schemas.drafts import DraftFull
+from app.core.utils.drafts import schedule_pairings
+from app.core.utils.responses import JSONAdapter
+
+COLORS = list(Color)
+RESULTS = [result for result in MatchResult if result != MatchResult.BASE]
+
+
+@dataclass
+class SerializationCase:
+    adapter: JSONAdapter[Any]
+    content: Any
+    # Routes that used to call `model_validate` themselves before returning
+    legacy_model: type[BaseModel] | None = None
+
+
+def _players(count: int) -> List[Player]:
+    return [Player(id=player_id, name=f"Player #{player_id}") for player_id in range(1, count + 1)]
+
+
+def build_draft(player_count: int, draft_id: int = 1) -> Draft:
+    """In-memory draft with a full round-robin schedule, shaped like `read_draft` loads it."""
+    players = _players(player_count)
+    draft = Draft(id=draft_id, name=f"Draft #{draft_id}", date=date(2025, 1, 1))
+    draft.draft_players = [
+        DraftPlayer(
+            draft_id=draft_id,
+            player_id=player.id,
+            player=player,
+            order=order,
+            version=1,
+            points=3 * order,
+            final_place=order,
+            deck_colors=[COLORS[order % len(COLORS)].value, COLORS[(order + 2) % len(COLORS)].value],
+        )
+        for order, player in enumerate(players, start=1)
+    ]
+    by_id = {player.id: player for player in players}
+    match_id = 1
+    player_ids: List[Any] = [player.id for player in players]
+    if len(player_ids) % 2 != 0:
+        player_ids.append(None)
+    for number, pairings in enumerate(schedule_pairings(player_ids), start=1):
+        db_round = Round(id=number, number=number, draft_id=draft_id)
+        for player_1_id, player_2_id in pairings:
+            db_round.matches.append(
+                Match(
+                    id=match_id,
+                    round_id=number,
+                    draft_id=draft_id,
+                    player_1_id=player_1_id,
+                    player_2_id=player_2_id,
+                    player_1=by_id[player_1_id],
+                    player_2=by_id[player_2_id],
+                    score=RESULTS[match_id % len(RESULTS)].value,
+                    version=1,
+                )
+            )
+            match_id += 1
+        draft.rounds.append(db_round)
+    return draft
+
+
+def build_cases(size: int = 1000, pod_size: int = 12) -> Dict[str, SerializationCase]:
+    """Response payloads of the biggest endpoints, `size` rows for the list endpoints."""
+    big_draft = build_draft(pod_size)
+    drafts = [
+        Draft(id=draft_id, name=f"Draft #{draft_id}", date=date(2025, 1, 1) - timedelta(days=draft_id))
+        for draft_id in range(1, size + 1)
+    ]
+    users = [
+        User(id=user_id, email=f"user{user_id}@example.com", is_active=True, is_admin=False)
+        for user_id in range(1, size + 1)
+    ]
+    return {
+        "read_draft": SerializationCase(DRAFT_FULL_JSON, big_draft, legacy_model=DraftFull),
+        "list_drafts": SerializationCase(DRAFT_LIST_JSON, drafts),
+        "list_players": SerializationCase(PLAYER_LIST_JSON, _players(size)),
+        "list_round_matches": SerializationCase(MATCH_LIST_JSON, big_draft.rounds[0].matches * (size // pod_size)),
+        "list_users": SerializationCase(USER_LIST_JSON, users),
+    }
+
+
+async def legacy_dump(case: SerializationCase) -> bytes:
+    """What FastAPI does for `response_model=` routes: validate, `jsonable_encoder` and stdlib `json`."""
+    field = create_model_field(name="response", type_=case.adapter.type_, mode="serialization")
+    content = case.content
+    if case.legacy_model is not None:
+        content = case.legacy_model.model_validate(content)
+    body = JSONResponse(await serialize_response(field=field, response_content=content)).body
+    return bytes(body)
+
+
+def _run_legacy(loop: asyncio.AbstractEventLoop, case: SerializationCase) -> bytes:
+    return loop.run_until_complete(legacy_dump(case))
+
+
+def _time(dump: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        dump()
+    return (time.perf_counter() - start) / repeat
+
+
+def measure_serialization(size: int = 1000, pod_size: int = 12, repeat: int = 20) -> Dict[str, Any]:
+    """
+    Mean serialization time per endpoint payload through FastAPI's default path and through
+    the precompiled `JSONAdapter` the routers use.
+    """
+    loop = asyncio.new_event_loop()
+    results: Dict[str, Any] = {}
+    try:
+        for name, case in build_cases(size, pod_size).items():
+            body = case.adapter.dump(case.content)
+            legacy_seconds = _time(partial(_run_legacy, loop, case), repeat)
+            fast_seconds = _time(partial(case.adapter.dump, case.content), repeat)
+            results[name] = {
+                "bytes": len(body),
+                "legacy_ms": round(legacy_seconds * 1000, 3),
+                "fast_ms": round(fast_seconds * 1000, 3),
+                "speedup": round(legacy_seconds / fast_seconds, 2),
+            }
+    finally:
+        loop.close()
+    return {"meta": {"size": size, "pod_size": pod_size, "repeat": repeat}, "endpoints": results}
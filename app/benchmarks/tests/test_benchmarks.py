@@ -0,0 +1,84 @@
+import asyncio
+import json
+from typing import Any
+
+import pytest
+
+from app.benchmarks.algorithms import measure_projections, measure_seating
+from app.benchmarks.report import EndpointStats, compare_reports, percentile
+from app.benchmarks.serialization import build_cases, legacy_dump
+
+
+def make_report(p95: float, p99: float, throughput: float, errors: int = 0) -> dict[str, Any]:
+    return {
+        "endpoints": {
+            "read_draft": {
+                "requests": 100,
+                "errors": errors,
+                "throughput_rps": throughput,
+                "latency_ms": {"mean": 1.0, "p50": 1.0, "p95": p95, "p99": p99, "max": p99},
+            }
+        }
+    }
+
+
+class TestPercentile:
+    def test_empty(self) -> None:
+        assert percentile([], 50) == 0.0
+
+    def test_single_value(self) -> None:
+        assert percentile([5.0], 99) == 5.0
+
+    def test_interpolates(self) -> None:
+        values = [float(value) for value in range(1, 101)]
+        assert percentile(values, 50) == pytest.approx(50.5)
+        assert percentile(values, 99) == pytest.approx(99.01)
+        assert percentile(values, 100) == 100.0
+
+
+class TestEndpointStats:
+    def test_summary(self) -> None:
+        stats = EndpointStats(latencies=[0.001, 0.002, 0.003, 0.004], errors=1, shed=2)
+
+        summary = stats.summary(elapsed=2.0)
+
+        assert summary["requests"] == 4
+        assert summary["errors"] == 1
+        assert summary["shed"] == 2
+        assert summary["throughput_rps"] == 2.0
+        assert summary["latency_ms"]["p50"] == pytest.approx(2.5)
+        assert summary["latency_ms"]["max"] == pytest.approx(4.0)
+
+
+class TestCompareReports:
+    def test_no_regression_within_tolerance(self) -> None:
+        assert compare_reports(make_report(10, 20, 100), make_report(10.5, 21, 95), tolerance=0.1) == []
+
+    def test_latency_regression(self) -> None:
+        regressions = compare_reports(make_report(10, 20, 100), make_report(12, 20, 100), tolerance=0.1)
+        assert regressions == ["read_draft: p95 10.00ms -> 12.00ms"]
+
+    def test_throughput_and_error_regression(self) -> None:
+        regressions = compare_reports(make_report(10, 20, 100), make_report(10, 20, 80, errors=3), tolerance=0.1)
+        assert regressions == ["read_draft: throughput 100.0rps -> 80.0rps", "read_draft: errors 0 -> 3"]
+
+
+class TestSerialization:
+    @pytest.mark.parametrize("name", list(build_cases(size=24, pod_size=7)))
+    def test_fast_path_matches_fastapi(self, name: str) -> None:
+        case = build_cases(size=24, pod_size=7)[name]
+        assert json.loads(case.adapter.dump(case.content)) == json.loads(asyncio.run(legacy_dump(case)))
+
+
+class TestAlgorithms:
+    def test_seating_report(self) -> None:
+        report = measure_seating(player_count=6, budget_ms=1, repeat=2, seed=0)
+
+        assert report["players"] == 6
+        assert report["max_ms"] >= report["mean_ms"] > 0
+
+    def test_projections_report(self) -> None:
+        report = measure_projections(player_count=5, simulations=10, repeat=2, seed=0)
+
+        assert report["simulations"] == 10
+        assert report["max_ms"] >= report["mean_ms"] > 0
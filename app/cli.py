@@ -0,0 +1,133 @@
+import asyncio
+import os
+from datetime import date, timedelta
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Annotated, List, Literal, Optional
+
+import typer
+import uvicorn
+
+from app.config import settings
+from app.core.utils.archive import archive_drafts, restore_drafts
+from app.core.utils.generator import GeneratorSpec, GeneratorStats, generate_history
+from app.db.database import SessionLocal, engine
+from app.db.leagues import DEFAULT_LEAGUE_ID
+
+cli = typer.Typer(help="Draft MTG command line tools.", no_args_is_help=True)
+
+
+@cli.callback()
+def main() -> None:
+    """Draft MTG command line tools."""
+
+
+async def _generate(spec: GeneratorSpec) -> GeneratorStats:
+    try:
+        with typer.progressbar(range(spec.drafts), label="Generating drafts") as progress:
+            return await generate_history(engine, spec, on_progress=progress.update)
+    finally:
+        await engine.dispose()
+
+
+@cli.command()
+def generate(
+    players: Annotated[int, typer.Option(help="Number of new players")] = 100,
+    drafts: Annotated[int, typer.Option(help="Number of new drafts")] = 1000,
+    in_progress: Annotated[int, typer.Option(help="Newest drafts left partially played")] = 0,
+    seed: Annotated[Optional[int], typer.Option(help="Random seed, same seed gives the same history")] = None,
+    batch_size: Annotated[int, typer.Option(help="Drafts written per transaction")] = 500,
+    league_id: Annotated[int, typer.Option(help="League of the new players and drafts")] = DEFAULT_LEAGUE_ID,
+) -> None:
+    """Fill the configured database with a synthetic tournament history."""
+    spec = GeneratorSpec(
+        players=players, drafts=drafts, in_progress=in_progress, seed=seed, batch_size=batch_size, league_id=league_id
+    )
+    stats = asyncio.run(_generate(spec))
+    typer.echo(
+        f"Inserted {stats.players} players, {stats.drafts} drafts, {stats.draft_players} draft players, "
+        f"{stats.rounds} rounds and {stats.matches} matches."
+    )
+    typer.echo(f"{stats.rows} rows in {stats.seconds:.1f}s ({stats.rows_per_second:,.0f} rows/s)")
+
+
+async def _archive(before: date, directory: Path, batch_size: int) -> int:
+    try:
+        async with SessionLocal() as db:
+            return await archive_drafts(db, before, directory, batch_size)
+    finally:
+        await engine.dispose()
+
+
+@cli.command()
+def archive(
+    older_than_days: Annotated[
+        Optional[int], typer.Option(help="Archive finished drafts older than this, defaults to ARCHIVE_AFTER_DAYS")
+    ] = None,
+    directory: Annotated[Optional[Path], typer.Option(help="Archive directory, defaults to ARCHIVE_DIR")] = None,
+    batch_size: Annotated[int, typer.Option(help="Drafts moved per transaction")] = settings.ARCHIVE_BATCH_SIZE,
+) -> None:
+    """Move finished drafts out of the live tables into per-season archive files."""
+    before = date.today() - timedelta(days=older_than_days or settings.ARCHIVE_AFTER_DAYS)
+    archived = asyncio.run(_archive(before, directory or Path(settings.ARCHIVE_DIR), batch_size))
+    typer.echo(f"Archived {archived} drafts played before {before}.")
+
+
+async def _restore(directory: Path, draft_ids: List[int] | None, season: int | None) -> int:
+    try:
+        async with SessionLocal() as db:
+            return await restore_drafts(db, directory, draft_ids, season)
+    finally:
+        await engine.dispose()
+
+
+@cli.command()
+def restore(
+    draft_ids: Annotated[Optional[List[int]], typer.Argument(help="Drafts to restore, all of them if omitted")] = None,
+    season: Annotated[Optional[int], typer.Option(help="Only drafts of this season (year)")] = None,
+    directory: Annotated[Optional[Path], typer.Option(help="Archive directory, defaults to ARCHIVE_DIR")] = None,
+) -> None:
+    """Move archived drafts back into the live tables."""
+    try:
+        restored = asyncio.run(_restore(directory or Path(settings.ARCHIVE_DIR), draft_ids or None, season))
+    except ValueError as err:
+        typer.echo(str(err), err=True)
+        raise typer.Exit(1) from err
+    typer.echo(f"Restored {restored} drafts.")
+
+
+def available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+@cli.command()
+def serve(
+    host: Annotated[str, typer.Option(help="Bind socket to this host")] = "0.0.0.0",
+    port: Annotated[int, typer.Option(help="Bind socket to this port")] = 8000,
+    workers: Annotated[
+        Optional[int], typer.Option(help="Worker processes, defaults to WORKERS or the number of available cores")
+    ] = None,
+) -> None:
+    """Run the API in production mode with several worker processes."""
+    worker_count = workers or settings.WORKERS or available_cores()
+    loop: Literal["uvloop", "asyncio"] = "uvloop" if find_spec("uvloop") else "asyncio"
+    http: Literal["httptools", "h11"] = "httptools" if find_spec("httptools") else "h11"
+    typer.echo(f"Starting {worker_count} workers on {host}:{port} (loop={loop}, http={http})")
+
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=worker_count,
+        loop=loop,
+        http=http,
+        proxy_headers=True,
+        access_log=settings.DEBUG,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    cli()
@@ -14,8 +14,64 @@ class Settings(BaseSettings):
     # Database settings
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
+    POSTGRES_HOST: str = "db"
     POSTGRES_PORT: str = "5432"
     POSTGRES_DB: str = "postgres"
+    DB_POOL_SIZE: int = 5  # Connections kept open by every worker process
+    DB_MAX_OVERFLOW: int = 10
+
+    # Server settings
+    WORKERS: int | None = None  # Defaults to the number of available cores
+    GRACEFUL_SHUTDOWN_SECONDS: int = 30
+
+    # Compression settings
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Smaller bodies are sent as they are
+    COMPRESSION_CONTENT_TYPES: list[str] = ["application/json", "text/csv", "application/x-ndjson"]
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4  # Used when the `brotli` package is installed
+    COMPRESSION_CACHE_SIZE: int = 256  # Compressed bodies kept by every worker process
+
+    # Batch reads settings
+    BATCH_MAX_IDS: int = 100  # Most ids a single `?ids=` request may ask for
+
+    # Idempotency settings
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60  # How long responses are replayed
+    IDEMPOTENCY_WAIT_SECONDS: int = 30  # How long a duplicate waits for the first request
+    IDEMPOTENCY_POLL_SECONDS: float = 0.1
+    IDEMPOTENCY_LOCK_SECONDS: int = 5 * 60  # Older unfinished requests are taken to have died
+    IDEMPOTENCY_CLEANUP_SECONDS: int = 60 * 60  # Interval of the expired keys cleanup
+
+    # Seating optimizer settings
+    SEATING_SEARCH_MS: int = 25  # Time budget of a single seating search
+    SEATING_HISTORY_DRAFTS: int = 100  # Most recent drafts whose pairings count
+
+    # Archive settings
+    ARCHIVE_DIR: str = "archive"  # Per-season archive files and their index
+    ARCHIVE_AFTER_DAYS: int = 365  # Finished drafts older than this are archived
+    ARCHIVE_BATCH_SIZE: int = 200  # Drafts moved per transaction
+
+    # Partitioning settings
+    PARTITIONS_AHEAD_YEARS: int = 1  # Yearly partitions of rounds and matches created in advance
+    PARTITIONS_CHECK_SECONDS: int = 24 * 60 * 60
+
+    # Admission control settings, limits are per worker process
+    ADMISSION_READ_LIMIT: int = 32  # Most concurrent GET requests
+    ADMISSION_WRITE_LIMIT: int = 8  # Most concurrent POST, PUT, PATCH and DELETE requests
+    ADMISSION_AUTH_LIMIT: int = 4  # Most concurrent login and user requests, bcrypt is CPU bound
+    ADMISSION_QUEUE_SIZE: int = 64  # Requests of a class waiting for a slot, more are rejected at once
+    ADMISSION_QUEUE_SECONDS: float = 5.0  # Longest wait for a slot, well below the proxy's read timeout
+    ADMISSION_TARGET_POOL_WAIT_MS: float = 20.0  # Limits shrink while checkouts wait longer on average
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Sync settings
+    SYNC_TOMBSTONE_DAYS: int = 90  # Deletes are kept this long, older sync tokens have to sync from scratch
+    SYNC_CLEANUP_SECONDS: int = 60 * 60  # Interval of the expired tombstones cleanup
+    SYNC_PAGE_SIZE: int = 1000  # Default most rows of each table in a sync response
+
+    # Response cache settings
+    RESPONSE_CACHE_SIZE: int = 1024  # Draft and player responses kept by every worker process
+    INVALIDATION_PING_SECONDS: float = 30.0  # Interval of the listener connection health check
+    INVALIDATION_RECONNECT_SECONDS: float = 1.0  # First reconnect delay, doubled up to 30 times as long
 
     # CORS settings
     ORIGINS: list[str] = [
@@ -32,7 +88,10 @@ class Settings(BaseSettings):
 
     @property
     def DATABASE_URL(self) -> str:
-        return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@db:5432/{self.POSTGRES_DB}"
+        return (
+            f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        )
 
     model_config = SettingsConfigDict(
         env_file=".env",
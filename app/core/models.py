@@ -2,11 +2,15 @@ from datetime import date, datetime
 from enum import Enum
 
 from sqlalchemy import (  # pylint: disable=no-name-in-module,
+    BigInteger,
     CheckConstraint,
     Date,
     DateTime,
     ForeignKey,
+    ForeignKeyConstraint,
+    Index,
     Integer,
+    LargeBinary,
     String,
     func,
 )
@@ -18,6 +22,7 @@ from sqlalchemy.orm import (  # pylint: disable=no-name-in-module
 )
 
 from app.db.database import Base
+from app.db.leagues import LeagueScoped
 
 
 class MatchResult(str, Enum):
@@ -45,14 +50,46 @@ POINTS_MAP = {
 
 
 # pylint: disable=not-callable
-class Player(Base):
+class League(Base):
+    """A playgroup. Its players, drafts, rounds, matches and draft players are invisible to the others."""
+
+    __tablename__ = "leagues"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    slug: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+
+
+class LeagueMember(Base):
+    """A user who may write in a league. Anyone reads every league, admins write in all of them."""
+
+    __tablename__ = "league_members"
+
+    league_id: Mapped[int] = mapped_column(Integer, ForeignKey("leagues.id", ondelete="CASCADE"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+
+
+# pylint: disable=not-callable
+class Player(LeagueScoped, Base):
     __tablename__ = "players"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String, index=True, nullable=False, unique=True)
+    league_id: Mapped[int] = mapped_column(Integer, ForeignKey("leagues.id"), nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
 
+    # Queries are scoped to a league, so the indexes they use lead with league_id and only hold its rows
+    # in their range. (league_id, id) serves the list_players order and draft players' foreign key,
+    # the updated_at indexes serve GET /sync, their keys end with the tables' to page through ties.
+    __table_args__ = (
+        Index("ix_players_league_id_name", "league_id", "name", unique=True),
+        Index("ix_players_league_id_id", "league_id", "id", unique=True, postgresql_include=["updated_at"]),
+        Index("ix_players_league_id_updated_at_id", "league_id", "updated_at", "id"),
+    )
+
     # Add relationships for matches
     matches_as_player_1 = relationship("Match", back_populates="player_1", foreign_keys="Match.player_1_id")
     matches_as_player_2 = relationship("Match", back_populates="player_2", foreign_keys="Match.player_2_id")
@@ -61,65 +98,177 @@ class Player(Base):
 
 
 # pylint: disable=not-callable
-class Draft(Base):
+class Draft(LeagueScoped, Base):
     __tablename__ = "drafts"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
-    name: Mapped[str] = mapped_column(String, index=True, nullable=False, unique=True)
+    league_id: Mapped[int] = mapped_column(Integer, ForeignKey("leagues.id"), nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False)
     date: Mapped[date] = mapped_column(Date, default=func.current_date())
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
 
-    rounds = relationship("Round", back_populates="draft", cascade="all, delete-orphan")
-    draft_players = relationship("DraftPlayer", back_populates="draft", cascade="all, delete-orphan")
+    # Serves the list_drafts order, updated_at makes its ETag query an index-only scan
+    __table_args__ = (
+        Index("ix_drafts_league_id_name", "league_id", "name", unique=True),
+        Index("ix_drafts_league_id_date_id", "league_id", "date", "id", postgresql_include=["updated_at"]),
+        Index("ix_drafts_league_id_updated_at_id", "league_id", "updated_at", "id"),
+    )
+
+    # Deleting a draft cascades in the database, the ORM doesn't load the children to delete them
+    # Children load in a fixed order, updates move rows and the league_id criteria can change their plans
+    rounds = relationship(
+        "Round", back_populates="draft", cascade="all, delete-orphan", passive_deletes=True, order_by="Round.number"
+    )
+    draft_players = relationship(
+        "DraftPlayer",
+        back_populates="draft",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="DraftPlayer.player_id",
+    )
 
 
 # pylint: disable=not-callable
-class Round(Base):
+class Round(LeagueScoped, Base):
     __tablename__ = "rounds"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
     number: Mapped[int] = mapped_column(Integer, nullable=False)
-    draft_id: Mapped[int] = mapped_column(Integer, ForeignKey("drafts.id"), nullable=False)
+    draft_id: Mapped[int] = mapped_column(Integer, ForeignKey("drafts.id", ondelete="CASCADE"), nullable=False)
+    # Copy of draft.date, the partition key, which Postgres requires in the primary key
+    draft_date: Mapped[date] = mapped_column(Date, primary_key=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_rounds_draft_id", "draft_id", postgresql_include=["updated_at"]),
+        Index("ix_rounds_league_id_updated_at_id", "league_id", "updated_at", "id"),
+        {"postgresql_partition_by": "RANGE (draft_date)"},
+    )
+
     draft = relationship("Draft", back_populates="rounds")
-    matches = relationship("Match", back_populates="round", cascade="all, delete-orphan")
+    matches = relationship(
+        "Match", back_populates="round", cascade="all, delete-orphan", passive_deletes=True, order_by="Match.id"
+    )
 
 
 # pylint: disable=not-callable
-class DraftPlayer(Base):
+class DraftPlayer(LeagueScoped, Base):
     __tablename__ = "draft_players"
 
-    draft_id: Mapped[int] = mapped_column(Integer, ForeignKey("drafts.id"), primary_key=True)
-    player_id: Mapped[int] = mapped_column(Integer, ForeignKey("players.id"), primary_key=True)
+    draft_id: Mapped[int] = mapped_column(Integer, ForeignKey("drafts.id", ondelete="CASCADE"), primary_key=True)
+    player_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     deck_colors: Mapped[list[str]] = mapped_column(JSONB, default=[])
     points: Mapped[int] = mapped_column(Integer, default=0)
     final_place: Mapped[int] = mapped_column(Integer, nullable=True)
     order: Mapped[int] = mapped_column(Integer)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    # Bumped by every update, writes based on an older version are rejected
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+
+    # The primary key starts with draft_id, player lookups need their own index
+    __table_args__ = (
+        Index("ix_draft_players_player_id", "player_id"),
+        Index(
+            "ix_draft_players_league_id_updated_at_draft_id_player_id",
+            "league_id",
+            "updated_at",
+            "draft_id",
+            "player_id",
+        ),
+        # The player has to play in the draft's league
+        ForeignKeyConstraint(
+            ["league_id", "player_id"],
+            ["players.league_id", "players.id"],
+            name="draft_players_league_id_player_id_fkey",
+        ),
+    )
+    __mapper_args__ = {"version_id_col": version}
+
     draft = relationship("Draft", back_populates="draft_players")
     player = relationship("Player", back_populates="draft_players")
 
 
 # pylint: disable=not-callable
-class Match(Base):
+class Match(LeagueScoped, Base):
     __tablename__ = "matches"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
     player_1_id: Mapped[int] = mapped_column(Integer, ForeignKey("players.id"))
     player_2_id: Mapped[int] = mapped_column(Integer, ForeignKey("players.id"))
     score: Mapped[str] = mapped_column(String, nullable=True)
-    round_id: Mapped[int] = mapped_column(Integer, ForeignKey("rounds.id"))
+    round_id: Mapped[int] = mapped_column(Integer)
+    # Copy of round.draft_id, so draft-level queries don't have to join rounds
+    draft_id: Mapped[int] = mapped_column(Integer, ForeignKey("drafts.id", ondelete="CASCADE"), nullable=False)
+    # Copy of draft.date, the partition key, which Postgres requires in the primary key
+    draft_date: Mapped[date] = mapped_column(Date, primary_key=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+    # Bumped by every update, writes based on an older version are rejected
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
 
     # Add check constraint to ensure player_1_id != player_2_id and valid scores
     __table_args__ = (
         CheckConstraint("player_1_id != player_2_id", name="check_different_players"),
         CheckConstraint(f"score IN ({', '.join(repr(v.value) for v in MatchResult)})", name="check_valid_scores"),
+        Index("ix_matches_round_id", "round_id", postgresql_include=["updated_at"]),
+        Index("ix_matches_draft_id", "draft_id", postgresql_include=["updated_at"]),
+        Index("ix_matches_player_1_id", "player_1_id"),
+        Index("ix_matches_player_2_id", "player_2_id"),
+        Index("ix_matches_league_id_updated_at_id", "league_id", "updated_at", "id"),
+        ForeignKeyConstraint(
+            ["round_id", "draft_date"],
+            ["rounds.id", "rounds.draft_date"],
+            name="matches_round_id_fkey",
+            ondelete="CASCADE",
+        ),
+        {"postgresql_partition_by": "RANGE (draft_date)"},
     )
+    __mapper_args__ = {"version_id_col": version}
 
     round = relationship("Round", back_populates="matches")
     player_1 = relationship("Player", back_populates="matches_as_player_1", foreign_keys=[player_1_id])
     player_2 = relationship("Player", back_populates="matches_as_player_2", foreign_keys=[player_2_id])
+
+
+# pylint: disable=not-callable
+class IdempotencyKey(Base):
+    """Response of a write sent with an `Idempotency-Key` header, replayed to retries of it."""
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # Method, path and league of the request, a key is only unique per endpoint and league
+    endpoint: Mapped[str] = mapped_column(String, primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # NULL while the first request is still running
+    status_code: Mapped[int] = mapped_column(Integer, nullable=True)
+    media_type: Mapped[str] = mapped_column(String, nullable=True)
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    # Serves the TTL cleanup
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+
+# pylint: disable=not-callable
+class Tombstone(LeagueScoped, Base):
+    """
+    Id of a deleted draft or player, written by a trigger on their tables so `GET /sync` can report
+    deletes. The rounds, matches and draft players of a deleted draft go with it.
+    """
+
+    __tablename__ = "tombstones"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    table_name: Mapped[str] = mapped_column(String, nullable=False)
+    row_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+
+    # The first serves GET /sync, the second the cleanup of every league's tombstones
+    __table_args__ = (
+        Index("ix_tombstones_league_id_deleted_at", "league_id", "deleted_at"),
+        Index("ix_tombstones_deleted_at", "deleted_at"),
+    )
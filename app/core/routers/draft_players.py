@@ -1,49 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, contains_eager, selectinload
 
 from app.auth.models import User
-from app.auth.utils import get_current_active_user
+from app.auth.utils import get_current_league_member
 from app.core.models import DraftPlayer
 from app.core.schemas.draft_players import DraftPlayerSchema, DraftPlayerUpdate
-from app.db.database import get_db
+from app.core.utils.concurrency import expected_version, version_conflict
+from app.core.utils.invalidation import DRAFT, evict_after_commit, notify, tag
+from app.core.utils.responses import JSONAdapter
+from app.db.database import get_uow
 
 router = APIRouter(prefix="/draft-players", tags=["draft-players"])
 
+DRAFT_PLAYER_JSON = JSONAdapter(DraftPlayerSchema)
+
 
-@router.patch("/{draft_id}/{player_id}")
+@router.patch("/{draft_id}/{player_id}", response_model=DraftPlayerSchema)
 async def update_draft_player(
     draft_id: int,
     player_id: int,
     update_data: DraftPlayerUpdate,
-    db: AsyncSession = Depends(get_db),
-    _: User = Depends(get_current_active_user),
-) -> DraftPlayerSchema:
-    """Update a draft player's information with partial data."""
-    # Find the draft player
-    stmt = select(DraftPlayer).filter(DraftPlayer.draft_id == draft_id, DraftPlayer.player_id == player_id)
-    result = await db.execute(stmt)
+    if_match: Annotated[str | None, Header(description="Version the update is based on")] = None,
+    db: AsyncSession = Depends(get_uow),
+    _: User = Depends(get_current_league_member),
+) -> Response:
+    """
+    Update a draft player's information with partial data. With `If-Match` or `version` the update
+    is only written if the draft player is still at that version, otherwise the response is a 409
+    with the current draft player.
+    """
+    version = expected_version(if_match, update_data.version)
+    # Update only the fields that were provided, in one compare-and-swap statement
+    stmt = (
+        update(DraftPlayer)
+        .filter(DraftPlayer.draft_id == draft_id, DraftPlayer.player_id == player_id)
+        .values(**update_data.model_dump(exclude_unset=True, exclude={"version"}), version=DraftPlayer.version + 1)
+        .returning(*DraftPlayer.__table__.c, notify(DRAFT, DraftPlayer.draft_id))
+    )
+    if version is not None:
+        stmt = stmt.filter(DraftPlayer.version == version)
+    # The updated row joined with its player, one round trip for the update and the response
+    updated = aliased(DraftPlayer, stmt.cte("updated"))
+    result = await db.execute(
+        select(updated).join(updated.player).options(contains_eager(updated.player)),
+        execution_options={"populate_existing": True},
+    )
     db_draft_player = result.scalar()
-
-    if db_draft_player is None:
+    if db_draft_player is not None:
+        evict_after_commit(db, tag(DRAFT, draft_id))
+        return DRAFT_PLAYER_JSON.response(db_draft_player)
+    if version is None:
         raise HTTPException(status_code=404, detail="Draft player not found")
 
-    # Update only the fields that were provided (not None)
-    update_dict = update_data.model_dump(exclude_unset=True)
-    for field, value in update_dict.items():
-        setattr(db_draft_player, field, value)
-
-    await db.commit()
-    await db.refresh(db_draft_player)
-
-    # Reload with player relationship to avoid MissingGreenlet error
-    stmt = (
+    # Nothing matched the version, tell apart a missing draft player from a conflict
+    current = await db.execute(
         select(DraftPlayer)
         .options(selectinload(DraftPlayer.player))
         .filter(DraftPlayer.draft_id == draft_id, DraftPlayer.player_id == player_id)
     )
-    result = await db.execute(stmt)
-    db_draft_player_with_player = result.scalar()
-
-    return DraftPlayerSchema.model_validate(db_draft_player_with_player)
+    db_draft_player = current.scalar()
+    if db_draft_player is None:
+        raise HTTPException(status_code=404, detail="Draft player not found")
+    raise version_conflict(DRAFT_PLAYER_JSON.jsonable(db_draft_player))
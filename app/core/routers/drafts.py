@@ -1,81 +1,101 @@
-from typing import Any
+from datetime import date
+from pathlib import Path
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, inspect, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.auth.models import User
-from app.auth.utils import get_current_active_user, get_current_admin_user
-from app.core.models import Draft, DraftPlayer, Match, Round
-from app.core.schemas.drafts import DraftCreate, DraftFull, DraftList
+from app.auth.utils import get_current_active_user, get_current_admin_user, get_current_league_member
+from app.config import settings
+from app.core.models import Draft, DraftPlayer, Match, MatchResult, Round
+from app.core.schemas.batch import Batch
+from app.core.schemas.drafts import DraftCreate, DraftFull, DraftList, SeatingRequest, SeatingSuggestion
+from app.core.schemas.projections import DraftProjections, PlayerProjection
+from app.core.utils.archive import read_archived_draft
+from app.core.utils.batch import get_batch_ids, id_in, read_batch
+from app.core.utils.coalescing import coalesced
 from app.core.utils.drafts import calculate_points, populate_draft
+from app.core.utils.etags import draft_validators, page_validators, row_version
+from app.core.utils.fieldsets import Fieldset, View, get_fieldset
+from app.core.utils.idempotency import idempotent
+from app.core.utils.invalidation import (
+    DRAFT,
+    PLAYER,
+    CachedResponse,
+    evict_after_commit,
+    notify,
+    publish,
+    response_cache,
+    tag,
+)
 from app.core.utils.pagination import PaginationParams, get_pagination_params
-from app.db.database import get_db
+from app.core.utils.projections import OUTCOMES, OutcomeModel, historical_rates, outcome_probabilities, simulate
+from app.core.utils.responses import JSONAdapter
+from app.core.utils.seating import suggest_seating
+from app.db.database import get_db, get_uow
+from app.db.leagues import league_of
 
 router = APIRouter(prefix="/drafts", tags=["drafts"])
 
+DRAFT_FULL_JSON = JSONAdapter(DraftFull)
+DRAFT_LIST_JSON = JSONAdapter(list[DraftList])
+DRAFT_PROJECTIONS_JSON = JSONAdapter(DraftProjections)
+SEATING_JSON = JSONAdapter(SeatingSuggestion)
+DRAFT_FULL_VIEW = View(Draft, DraftFull, DRAFT_FULL_JSON)
+DRAFT_LIST_VIEW = View(Draft, DraftList, DRAFT_LIST_JSON, container=list)
+DRAFT_BATCH_VIEW = View(Draft, DraftFull, JSONAdapter(Batch[DraftFull]), container=Batch)
 
-@router.post("")
+
+def _draft_tags(db_draft: Draft) -> list[str]:
+    """Tags of a draft response: the draft and the players whose names it embeds."""
+    player_ids: set[int] = set()
+    if "draft_players" not in inspect(db_draft).unloaded:
+        player_ids.update(draft_player.player_id for draft_player in db_draft.draft_players)
+    elif "rounds" not in inspect(db_draft).unloaded:
+        for db_round in db_draft.rounds:
+            if "matches" not in inspect(db_round).unloaded:
+                player_ids.update(id_ for match in db_round.matches for id_ in (match.player_1_id, match.player_2_id))
+    return [tag(DRAFT, db_draft.id), *(tag(PLAYER, player_id) for player_id in sorted(player_ids))]
+
+
+@router.post("", response_model=DraftFull)
+@idempotent
 async def create_draft(
-    draft: DraftCreate, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_active_user)
-) -> DraftFull:
+    draft: DraftCreate, db: AsyncSession = Depends(get_uow), _: User = Depends(get_current_league_member)
+) -> Response:
     """
     Order of player ids is the order in which the players will play in first round, meaning
-    1v2, 3v4, 5v6, etc.
+    1v2, 3v4, 5v6, etc. With `optimize_seating` the order is chosen by `suggest_seating` instead.
+    The draft, its players, rounds and matches are committed together or not at all.
     """
+    player_ids = draft.player_ids
+    if draft.optimize_seating and len(set(player_ids)) == len(player_ids):
+        player_ids = (await suggest_seating(db, player_ids)).player_ids
+
+    db_draft = Draft(
+        name=draft.name,
+        date=draft.date,
+        draft_players=[DraftPlayer(player_id=player_id, order=index + 1) for index, player_id in enumerate(player_ids)],
+    )
+    db.add(db_draft)
     try:
-        db_draft = Draft(name=draft.name, date=draft.date)
-        db.add(db_draft)
-        await db.commit()
-        await db.refresh(db_draft)
-
-        for index, player_id in enumerate(draft.player_ids):
-            draft_player = DraftPlayer(
-                draft_id=db_draft.id,
-                player_id=player_id,
-                order=index + 1,
-            )
-            db.add(draft_player)
-
-            await db.commit()
+        await db.flush()
     except IntegrityError as err:
-        await db.rollback()
         raise HTTPException(status_code=400, detail="Draft name already exists or wrong player ids") from err
 
-    # Reload with relationships
-    stmt = select(Draft).options(selectinload(Draft.draft_players)).filter(Draft.id == db_draft.id)
-    result = await db.execute(stmt)
-    db_draft_with_players = result.scalar()
-    if db_draft_with_players is None:
-        raise HTTPException(status_code=500, detail="Failed to reload draft")
-
     try:
-        await populate_draft(db_draft_with_players, db)
-        # Load draft with all nested relationships like read_draft does
-        stmt = (
-            select(Draft)
-            .options(
-                selectinload(Draft.rounds).selectinload(Round.matches).selectinload(Match.player_1),
-                selectinload(Draft.rounds).selectinload(Round.matches).selectinload(Match.player_2),
-                selectinload(Draft.draft_players).selectinload(DraftPlayer.player),
-            )
-            .filter(Draft.id == db_draft.id)
-        )
-
-        result = await db.execute(stmt)
-        db_draft_full = result.scalar()
-
-        return DraftFull.model_validate(db_draft_full)
+        await populate_draft(db_draft, db)
     except Exception as err:
-        await db.rollback()
         raise HTTPException(status_code=400, detail="Failed to populate draft") from err
 
-
-@router.get("/{draft_id}")
-async def read_draft(draft_id: int, db: AsyncSession = Depends(get_db)) -> DraftFull:
-    # Load draft with all nested relationships
+    # Load draft with all nested relationships like read_draft does
     stmt = (
         select(Draft)
         .options(
@@ -83,48 +103,221 @@ async def read_draft(draft_id: int, db: AsyncSession = Depends(get_db)) -> Draft
             selectinload(Draft.rounds).selectinload(Round.matches).selectinload(Match.player_2),
             selectinload(Draft.draft_players).selectinload(DraftPlayer.player),
         )
-        .filter(Draft.id == draft_id)
+        .filter(Draft.id == db_draft.id)
+        .execution_options(populate_existing=True)
     )
+    result = await db.execute(stmt)
+    publish(db, tag(DRAFT, db_draft.id))
+    return DRAFT_FULL_JSON.response(result.scalar())
+
+
+@router.post("/seating", response_model=SeatingSuggestion)
+async def get_seating(
+    seating: SeatingRequest, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_active_user)
+) -> Response:
+    """
+    Seating order for a new draft that avoids the pairings the players had in their last drafts,
+    weighing repeats in the first rounds the most.
+    """
+    if len(set(seating.player_ids)) != len(seating.player_ids):
+        raise HTTPException(status_code=400, detail="Duplicate player ids")
+
+    suggestion = await suggest_seating(db, seating.player_ids, seating.seed)
+    return SEATING_JSON.response(suggestion)
+
+
+@router.get("/{draft_id}", response_model=DraftFull)
+@coalesced
+async def read_draft(
+    draft_id: int,
+    request: Request,
+    fieldset: Fieldset = Depends(get_fieldset),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Draft with its rounds, matches and standings. `include=draft_players.player` returns just the
+    standings, `fields` trims the fields of every level. Archived drafts are read from the archive.
+    Live drafts are served from the worker's response cache until a write invalidates them.
+    """
+    fieldset = DRAFT_FULL_VIEW.resolve(fieldset)
+    key = ("draft", league_of(db), draft_id, fieldset)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached.response(request)
+
+    generation = response_cache.generation
+    validators = await draft_validators(db, draft_id)
+    if validators is None:
+        # Not live, it may have been archived
+        archived = await read_archived_draft(db, Path(settings.ARCHIVE_DIR), draft_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Draft not found")
+        return DRAFT_FULL_VIEW.adapter(fieldset).response(archived)
+    if validators.is_fresh(request):
+        return validators.not_modified()
+
+    # Load only the relationships the response embeds
+    stmt = select(Draft).options(*DRAFT_FULL_VIEW.loader_options(fieldset)).filter(Draft.id == draft_id)
 
     result = await db.execute(stmt)
     db_draft = result.scalar()
     if db_draft is None:
         raise HTTPException(status_code=404, detail="Draft not found")
-    return DraftFull.model_validate(db_draft)
+    response = DRAFT_FULL_VIEW.adapter(fieldset).response(db_draft, headers=validators.headers)
+    response_cache.put(key, CachedResponse.of(validators, response), _draft_tags(db_draft), generation)
+    return response
 
 
-@router.get("", response_model=list[DraftList])
+@router.get("", response_model=list[DraftList] | Batch[DraftFull])
+@coalesced
 async def list_drafts(
-    pagination: PaginationParams = Depends(get_pagination_params), db: AsyncSession = Depends(get_db)
-) -> Any:
-    stmt = select(Draft).offset(pagination.skip).limit(pagination.limit).order_by(Draft.date.desc())
+    request: Request,
+    ids: list[int] | None = Depends(get_batch_ids),
+    pagination: PaginationParams = Depends(get_pagination_params),
+    fieldset: Fieldset = Depends(get_fieldset),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Page of drafts, newest first. `ids` reads exactly those drafts instead, like `read_draft` would,
+    in request order and with the ids that don't exist under `missing`.
+    """
+    if ids is not None:
+        return await read_batch(db, DRAFT_BATCH_VIEW, DRAFT_BATCH_VIEW.resolve(fieldset), ids)
+
+    fieldset = DRAFT_LIST_VIEW.resolve(fieldset)
+    stmt = select(Draft).offset(pagination.skip).limit(pagination.limit).order_by(Draft.date.desc(), Draft.id.desc())
+    validators = await page_validators(
+        db, "drafts", stmt.with_only_columns(Draft.id, row_version(Draft), Draft.updated_at)
+    )
+    if validators.is_fresh(request):
+        return validators.not_modified()
 
     result = await db.execute(stmt)
     drafts = result.scalars().all()
-    return drafts
+    return DRAFT_LIST_VIEW.adapter(fieldset).response(drafts, headers=validators.headers)
 
 
 @router.delete("/{draft_id}")
 async def delete_draft(
-    draft_id: int, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_admin_user)
+    draft_id: int, db: AsyncSession = Depends(get_uow), _: User = Depends(get_current_admin_user)
 ) -> dict[str, str]:
-    result = await db.execute(select(Draft).filter(Draft.id == draft_id))
-    db_draft = result.scalar()
-    if db_draft is None:
+    """Rounds, matches and draft players go with the draft through ON DELETE CASCADE."""
+    result = await db.execute(delete(Draft).filter(Draft.id == draft_id).returning(Draft.id, notify(DRAFT, Draft.id)))
+    if result.scalar() is None:
         raise HTTPException(status_code=404, detail="Draft not found")
-
-    await db.delete(db_draft)
-    await db.commit()
+    evict_after_commit(db, tag(DRAFT, draft_id))
     return {"message": "Draft deleted successfully"}
 
 
+@router.delete("")
+async def delete_drafts(
+    ids: list[int] | None = Depends(get_batch_ids),
+    since: Annotated[date | None, Query(description="Only drafts played on or after this date")] = None,
+    until: Annotated[date | None, Query(description="Only drafts played on or before this date")] = None,
+    db: AsyncSession = Depends(get_uow),
+    _: User = Depends(get_current_admin_user),
+) -> dict[str, int]:
+    """
+    Delete the drafts with the given `ids` and/or played between `since` and `until` in one statement,
+    the database cascades to their rounds, matches and draft players.
+    """
+    if ids is None and since is None and until is None:
+        raise HTTPException(status_code=400, detail="ids, since or until is required")
+
+    stmt = delete(Draft).returning(Draft.id, notify(DRAFT, Draft.id)).execution_options(synchronize_session=False)
+    if ids is not None:
+        stmt = stmt.filter(id_in(Draft.id, ids))
+    if since is not None:
+        stmt = stmt.filter(Draft.date >= since)
+    if until is not None:
+        stmt = stmt.filter(Draft.date <= until)
+    result = await db.execute(stmt)
+    deleted = result.scalars().all()
+    evict_after_commit(db, *(tag(DRAFT, draft_id) for draft_id in deleted))
+    return {"deleted": len(deleted)}
+
+
 @router.post("/{draft_id}/results")
-async def get_results(draft_id: int, db: AsyncSession = Depends(get_db)) -> dict[str, str]:
+@idempotent
+async def get_results(
+    draft_id: int, db: AsyncSession = Depends(get_uow), _: User = Depends(get_current_league_member)
+) -> dict[str, str]:
     result = await db.execute(select(Draft).filter(Draft.id == draft_id))
     db_draft = result.scalar()
     if db_draft is None:
         raise HTTPException(status_code=404, detail="Draft not found")
 
-    await calculate_points(db_draft, db)
+    try:
+        await calculate_points(db_draft, db)
+    except StaleDataError as err:
+        # A draft player was updated after the points were read, its version no longer matches
+        raise HTTPException(status_code=409, detail="Draft players changed meanwhile, retry the results") from err
+    publish(db, tag(DRAFT, draft_id))
 
     return {"message": "Draft results calculated successfully"}
+
+
+@router.get("/{draft_id}/projections", response_model=DraftProjections)
+async def get_projections(
+    draft_id: int,
+    simulations: Annotated[int, Query(ge=100, le=100_000, description="Number of simulated endings")] = 10_000,
+    model: OutcomeModel = OutcomeModel.HISTORY,
+    seed: int | None = None,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Placement odds of every player, simulating the open matches with win rates from the players'
+    history (or uniform outcomes) and ranking like `calculate_points`.
+    """
+    stmt = (
+        select(Draft)
+        .options(selectinload(Draft.draft_players).selectinload(DraftPlayer.player))
+        .filter(Draft.id == draft_id)
+    )
+    result = await db.execute(stmt)
+    db_draft = result.scalar()
+    if db_draft is None:
+        raise HTTPException(status_code=404, detail="Draft not found")
+
+    draft_players = sorted(db_draft.draft_players, key=lambda x: x.order or float("inf"))
+    player_ids = [draft_player.player_id for draft_player in draft_players]
+    matches_result = await db.execute(
+        select(Match.player_1_id, Match.player_2_id, Match.score).filter(Match.draft_id == draft_id).order_by(Match.id)
+    )
+    matches = [
+        (player_1_id, player_2_id, score or MatchResult.BASE.value)
+        for player_1_id, player_2_id, score in matches_result
+    ]
+    open_matches = [match for match in matches if match[2] == MatchResult.BASE.value]
+
+    if model == OutcomeModel.HISTORY:
+        win_rates, full_win_share = await historical_rates(db, player_ids)
+        probabilities = outcome_probabilities(
+            [match[0] for match in open_matches], [match[1] for match in open_matches], win_rates, full_win_share
+        )
+    else:
+        probabilities = np.full((len(open_matches), len(OUTCOMES)), 1 / len(OUTCOMES))
+
+    # CPU bound, keep the event loop free for other requests
+    projection = await run_in_threadpool(
+        simulate, player_ids, matches, probabilities, simulations, np.random.default_rng(seed)
+    )
+    players = [
+        PlayerProjection(
+            player=draft_player.player,
+            current_points=int(projection.current_points[i]),
+            expected_points=round(float(projection.expected_points[i]), 2),
+            place_probabilities=[round(float(p), 4) for p in projection.place_probabilities[i]],
+            top_3=round(float(projection.place_probabilities[i, :3].sum()), 4),
+        )
+        for i, draft_player in enumerate(draft_players)
+    ]
+    return DRAFT_PROJECTIONS_JSON.response(
+        DraftProjections(
+            draft_id=draft_id,
+            model=model,
+            simulations=simulations,
+            open_matches=len(open_matches),
+            players=players,
+        )
+    )
@@ -0,0 +1,75 @@
+from datetime import date
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app.core.models import Draft, DraftPlayer, Match, Player, Round
+from app.core.utils.exports import ExportFormat, export_response
+from app.db.database import get_league_id
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/matches")
+async def export_matches(
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.CSV,
+    since: Annotated[date | None, Query(description="Only drafts played on or after this date")] = None,
+    league_id: int = Depends(get_league_id),
+) -> StreamingResponse:
+    """Stream every match with its draft, round and player names, optionally of drafts played since a date."""
+    player_1 = aliased(Player)
+    player_2 = aliased(Player)
+    stmt = (
+        select(
+            Match.id.label("match_id"),
+            Match.draft_id,
+            Draft.name.label("draft_name"),
+            Draft.date.label("draft_date"),
+            Round.number.label("round_number"),
+            Match.player_1_id,
+            player_1.name.label("player_1_name"),
+            Match.player_2_id,
+            player_2.name.label("player_2_name"),
+            Match.score,
+        )
+        .join(Draft, Draft.id == Match.draft_id)
+        .join(Round, (Round.id == Match.round_id) & (Round.draft_date == Match.draft_date))
+        .join(player_1, player_1.id == Match.player_1_id)
+        .join(player_2, player_2.id == Match.player_2_id)
+        .order_by(Match.id)
+    )
+    if since is not None:
+        # Filtering on the partition key skips the partitions of older years
+        stmt = stmt.where(Draft.date >= since, Match.draft_date >= since, Round.draft_date >= since)
+    return export_response(stmt, export_format, "matches", league_id)
+
+
+@router.get("/drafts")
+async def export_drafts(
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.CSV,
+    since: Annotated[date | None, Query(description="Only drafts played on or after this date")] = None,
+    league_id: int = Depends(get_league_id),
+) -> StreamingResponse:
+    """Stream one row per player of every draft with points, final place and deck colors."""
+    stmt = (
+        select(
+            Draft.id.label("draft_id"),
+            Draft.name.label("draft_name"),
+            Draft.date.label("draft_date"),
+            DraftPlayer.player_id,
+            Player.name.label("player_name"),
+            DraftPlayer.order,
+            DraftPlayer.points,
+            DraftPlayer.final_place,
+            DraftPlayer.deck_colors,
+        )
+        .join(DraftPlayer, DraftPlayer.draft_id == Draft.id)
+        .join(Player, Player.id == DraftPlayer.player_id)
+        .order_by(Draft.id, DraftPlayer.order)
+    )
+    if since is not None:
+        stmt = stmt.where(Draft.date >= since)
+    return export_response(stmt, export_format, "drafts", league_id)
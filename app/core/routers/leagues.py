@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.models import User
+from app.auth.utils import get_current_admin_user
+from app.core.models import League, LeagueMember
+from app.core.schemas.leagues import LeagueCreate, LeagueMemberCreate, LeagueMemberSchema, LeagueSchema
+from app.core.utils.idempotency import idempotent
+from app.core.utils.responses import JSONAdapter
+from app.db.database import get_db, get_uow
+
+router = APIRouter(prefix="/leagues", tags=["leagues"])
+
+LEAGUE_JSON = JSONAdapter(LeagueSchema)
+LEAGUE_LIST_JSON = JSONAdapter(list[LeagueSchema])
+LEAGUE_MEMBER_JSON = JSONAdapter(LeagueMemberSchema)
+
+
+@router.post("", response_model=LeagueSchema)
+@idempotent
+async def create_league(
+    league: LeagueCreate, db: AsyncSession = Depends(get_uow), _: User = Depends(get_current_admin_user)
+) -> Response:
+    """A new, empty league. Requests work in it with its slug in the `X-League` header."""
+    db_league = League(slug=league.slug, name=league.name)
+    db.add(db_league)
+    try:
+        await db.flush()
+        return LEAGUE_JSON.response(db_league)
+    except IntegrityError as err:
+        raise HTTPException(status_code=400, detail="League slug already exists") from err
+
+
+@router.get("", response_model=list[LeagueSchema])
+async def list_leagues(db: AsyncSession = Depends(get_db)) -> Response:
+    result = await db.execute(select(League).order_by(League.id))
+    return LEAGUE_LIST_JSON.response(result.scalars().all())
+
+
+@router.post("/{league_id}/members", response_model=LeagueMemberSchema)
+async def add_league_member(
+    league_id: int,
+    member: LeagueMemberCreate,
+    db: AsyncSession = Depends(get_uow),
+    _: User = Depends(get_current_admin_user),
+) -> Response:
+    """Let a user write in the league. Adding a member twice is a no-op."""
+    stmt = (
+        insert(LeagueMember)
+        .values(league_id=league_id, user_id=member.user_id)
+        .on_conflict_do_nothing(index_elements=[LeagueMember.league_id, LeagueMember.user_id])
+    )
+    try:
+        await db.execute(stmt)
+    except IntegrityError as err:
+        raise HTTPException(status_code=404, detail="League or user not found") from err
+    return LEAGUE_MEMBER_JSON.response({"league_id": league_id, "user_id": member.user_id})
+
+
+@router.delete("/{league_id}/members/{user_id}")
+async def remove_league_member(
+    league_id: int, user_id: int, db: AsyncSession = Depends(get_uow), _: User = Depends(get_current_admin_user)
+) -> dict[str, str]:
+    result = await db.execute(
+        delete(LeagueMember).where(LeagueMember.league_id == league_id, LeagueMember.user_id == user_id)
+    )
+    if not result.rowcount:  # type: ignore[attr-defined]
+        raise HTTPException(status_code=404, detail="Member not found")
+    return {"message": "Member removed successfully"}
@@ -1,30 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.auth.models import User
-from app.auth.utils import get_current_active_user
+from app.auth.utils import get_current_league_member
 from app.core.models import Match
-from app.core.schemas.matches import MatchScoreUpdate
-from app.db.database import get_db
+from app.core.schemas.matches import MatchSchema, MatchScoreUpdate
+from app.core.utils.concurrency import expected_version, version_conflict
+from app.core.utils.idempotency import idempotent
+from app.core.utils.invalidation import DRAFT, evict_after_commit, notify, tag
+from app.core.utils.responses import JSONAdapter
+from app.db.database import get_uow
 
 router = APIRouter(prefix="/matches", tags=["matches"])
 
+MATCH_JSON = JSONAdapter(MatchSchema)
+
 
 @router.put("/{match_id}")
+@idempotent
 async def set_score(
     match_id: int,
     match_update: MatchScoreUpdate,
-    db: AsyncSession = Depends(get_db),
-    _: User = Depends(get_current_active_user),
-) -> dict[str, str]:
-    stmt = select(Match).filter(Match.id == match_id)
+    if_match: Annotated[str | None, Header(description="Version the update is based on")] = None,
+    db: AsyncSession = Depends(get_uow),
+    _: User = Depends(get_current_league_member),
+) -> dict[str, Any]:
+    """
+    Compare-and-swap score update. With `If-Match` or `version` the score is only written if the
+    match is still at that version, otherwise the response is a 409 with the current match.
+    """
+    version = expected_version(if_match, match_update.version)
+    stmt = (
+        update(Match)
+        .filter(Match.id == match_id)
+        .values(score=match_update.score.value, version=Match.version + 1)
+        .returning(Match.version, Match.draft_id, notify(DRAFT, Match.draft_id))
+        .execution_options(synchronize_session=False)
+    )
+    if version is not None:
+        stmt = stmt.filter(Match.version == version)
     result = await db.execute(stmt)
-    db_match = result.scalar()
-    if db_match is None:
-        raise HTTPException(status_code=404, detail="Match not found")
+    updated = result.first()
 
-    db_match.score = match_update.score
+    if updated is None:
+        if version is None:
+            raise HTTPException(status_code=404, detail="Match not found")
+        # Nothing matched the version, tell apart a missing match from a conflict
+        current = await db.execute(
+            select(Match)
+            .options(selectinload(Match.player_1), selectinload(Match.player_2))
+            .filter(Match.id == match_id)
+        )
+        db_match = current.scalar()
+        if db_match is None:
+            raise HTTPException(status_code=404, detail="Match not found")
+        raise version_conflict(MATCH_JSON.jsonable(db_match))
 
-    await db.commit()
-    return {"message": "Match score updated successfully"}
+    evict_after_commit(db, tag(DRAFT, updated.draft_id))
+    return {"message": "Match score updated successfully", "version": updated.version}
@@ -0,0 +1,20 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.auth.models import User
+from app.auth.utils import get_current_admin_user
+from app.core.utils.coalescing import single_flight
+from app.core.utils.invalidation import response_cache
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def read_metrics(_: User = Depends(get_current_admin_user)) -> Dict[str, Any]:
+    """
+    Counters of the worker process that answers. `coalescing` has per endpoint how many requests
+    ran it and how many shared the response of an identical request that was already running.
+    `response_cache` has the hits, misses and evictions of the worker's draft and player responses.
+    """
+    return {"coalescing": single_flight.stats(), "response_cache": response_cache.stats()}
@@ -1,74 +1,111 @@
 from collections import defaultdict
-from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.models import User
-from app.auth.utils import get_current_active_user, get_current_admin_user
+from app.auth.utils import get_current_admin_user, get_current_league_member
 from app.core.models import Draft, DraftPlayer, Match, Player
+from app.core.schemas.batch import Batch
 from app.core.schemas.players import PlayerCreate, PlayerSchema
+from app.core.utils.batch import get_batch_ids, read_batch
+from app.core.utils.etags import page_validators, player_validators, row_version
+from app.core.utils.fieldsets import Fieldset, View, get_fieldset
+from app.core.utils.idempotency import idempotent
+from app.core.utils.invalidation import PLAYER, CachedResponse, evict_after_commit, notify, publish, response_cache, tag
 from app.core.utils.pagination import PaginationParams, get_pagination_params
-from app.db.database import get_db
+from app.core.utils.responses import JSONAdapter
+from app.db.database import get_db, get_uow
+from app.db.leagues import league_of
 
 router = APIRouter(prefix="/players", tags=["players"])
 
+PLAYER_JSON = JSONAdapter(PlayerSchema)
+PLAYER_LIST_JSON = JSONAdapter(list[PlayerSchema])
+PLAYER_LIST_VIEW = View(Player, PlayerSchema, PLAYER_LIST_JSON, container=list)
+PLAYER_BATCH_VIEW = View(Player, PlayerSchema, JSONAdapter(Batch[PlayerSchema]), container=Batch)
 
-@router.post("")
+
+@router.post("", response_model=PlayerSchema)
+@idempotent
 async def create_player(
-    player: PlayerCreate, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_active_user)
-) -> PlayerSchema:
+    player: PlayerCreate, db: AsyncSession = Depends(get_uow), _: User = Depends(get_current_league_member)
+) -> Response:
     db_player = Player(name=player.name)
     db.add(db_player)
     try:
-        await db.commit()
-        await db.refresh(db_player)
-        return PlayerSchema.model_validate(db_player)
+        await db.flush()
+        return PLAYER_JSON.response(db_player)
     except IntegrityError as err:
-        await db.rollback()
         raise HTTPException(status_code=400, detail="Player name already exists") from err
 
 
-@router.get("", response_model=list[PlayerSchema])
+@router.get("", response_model=list[PlayerSchema] | Batch[PlayerSchema])
 async def list_players(
-    pagination: PaginationParams = Depends(get_pagination_params), db: AsyncSession = Depends(get_db)
-) -> Any:
-    result = await db.execute(select(Player).offset(pagination.skip).limit(pagination.limit))
+    request: Request,
+    ids: list[int] | None = Depends(get_batch_ids),
+    pagination: PaginationParams = Depends(get_pagination_params),
+    fieldset: Fieldset = Depends(get_fieldset),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Page of players, or with `ids` exactly those players in request order."""
+    if ids is not None:
+        return await read_batch(db, PLAYER_BATCH_VIEW, PLAYER_BATCH_VIEW.resolve(fieldset), ids)
+
+    fieldset = PLAYER_LIST_VIEW.resolve(fieldset)
+    stmt = select(Player).offset(pagination.skip).limit(pagination.limit).order_by(Player.id)
+    validators = await page_validators(
+        db, "players", stmt.with_only_columns(Player.id, row_version(Player), Player.updated_at)
+    )
+    if validators.is_fresh(request):
+        return validators.not_modified()
+
+    result = await db.execute(stmt)
     players = result.scalars().all()
-    return players
+    return PLAYER_LIST_VIEW.adapter(fieldset).response(players, headers=validators.headers)
+
 
+@router.get("/{player_id}", response_model=PlayerSchema)
+async def get_player(player_id: int, request: Request, db: AsyncSession = Depends(get_db)) -> Response:
+    key = ("player", league_of(db), player_id)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached.response(request)
+
+    generation = response_cache.generation
+    validators = await player_validators(db, player_id)
+    if validators is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    if validators.is_fresh(request):
+        return validators.not_modified()
 
-@router.get("/{player_id}")
-async def get_player(player_id: int, db: AsyncSession = Depends(get_db)) -> PlayerSchema:
     result = await db.execute(select(Player).filter(Player.id == player_id))
     player = result.scalar()
     if player is None:
         raise HTTPException(status_code=404, detail="Player not found")
-    return PlayerSchema.model_validate(player)
+    response = PLAYER_JSON.response(player, headers=validators.headers)
+    response_cache.put(key, CachedResponse.of(validators, response), [tag(PLAYER, player_id)], generation)
+    return response
 
 
-@router.put("/{player_id}")
+@router.put("/{player_id}", response_model=PlayerSchema)
 async def update_player(
     player_id: int,
     player: PlayerCreate,
-    db: AsyncSession = Depends(get_db),
-    _: User = Depends(get_current_active_user),
-) -> PlayerSchema:
-    result = await db.execute(select(Player).filter(Player.id == player_id))
-    db_player = result.scalar()
-    if db_player is None:
-        raise HTTPException(status_code=404, detail="Player not found")
-
-    db_player.name = player.name
-
+    db: AsyncSession = Depends(get_uow),
+    _: User = Depends(get_current_league_member),
+) -> Response:
+    stmt = (
+        update(Player)
+        .filter(Player.id == player_id)
+        .values(name=player.name)
+        .returning(Player, notify(PLAYER, Player.id))
+    )
     try:
-        await db.commit()
-        await db.refresh(db_player)
-        return PlayerSchema.model_validate(db_player)
+        result = await db.execute(stmt, execution_options={"populate_existing": True})
     except IntegrityError as e:
-        await db.rollback()
         if "unique constraint" in str(e).lower() or "duplicate key" in str(e).lower():
             raise HTTPException(
                 status_code=400,
@@ -76,10 +113,16 @@ async def update_player(
             ) from e
         raise HTTPException(status_code=400, detail="Database error occurred") from e
 
+    db_player = result.scalar()
+    if db_player is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    evict_after_commit(db, tag(PLAYER, player_id))
+    return PLAYER_JSON.response(db_player)
+
 
 @router.delete("/{player_id}")
 async def delete_player(
-    player_id: int, db: AsyncSession = Depends(get_db), _: User = Depends(get_current_admin_user)
+    player_id: int, db: AsyncSession = Depends(get_uow), _: User = Depends(get_current_admin_user)
 ) -> dict[str, str]:
     result = await db.execute(select(Player).filter(Player.id == player_id))
     db_player = result.scalar()
@@ -117,7 +160,8 @@ async def delete_player(
 
     # If no foreign key constraints, proceed with deletion
     await db.delete(db_player)
-    await db.commit()
+    await db.flush()
+    publish(db, tag(PLAYER, player_id))
     return {"message": "Player deleted successfully"}
 
 
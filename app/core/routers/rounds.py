@@ -1,45 +1,87 @@
-from typing import Any
-
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.core.models import Match, Round
+from app.core.schemas.batch import Batch
 from app.core.schemas.matches import MatchSchema
 from app.core.schemas.rounds import RoundSchema
+from app.core.utils.batch import get_batch_ids, read_batch
+from app.core.utils.coalescing import coalesced
+from app.core.utils.etags import round_validators
+from app.core.utils.fieldsets import Fieldset, View, get_fieldset
 from app.core.utils.pagination import PaginationParams, get_pagination_params
+from app.core.utils.responses import JSONAdapter
 from app.db.database import get_db
 
 router = APIRouter(prefix="/rounds", tags=["rounds"])
 
+ROUND_JSON = JSONAdapter(RoundSchema)
+MATCH_LIST_JSON = JSONAdapter(list[MatchSchema])
+ROUND_VIEW = View(Round, RoundSchema, ROUND_JSON)
+MATCH_LIST_VIEW = View(Match, MatchSchema, MATCH_LIST_JSON, container=list)
+ROUND_BATCH_VIEW = View(Round, RoundSchema, JSONAdapter(Batch[RoundSchema]), container=Batch)
 
-@router.get("/{round_id}")
-async def read_round(round_id: int, db: AsyncSession = Depends(get_db)) -> RoundSchema:
-    stmt = (
-        select(Round)
-        .options(
-            selectinload(Round.matches).selectinload(Match.player_1),
-            selectinload(Round.matches).selectinload(Match.player_2),
-        )
-        .filter(Round.id == round_id)
-    )
+
+@router.get("", response_model=Batch[RoundSchema])
+async def list_rounds(
+    ids: list[int] | None = Depends(get_batch_ids),
+    fieldset: Fieldset = Depends(get_fieldset),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Rounds with the given `ids` and their matches, in request order."""
+    if ids is None:
+        raise HTTPException(status_code=400, detail="ids is required")
+    return await read_batch(db, ROUND_BATCH_VIEW, ROUND_BATCH_VIEW.resolve(fieldset), ids)
+
+
+@router.get("/{round_id}", response_model=RoundSchema)
+@coalesced
+async def read_round(
+    round_id: int,
+    request: Request,
+    fieldset: Fieldset = Depends(get_fieldset),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    fieldset = ROUND_VIEW.resolve(fieldset)
+    validators = await round_validators(db, round_id)
+    if validators is None:
+        raise HTTPException(status_code=404, detail="Round not found")
+    if validators.is_fresh(request):
+        return validators.not_modified()
+
+    stmt = select(Round).options(*ROUND_VIEW.loader_options(fieldset)).filter(Round.id == round_id)
 
     result = await db.execute(stmt)
     db_round = result.scalar()
     if db_round is None:
         raise HTTPException(status_code=404, detail="Round not found")
-    return RoundSchema.model_validate(db_round)
+    return ROUND_VIEW.adapter(fieldset).response(db_round, headers=validators.headers)
 
 
 @router.get("/{round_id}/matches", response_model=list[MatchSchema])
 async def list_round_matches(
-    round_id: int, pagination: PaginationParams = Depends(get_pagination_params), db: AsyncSession = Depends(get_db)
-) -> Any:
-    result = await db.execute(select(Round).filter(Round.id == round_id))
-    db_round = result.scalar()
-    if db_round is None:
+    round_id: int,
+    request: Request,
+    pagination: PaginationParams = Depends(get_pagination_params),
+    fieldset: Fieldset = Depends(get_fieldset),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    fieldset = MATCH_LIST_VIEW.resolve(fieldset)
+    validators = await round_validators(db, round_id)
+    if validators is None:
         raise HTTPException(status_code=404, detail="Round not found")
+    if validators.is_fresh(request):
+        return validators.not_modified()
 
-    matches = db_round.matches[pagination.skip : pagination.skip + pagination.limit]
-    return matches
+    stmt = (
+        select(Match)
+        .options(*MATCH_LIST_VIEW.loader_options(fieldset))
+        .filter(Match.round_id == round_id)
+        .order_by(Match.id)
+        .offset(pagination.skip)
+        .limit(pagination.limit)
+    )
+    result = await db.execute(stmt)
+    matches = result.scalars().all()
+    return MATCH_LIST_VIEW.adapter(fieldset).response(matches, headers=validators.headers)
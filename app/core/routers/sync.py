@@ -0,0 +1,48 @@
+from datetime import timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.schemas.sync import SyncResponse
+from app.core.utils.responses import JSONAdapter
+from app.core.utils.sync import SyncPosition, decode_token, encode_token, read_changes, sync_horizon
+from app.db.database import get_db
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+SYNC_JSON = JSONAdapter(SyncResponse)
+
+
+@router.get("", response_model=SyncResponse)
+async def sync(
+    since: Annotated[
+        str | None, Query(description="Token of the previous sync or page, everything is returned without it")
+    ] = None,
+    limit: Annotated[int, Query(ge=1, le=10000, description="Most rows of each table in a page")] = (
+        settings.SYNC_PAGE_SIZE
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Drafts, rounds, matches, draft players and players changed since the previous sync, plus the ids
+    of the drafts and players deleted since. Clients upsert the rows, then apply the deletes, and keep
+    `token` for the next sync. While `has_more` is set, they pass `token` right away for the next page,
+    whose rows may refer to parents of a later page. The deletes come with the last page. Rows may come
+    again in the next sync, never go missing. Tokens older than `SYNC_TOMBSTONE_DAYS` get a 410, the
+    client has to sync from scratch.
+    """
+    horizon = await sync_horizon(db)
+    position = decode_token(since) if since is not None else SyncPosition()
+    if position.since is not None and position.since < horizon - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+        raise HTTPException(status_code=410, detail="Sync token expired, sync without it")
+
+    changes, after = await read_changes(db, position, limit)
+    # Every page of a sync waits for the transactions running before its first one
+    horizon = position.horizon or horizon
+    if after:
+        token = SyncPosition(since=position.since, horizon=horizon, after=after)
+    else:
+        token = SyncPosition(since=horizon)
+    return SYNC_JSON.response({"token": encode_token(token), "has_more": bool(after), **changes})
@@ -0,0 +1,12 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Batch(BaseModel, Generic[T]):
+    # Found rows in request order
+    items: list[T]
+    # Requested ids without a row, in request order
+    missing: list[int]
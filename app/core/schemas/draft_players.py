@@ -11,6 +11,7 @@ class DraftPlayerSchema(BaseModel):
     points: int = 0
     final_place: int | None = None
     order: int
+    version: int
 
     class Config:
         from_attributes = True
@@ -20,6 +21,8 @@ class DraftPlayerUpdate(BaseModel):
     deck_colors: list[str] | None = None
     points: int | None = None
     final_place: int | None = None
+    # Version the update is based on, the update is rejected if the draft player changed since
+    version: int | None = None
 
     class Config:
         from_attributes = True
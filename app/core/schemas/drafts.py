@@ -13,6 +13,19 @@ class DraftBase(BaseModel):
 class DraftCreate(DraftBase):
     date: date
     player_ids: List[int]
+    # Reorder `player_ids` to avoid repeating past pairings in the first rounds
+    optimize_seating: bool = False
+
+
+class SeatingRequest(BaseModel):
+    player_ids: List[int]
+    seed: int | None = None
+
+
+class SeatingSuggestion(BaseModel):
+    player_ids: List[int]
+    repeat_score: float
+    original_repeat_score: float
 
 
 class DraftList(DraftBase):
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+
+
+class LeagueCreate(BaseModel):
+    # Sent in the X-League header, keep it to characters that need no escaping
+    slug: str = Field(pattern=r"^[a-z0-9][a-z0-9-]*$", max_length=63)
+    name: str
+
+
+class LeagueSchema(LeagueCreate):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class LeagueMemberCreate(BaseModel):
+    user_id: int
+
+
+class LeagueMemberSchema(LeagueMemberCreate):
+    league_id: int
+
+    class Config:
+        from_attributes = True
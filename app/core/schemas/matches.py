@@ -13,10 +13,13 @@ class MatchCreate(BaseModel):
 
 class MatchScoreUpdate(BaseModel):
     score: MatchResult
+    # Version the update is based on, the update is rejected if the match changed since
+    version: int | None = None
 
 
 class MatchSchema(MatchCreate):
     id: int
+    version: int
     player_1: PlayerSchema
     player_2: PlayerSchema
 
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+from app.core.schemas.players import PlayerSchema
+from app.core.utils.projections import OutcomeModel
+
+
+class PlayerProjection(BaseModel):
+    player: PlayerSchema
+    current_points: int
+    expected_points: float
+    # Probability of every final place, index 0 is first place
+    place_probabilities: list[float]
+    top_3: float
+
+
+class DraftProjections(BaseModel):
+    draft_id: int
+    model: OutcomeModel
+    simulations: int
+    open_matches: int
+    players: list[PlayerProjection]
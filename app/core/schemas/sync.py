@@ -0,0 +1,70 @@
+from datetime import date
+from typing import List
+
+from pydantic import BaseModel
+
+from app.core.models import Color
+from app.core.schemas.players import PlayerSchema
+
+
+class SyncDraft(BaseModel):
+    id: int
+    name: str
+    date: date
+
+    class Config:
+        from_attributes = True
+
+
+class SyncRound(BaseModel):
+    id: int
+    number: int
+    draft_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class SyncMatch(BaseModel):
+    id: int
+    round_id: int
+    draft_id: int
+    player_1_id: int
+    player_2_id: int
+    score: str | None = None
+    version: int
+
+    class Config:
+        from_attributes = True
+
+
+class SyncDraftPlayer(BaseModel):
+    draft_id: int
+    player_id: int
+    deck_colors: list[Color] = []
+    points: int = 0
+    final_place: int | None = None
+    order: int
+    version: int
+
+    class Config:
+        from_attributes = True
+
+
+class SyncDeleted(BaseModel):
+    # The rounds, matches and draft players of a deleted draft are gone with it
+    drafts: List[int] = []
+    players: List[int] = []
+
+
+class SyncResponse(BaseModel):
+    # Pass it as `since` to the next sync, or right away for the next page
+    token: str
+    # Not every changed row fit in this page
+    has_more: bool = False
+    drafts: List[SyncDraft] = []
+    rounds: List[SyncRound] = []
+    matches: List[SyncMatch] = []
+    draft_players: List[SyncDraftPlayer] = []
+    players: List[PlayerSchema] = []
+    deleted: SyncDeleted = SyncDeleted()
@@ -1,9 +1,24 @@
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from typing import Annotated, Any, AsyncIterator, Dict, Iterator, List
 from unittest.mock import AsyncMock
 
+import httpx
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Header
+from sqlalchemy import event, func, insert, select, text
+from sqlalchemy.exc import ProgrammingError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
 
-from app.core.models import Draft, DraftPlayer, Round
+from app.auth.models import User
+from app.auth.utils import get_current_active_user, get_current_admin_user, get_current_league_member
+from app.core.models import Draft, DraftPlayer, Player, Round
+from app.core.utils.invalidation import response_cache
+from app.db.database import async_database_url, get_db
+from app.db.leagues import DEFAULT_LEAGUE, DEFAULT_LEAGUE_ID, scope_to_league
+from app.main import app
 
 
 @pytest.fixture
@@ -12,6 +27,20 @@ def mock_db() -> AsyncMock:
     return db
 
 
+@pytest.fixture
+async def pg_engine() -> AsyncIterator[AsyncEngine]:
+    """Engine of the configured Postgres database, tests using it are skipped when it can't be reached."""
+    engine = create_async_engine(async_database_url, poolclass=NullPool, connect_args={"timeout": 2})
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except (OSError, SQLAlchemyError) as err:
+        await engine.dispose()
+        pytest.skip(f"Postgres is not available: {err}")
+    yield engine
+    await engine.dispose()
+
+
 @pytest.fixture
 def base_draft() -> Draft:
     return Draft(id=1)
@@ -62,3 +91,95 @@ def draft_odd_players_with_rounds(draft_odd_players: Draft) -> Draft:
         Round(id=5, draft_id=1, number=5),
     ]
     return draft_odd_players
+
+
+@dataclass
+class UowContext:
+    client: httpx.AsyncClient
+    conn: AsyncConnection
+    session: AsyncSession
+    commits: List[Any]
+    statements: List[str]
+    player_ids: List[int]
+
+    async def count(self, model: Any, *criteria: Any) -> int:
+        return int((await self.conn.execute(select(func.count()).select_from(model).where(*criteria))).scalar_one())
+
+
+@pytest.fixture
+async def uow_context(pg_engine: AsyncEngine) -> AsyncIterator[UowContext]:
+    """
+    Client whose requests run in a transaction that is rolled back afterwards, counting the commits
+    of the request session and capturing its statements.
+    """
+    async with pg_engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            result = await conn.execute(
+                insert(Player).returning(Player.id),
+                [{"name": f"uow-{uuid.uuid4()}", "league_id": DEFAULT_LEAGUE_ID} for _ in range(4)],
+            )
+        except ProgrammingError:
+            pytest.skip("Unit of work tests need a migrated database")
+        player_ids = list(result.scalars())
+
+        session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        commits: List[Any] = []
+        event.listen(session.sync_session, "after_commit", commits.append)
+        statements: List[str] = []
+
+        def capture(_conn: Any, _cursor: Any, statement: str, *_: Any) -> None:
+            if not statement.startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")):
+                statements.append(statement)
+
+        event.listen(conn.sync_connection, "before_cursor_execute", capture)
+
+        async def override_get_db(x_league: Annotated[str, Header()] = DEFAULT_LEAGUE) -> AsyncIterator[AsyncSession]:
+            await scope_to_league(session, x_league)
+            yield session
+
+        user = User(id=0, email="uow@example.com")
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_current_admin_user] = lambda: user
+        app.dependency_overrides[get_current_league_member] = lambda: user
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                yield UowContext(
+                    client=client,
+                    conn=conn,
+                    session=session,
+                    commits=commits,
+                    statements=statements,
+                    player_ids=player_ids,
+                )
+        finally:
+            app.dependency_overrides.clear()
+            event.remove(conn.sync_connection, "before_cursor_execute", capture)
+            await session.close()
+            await transaction.rollback()
+
+
+async def create_draft(
+    uow_context: UowContext,
+    player_ids: List[int] | None = None,
+    draft_date: date | None = None,
+    headers: Dict[str, str] | None = None,
+) -> httpx.Response:
+    """Post a draft of `player_ids`, the context's players by default, held on `draft_date` or today."""
+    payload = {
+        "name": f"draft-{uuid.uuid4()}",
+        "date": (draft_date or date.today()).isoformat(),
+        "player_ids": uow_context.player_ids if player_ids is None else player_ids,
+    }
+    return await uow_context.client.post("/drafts", json=payload, headers=headers)
+
+
+@pytest.fixture
+def cache_on() -> Iterator[None]:
+    """Serve the response cache as if this worker listened for invalidations."""
+    response_cache.flush()
+    response_cache.listening = True
+    yield
+    response_cache.listening = False
+    response_cache.flush()
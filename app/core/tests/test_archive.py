@@ -0,0 +1,154 @@
+import gzip
+import re
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from app.config import settings
+from app.core.models import Draft, DraftPlayer, Match, MatchResult, Player, Round
+from app.core.tests.conftest import UowContext, create_draft
+from app.core.utils.archive import (
+    ArchiveEntry,
+    append_records,
+    archive_drafts,
+    decode_row,
+    get_index,
+    read_record,
+    restore_drafts,
+    season_path,
+    write_index,
+)
+
+
+class TestArchiveIndex:
+    def test_lookup_binary_searches_the_sorted_entries(self, tmp_path: Path) -> None:
+        entries = [ArchiveEntry(draft_id, 2020 + draft_id % 3, draft_id * 100, 50) for draft_id in range(1, 200, 2)]
+        write_index(tmp_path, reversed(entries))
+
+        index = get_index(tmp_path)
+
+        assert index.entries() == entries
+        assert index.lookup(1) == entries[0]
+        assert index.lookup(101) == entries[50]
+        assert index.lookup(199) == entries[-1]
+        assert index.lookup(100) is None
+        assert index.lookup(1000) is None
+
+    def test_sees_a_replaced_index(self, tmp_path: Path) -> None:
+        index = get_index(tmp_path)
+        assert index.lookup(1) is None
+
+        write_index(tmp_path, [ArchiveEntry(1, 2020, 0, 10)])
+        assert index.lookup(1) == ArchiveEntry(1, 2020, 0, 10)
+
+        write_index(tmp_path, [ArchiveEntry(1, 2020, 0, 10), ArchiveEntry(1, 2021, 5, 10)])
+        assert index.entries() == [ArchiveEntry(1, 2021, 5, 10)]
+
+        write_index(tmp_path, [])
+        assert index.lookup(1) is None
+
+
+class TestRecords:
+    def test_members_are_read_back_one_by_one(self, tmp_path: Path) -> None:
+        records = [(draft_id, {"drafts": [{"id": draft_id, "date": date(2020, 1, draft_id)}]}) for draft_id in (1, 2)]
+        entries = append_records(tmp_path, 2020, records[:1]) + append_records(tmp_path, 2020, records[1:])
+
+        assert [entry.offset for entry in entries] == [0, entries[0].length]
+        assert read_record(tmp_path, entries[1]) == {"drafts": [{"id": 2, "date": "2020-01-02"}]}
+        # The season file is a valid multi-member gzip file of JSON lines
+        assert gzip.decompress(season_path(tmp_path, 2020).read_bytes()).count(b"\n") == 2
+
+    def test_decode_row_parses_dates(self) -> None:
+        row = {"id": 1, "name": "x", "date": "2020-01-02", "created_at": "2020-01-02T10:00:00", "updated_at": None}
+
+        decoded = decode_row(Draft.__table__, row)  # type: ignore[arg-type]
+
+        assert decoded == {**row, "date": date(2020, 1, 2), "created_at": datetime(2020, 1, 2, 10)}
+
+
+class TestArchiveDrafts:
+    async def test_archive_read_and_restore(
+        self, uow_context: UowContext, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+        draft = (await create_draft(uow_context, draft_date=date(1850, 6, 1))).json()
+        unfinished = (await create_draft(uow_context, draft_date=date(1850, 6, 1))).json()
+        for db_round in draft["rounds"]:
+            for match in db_round["matches"]:
+                await uow_context.client.put(f"/matches/{match['id']}", json={"score": MatchResult.PLAYER_1_WIN.value})
+        await uow_context.client.post(f"/drafts/{draft['id']}/results")
+        live = (await uow_context.client.get(f"/drafts/{draft['id']}")).json()
+
+        uow_context.statements.clear()
+        archived = await archive_drafts(uow_context.session, date(1900, 1, 1), tmp_path, batch_size=1)
+
+        assert archived == 1
+        # Concurrent writes to the batch wait for its delete instead of being lost
+        locked = [statement for statement in uow_context.statements if "FOR UPDATE" in statement]
+        tables = {re.findall(r"FROM (\w+)", statement)[0] for statement in locked}
+        assert tables == {"drafts", "rounds", "draft_players", "matches"}
+        assert [entry.draft_id for entry in get_index(tmp_path).entries()] == [draft["id"]]
+        assert await uow_context.count(Draft, Draft.id == draft["id"]) == 0
+        assert await uow_context.count(Match, Match.draft_id == draft["id"]) == 0
+        assert await uow_context.count(Draft, Draft.id == unfinished["id"]) == 1
+        response = await uow_context.client.get(f"/drafts/{draft['id']}")
+        assert response.status_code == 200
+        assert response.json() == live
+        standings = await uow_context.client.get(f"/drafts/{draft['id']}", params={"include": "draft_players.player"})
+        assert standings.json()["draft_players"] == live["draft_players"]
+
+        restored = await restore_drafts(uow_context.session, tmp_path, season=1850)
+
+        assert restored == 1
+        assert get_index(tmp_path).entries() == []
+        assert await uow_context.count(Draft, Draft.id == draft["id"]) == 1
+        assert await uow_context.count(Round, Round.draft_id == draft["id"]) == len(live["rounds"])
+        assert await uow_context.count(DraftPlayer, DraftPlayer.draft_id == draft["id"]) == len(live["draft_players"])
+        assert await uow_context.count(Match, Match.draft_id == draft["id"]) == 6
+        assert (await uow_context.client.get(f"/drafts/{draft['id']}")).json() == live
+
+    async def test_players_of_archived_drafts_can_be_deleted(
+        self, uow_context: UowContext, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+        draft = (await create_draft(uow_context, draft_date=date(1850, 6, 1))).json()
+        for db_round in draft["rounds"]:
+            for match in db_round["matches"]:
+                await uow_context.client.put(f"/matches/{match['id']}", json={"score": MatchResult.PLAYER_1_WIN.value})
+        live = (await uow_context.client.get(f"/drafts/{draft['id']}")).json()
+        await archive_drafts(uow_context.session, date(1900, 1, 1), tmp_path, batch_size=1)
+        player_id = uow_context.player_ids[0]
+
+        deleted = await uow_context.client.delete(f"/players/{player_id}")
+        archived = await uow_context.client.get(f"/drafts/{draft['id']}")
+
+        assert deleted.status_code == 200
+        assert archived.status_code == 200
+        assert archived.json() == live
+
+        assert await restore_drafts(uow_context.session, tmp_path) == 1
+        assert await uow_context.count(Player, Player.id == player_id) == 1
+        assert (await uow_context.client.get(f"/drafts/{draft['id']}")).json() == live
+
+    async def test_restore_refuses_players_whose_name_was_taken(
+        self, uow_context: UowContext, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path))
+        draft = (await create_draft(uow_context, draft_date=date(1850, 6, 1))).json()
+        for db_round in draft["rounds"]:
+            for match in db_round["matches"]:
+                await uow_context.client.put(f"/matches/{match['id']}", json={"score": MatchResult.PLAYER_1_WIN.value})
+        await archive_drafts(uow_context.session, date(1900, 1, 1), tmp_path, batch_size=1)
+        player_id = uow_context.player_ids[0]
+        name = (await uow_context.client.get(f"/players/{player_id}")).json()["name"]
+        await uow_context.client.delete(f"/players/{player_id}")
+        taken_by = (await uow_context.client.post("/players", json={"name": name})).json()["id"]
+
+        with pytest.raises(
+            ValueError, match=f"player {player_id} '{name}' of league 1, now the name of player {taken_by}"
+        ):
+            await restore_drafts(uow_context.session, tmp_path)
+
+        assert get_index(tmp_path).lookup(draft["id"]) is not None
+        assert await uow_context.count(Draft, Draft.id == draft["id"]) == 0
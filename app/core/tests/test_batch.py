@@ -0,0 +1,48 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.core.models import Player
+from app.core.routers.players import PLAYER_BATCH_VIEW
+from app.core.utils.batch import get_batch_ids, id_in
+from app.core.utils.fieldsets import Fieldset
+from app.db.database import engine
+
+
+class TestBatchIds:
+    def test_no_batch(self) -> None:
+        assert get_batch_ids(None) is None
+
+    def test_keeps_order_and_drops_duplicates(self) -> None:
+        assert get_batch_ids("3, 1,2,3,,1") == [3, 1, 2]
+
+    def test_not_integers(self) -> None:
+        with pytest.raises(HTTPException) as exc_info:
+            get_batch_ids("1,two")
+
+        assert exc_info.value.status_code == 400
+
+    def test_too_many(self) -> None:
+        with pytest.raises(HTTPException) as exc_info:
+            get_batch_ids(",".join(str(i) for i in range(settings.BATCH_MAX_IDS + 1)))
+
+        assert exc_info.value.status_code == 400
+
+
+class TestIdIn:
+    def test_one_array_parameter(self) -> None:
+        compiled = id_in(Player.id, [3, 1, 2]).compile(dialect=engine.dialect)
+
+        assert str(compiled).startswith("players.id = ANY (")
+        assert list(compiled.params.values()) == [[3, 1, 2]]
+
+
+class TestBatchAdapter:
+    def test_batch_shape(self) -> None:
+        batch = {"items": [Player(id=3, name="C"), Player(id=1, name="A")], "missing": [2]}
+
+        body = json.loads(PLAYER_BATCH_VIEW.adapter(Fieldset()).dump(batch))
+
+        assert body == {"items": [{"name": "C", "id": 3}, {"name": "A", "id": 1}], "missing": [2]}
@@ -0,0 +1,97 @@
+import asyncio
+from typing import List
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.core.tests.conftest import UowContext, create_draft
+from app.core.utils.coalescing import SingleFlight, single_flight
+
+
+def slow_response(runs: List[int], body: bytes = b'{"id": 1}') -> Response:
+    runs.append(1)
+    return Response(body, media_type="application/json", headers={"ETag": '"abc"'})
+
+
+class TestSingleFlight:
+    async def test_identical_calls_share_one_run(self) -> None:
+        flights = SingleFlight()
+        runs: List[int] = []
+
+        async def compute() -> Response:
+            await asyncio.sleep(0.01)
+            return slow_response(runs)
+
+        responses = await asyncio.gather(*(flights.do("key", "GET /x", compute) for _ in range(5)))
+
+        assert runs == [1]
+        assert len({id(response) for response in responses}) == 5
+        assert {bytes(response.body) for response in responses} == {b'{"id": 1}'}
+        assert all(response.headers["etag"] == '"abc"' for response in responses)
+        assert flights.stats() == {"GET /x": {"computed": 1, "coalesced": 4}}
+        assert flights.flights == {}
+
+    async def test_different_keys_and_later_calls_run_again(self) -> None:
+        flights = SingleFlight()
+        runs: List[int] = []
+
+        async def compute() -> Response:
+            await asyncio.sleep(0.01)
+            return slow_response(runs)
+
+        await asyncio.gather(flights.do("a", "GET /x", compute), flights.do("b", "GET /x", compute))
+        await flights.do("a", "GET /x", compute)
+
+        assert len(runs) == 3
+
+    async def test_followers_get_the_leaders_exception(self) -> None:
+        flights = SingleFlight()
+
+        async def compute() -> Response:
+            await asyncio.sleep(0.01)
+            raise HTTPException(status_code=404, detail="Draft not found")
+
+        results = await asyncio.gather(
+            *(flights.do("key", "GET /x", compute) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, HTTPException) and result.status_code == 404 for result in results)
+
+    async def test_followers_run_it_themselves_when_the_leader_is_cancelled(self) -> None:
+        flights = SingleFlight()
+        runs: List[int] = []
+
+        async def compute() -> Response:
+            await asyncio.sleep(0.05)
+            return slow_response(runs)
+
+        leader = asyncio.create_task(flights.do("key", "GET /x", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("key", "GET /x", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        response = await follower
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert response.status_code == 200
+        assert runs == [1]
+
+
+class TestCoalescedEndpoints:
+    async def test_concurrent_draft_reads_share_one_run(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context)).json()
+        before = single_flight.stats().get("GET /drafts/{draft_id}", {"computed": 0, "coalesced": 0})
+        uow_context.statements.clear()
+
+        responses = await asyncio.gather(*(uow_context.client.get(f"/drafts/{draft['id']}") for _ in range(10)))
+        single = len(uow_context.statements)
+        uow_context.statements.clear()
+        await uow_context.client.get(f"/drafts/{draft['id']}")
+
+        assert {response.status_code for response in responses} == {200}
+        assert len({response.content for response in responses}) == 1
+        assert single == len(uow_context.statements)
+        after = (await uow_context.client.get("/metrics")).json()["coalescing"]["GET /drafts/{draft_id}"]
+        assert after["computed"] - before["computed"] == 2
+        assert after["coalesced"] - before["coalesced"] == 9
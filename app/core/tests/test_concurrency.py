@@ -0,0 +1,38 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.utils.concurrency import expected_version, version_conflict
+
+
+class TestExpectedVersion:
+    @pytest.mark.parametrize(
+        ("if_match", "body_version", "expected"),
+        [
+            (None, None, None),
+            (None, 3, 3),
+            ('"3"', None, 3),
+            ('W/"3"', None, 3),
+            ("3", 3, 3),
+            ("*", None, None),
+            ("*", 2, 2),
+        ],
+    )
+    def test_versions(self, if_match: str | None, body_version: int | None, expected: int | None) -> None:
+        assert expected_version(if_match, body_version) == expected
+
+    @pytest.mark.parametrize(("if_match", "body_version"), [('"abc"', None), ('"3"', 4)])
+    def test_invalid(self, if_match: str, body_version: int | None) -> None:
+        with pytest.raises(HTTPException) as exc_info:
+            expected_version(if_match, body_version)
+
+        assert exc_info.value.status_code == 400
+
+
+def test_version_conflict_carries_current_state() -> None:
+    exc = version_conflict({"id": 1, "version": 4})
+
+    assert exc.status_code == 409
+    assert exc.detail == {
+        "message": "Changed by another request, retry based on the current version",
+        "current": {"id": 1, "version": 4},
+    }
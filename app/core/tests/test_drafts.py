@@ -3,8 +3,15 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from app.core.models import Draft, DraftPlayer, Match
-from app.core.utils.drafts import generate_matches, generate_rounds, rotate_players, sort_to_inside
+from app.core.models import Draft, DraftPlayer, Match, MatchResult
+from app.core.utils.drafts import (
+    assign_final_places,
+    generate_matches,
+    generate_rounds,
+    rotate_players,
+    schedule_pairings,
+    sort_to_inside,
+)
 
 
 class TestRotatePlayers:
@@ -36,6 +43,19 @@ class TestSortToInside:
         assert sort_to_inside([1, 2, 3, 4, 5]) == [1, 3, 5, 4, 2]
 
 
+class TestSchedulePairings:
+    def test_no_players(self) -> None:
+        assert schedule_pairings([]) == []
+
+    def test_even_number_of_players(self) -> None:
+        assert schedule_pairings([1, 2, 3, 4]) == [[(1, 2), (3, 4)], [(1, 4), (2, 3)], [(1, 3), (4, 2)]]
+
+    def test_odd_number_of_players_skips_bye(self) -> None:
+        pairings = schedule_pairings([1, 2, 3, None])  # type: ignore[list-item]
+
+        assert pairings == [[(1, 2)], [(2, 3)], [(1, 3)]]
+
+
 class TestRounds:
     @pytest.mark.asyncio
     async def test_no_players(self, base_draft: Draft, mock_db: AsyncMock) -> None:
@@ -154,3 +174,46 @@ class TestMatches:
         assert len(grouped_matches[3]) == 2
         assert len(grouped_matches[4]) == 2
         assert len(grouped_matches[5]) == 2
+
+    @pytest.mark.asyncio
+    async def test_matches_copy_draft_id(self, draft_odd_players_with_rounds: Draft, mock_db: AsyncMock) -> None:
+        player_ids = [player.player_id for player in draft_odd_players_with_rounds.draft_players] + [None]
+
+        matches = await generate_matches(draft_odd_players_with_rounds.rounds, player_ids, mock_db)
+
+        assert {match.draft_id for match in matches} == {1}
+
+
+class TestAssignFinalPlaces:
+    def test_places_by_points(self) -> None:
+        draft_players = [DraftPlayer(player_id=player_id) for player_id in (1, 2, 3, 4)]
+        matches = [
+            Match(player_1_id=1, player_2_id=2, score=MatchResult.PLAYER_1_FULL_WIN),
+            Match(player_1_id=3, player_2_id=4, score=MatchResult.PLAYER_2_WIN),
+            Match(player_1_id=1, player_2_id=4, score=MatchResult.PLAYER_1_WIN),
+            Match(player_1_id=2, player_2_id=3, score=MatchResult.PLAYER_1_FULL_WIN),
+            Match(player_1_id=1, player_2_id=3, score=MatchResult.PLAYER_1_FULL_WIN),
+            Match(player_1_id=4, player_2_id=2, score=MatchResult.PLAYER_2_WIN),
+        ]
+
+        assign_final_places(draft_players, matches)
+
+        assert [(dp.player_id, dp.points, dp.final_place) for dp in draft_players] == [
+            (1, 9, 1),
+            (2, 6, 2),
+            (3, 1, 4),
+            (4, 5, 3),
+        ]
+
+    def test_tie_resolved_by_head_to_head(self) -> None:
+        draft_players = [DraftPlayer(player_id=player_id) for player_id in (1, 2, 3)]
+        matches = [
+            Match(player_1_id=1, player_2_id=2, score=MatchResult.PLAYER_2_FULL_WIN),
+            Match(player_1_id=1, player_2_id=3, score=MatchResult.PLAYER_1_FULL_WIN),
+            Match(player_1_id=2, player_2_id=3, score=MatchResult.PLAYER_2_FULL_WIN),
+        ]
+
+        assign_final_places(draft_players, matches)
+
+        # Everyone has 3 points and one head-to-head win, so the tie stays
+        assert [dp.final_place for dp in draft_players] == [1, 1, 1]
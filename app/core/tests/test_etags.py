@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from fastapi import Request
+from sqlalchemy import update
+
+from app.core.models import Match, MatchResult
+from app.core.tests.conftest import UowContext, create_draft
+from app.core.utils.etags import Validators
+
+UPDATED_AT = datetime(2025, 1, 1, 12, 30, 15, 123456)
+ROWS = [("draft", 1, UPDATED_AT), ("matches", 28, datetime(2025, 1, 1, 12, 0))]
+
+
+def make_request(**headers: str) -> Request:
+    raw_headers = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw_headers})
+
+
+class TestValidators:
+    def test_same_rows_same_etag(self) -> None:
+        assert Validators.from_rows("draft", ROWS) == Validators.from_rows("draft", list(ROWS))
+
+    def test_etag_changes_with_rows_and_kind(self) -> None:
+        etag = Validators.from_rows("draft", ROWS).etag
+
+        assert Validators.from_rows("draft", ROWS[:1]).etag != etag
+        assert Validators.from_rows("round", ROWS).etag != etag
+
+    def test_headers(self) -> None:
+        headers = Validators.from_rows("draft", ROWS).headers
+
+        assert headers["ETag"].startswith('"')
+        assert headers["Last-Modified"] == "Wed, 01 Jan 2025 12:30:15 GMT"
+        assert headers["Cache-Control"] == "no-cache"
+
+    def test_if_none_match(self) -> None:
+        validators = Validators.from_rows("draft", ROWS)
+
+        assert validators.is_fresh(make_request(if_none_match=validators.etag))
+        assert validators.is_fresh(make_request(if_none_match=f'"other", W/{validators.etag}'))
+        assert not validators.is_fresh(make_request(if_none_match='"other"'))
+        assert not validators.is_fresh(make_request())
+
+    def test_if_none_match_wins_over_if_modified_since(self) -> None:
+        validators = Validators.from_rows("draft", ROWS)
+        request = make_request(if_none_match='"other"', if_modified_since="Wed, 01 Jan 2025 12:30:15 GMT")
+
+        assert not validators.is_fresh(request)
+
+    def test_if_modified_since(self) -> None:
+        validators = Validators.from_rows("draft", ROWS)
+
+        assert validators.is_fresh(make_request(if_modified_since="Wed, 01 Jan 2025 12:30:15 GMT"))
+        assert not validators.is_fresh(make_request(if_modified_since="Wed, 01 Jan 2025 12:30:14 GMT"))
+        assert not validators.is_fresh(make_request(if_modified_since="yesterday"))
+
+    def test_not_modified(self) -> None:
+        validators = Validators.from_rows("draft", ROWS)
+        response = validators.not_modified()
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == validators.etag
+
+
+class TestDraftValidators:
+    async def test_write_keeping_updated_at_changes_the_etag(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context)).json()
+        etag = (await uow_context.client.get(f"/drafts/{draft['id']}")).headers["etag"]
+        match = draft["rounds"][0]["matches"][0]
+
+        # A transaction that began before the read commits after it, its updated_at is no newer
+        await uow_context.conn.execute(
+            update(Match)
+            .where(Match.id == match["id"])
+            .values(score=MatchResult.PLAYER_1_WIN.value, updated_at=Match.updated_at)
+        )
+        response = await uow_context.client.get(f"/drafts/{draft['id']}", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
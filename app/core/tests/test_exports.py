@@ -0,0 +1,26 @@
+import json
+from datetime import date
+
+from app.core.utils.exports import encode_csv, encode_ndjson
+
+
+class TestEncodeCsv:
+    def test_rows(self) -> None:
+        rows = [("draft_id", "draft_name"), (1, "Cube, again"), (2, None)]
+
+        assert encode_csv(rows) == b'draft_id,draft_name\r\n1,"Cube, again"\r\n2,\r\n'
+
+    def test_lists_are_space_separated(self) -> None:
+        assert encode_csv([(1, ["red", "white"])]) == b"1,red white\r\n"
+
+
+class TestEncodeNdjson:
+    def test_one_object_per_line(self) -> None:
+        body = encode_ndjson(["draft_id", "draft_date", "deck_colors"], [(1, date(2025, 1, 1), ["red"]), (2, None, [])])
+
+        lines = body.decode().splitlines()
+        assert body.endswith(b"\n")
+        assert [json.loads(line) for line in lines] == [
+            {"draft_id": 1, "draft_date": "2025-01-01", "deck_colors": ["red"]},
+            {"draft_id": 2, "draft_date": None, "deck_colors": []},
+        ]
@@ -0,0 +1,115 @@
+import json
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.models import Draft, DraftPlayer, Match, Player, Round
+from app.core.routers.drafts import DRAFT_FULL_JSON, DRAFT_FULL_VIEW, DRAFT_LIST_VIEW
+from app.core.utils.fieldsets import Fieldset, View, get_fieldset
+
+
+@pytest.fixture
+def draft() -> Draft:
+    players = [Player(id=1, name="Alice"), Player(id=2, name="Bob")]
+    draft = Draft(id=1, name="Draft", date=date(2025, 1, 1))
+    draft.draft_players = [
+        DraftPlayer(
+            draft_id=1, player_id=player.id, player=player, order=player.id, points=3, deck_colors=[], version=1
+        )
+        for player in players
+    ]
+    draft.rounds = [Round(id=1, number=1, draft_id=1)]
+    draft.rounds[0].matches = [
+        Match(
+            id=1,
+            round_id=1,
+            draft_id=1,
+            player_1_id=1,
+            player_2_id=2,
+            player_1=players[0],
+            player_2=players[1],
+            version=1,
+        )
+    ]
+    return draft
+
+
+def resolve(view: View, fields: str | None = None, include: str | None = None) -> Fieldset:
+    return view.resolve(get_fieldset(fields=fields, include=include))
+
+
+class TestParameters:
+    def test_no_parameters_is_the_full_view(self) -> None:
+        fieldset = resolve(DRAFT_FULL_VIEW)
+
+        assert fieldset == Fieldset()
+        assert DRAFT_FULL_VIEW.adapter(fieldset) is DRAFT_FULL_JSON
+        assert len(DRAFT_FULL_VIEW.loader_options(fieldset)) == 3
+
+    def test_include_implies_ancestors(self) -> None:
+        fieldset = resolve(DRAFT_FULL_VIEW, include="rounds.matches.player_1")
+
+        assert fieldset.include == {"rounds", "rounds.matches", "rounds.matches.player_1"}
+
+    def test_fields_alone_keep_every_relationship(self) -> None:
+        fieldset = resolve(DRAFT_FULL_VIEW, fields="name")
+
+        assert fieldset.include == set(DRAFT_FULL_VIEW.levels) - {""}
+
+    @pytest.mark.parametrize(
+        ("fields", "include"),
+        [
+            (None, "bogus"),
+            ("bogus", None),
+            ("draft_players", None),
+            ("rounds.number", "draft_players"),
+        ],
+    )
+    def test_invalid(self, fields: str | None, include: str | None) -> None:
+        with pytest.raises(HTTPException) as exc_info:
+            resolve(DRAFT_FULL_VIEW, fields=fields, include=include)
+
+        assert exc_info.value.status_code == 400
+
+
+class TestLoaderOptions:
+    @pytest.mark.parametrize(("include", "count"), [("draft_players.player", 1), ("rounds", 1), ("", 0)])
+    def test_only_included_relationships_are_loaded(self, include: str, count: int) -> None:
+        assert len(DRAFT_FULL_VIEW.loader_options(resolve(DRAFT_FULL_VIEW, include=include))) == count
+
+
+class TestAdapter:
+    def test_standings_only(self, draft: Draft) -> None:
+        fieldset = resolve(
+            DRAFT_FULL_VIEW,
+            include="draft_players.player",
+            fields="name,draft_players.points,draft_players.player.name",
+        )
+
+        body = json.loads(DRAFT_FULL_VIEW.adapter(fieldset).dump(draft))
+
+        assert body == {
+            "name": "Draft",
+            "draft_players": [{"player": {"name": "Alice"}, "points": 3}, {"player": {"name": "Bob"}, "points": 3}],
+        }
+
+    def test_unincluded_relationships_are_not_read(self) -> None:
+        # A plain dict has no `rounds` to read
+        fieldset = resolve(DRAFT_FULL_VIEW, include="")
+
+        body = json.loads(DRAFT_FULL_VIEW.adapter(fieldset).dump({"id": 1, "name": "Draft", "date": "2025-01-01"}))
+
+        assert body == {"id": 1, "name": "Draft", "date": "2025-01-01"}
+
+    def test_full_view_matches_sparse_view_of_everything(self, draft: Draft) -> None:
+        everything = resolve(
+            DRAFT_FULL_VIEW, include="rounds.matches.player_1,rounds.matches.player_2,draft_players.player"
+        )
+
+        assert DRAFT_FULL_VIEW.adapter(everything).dump(draft) == DRAFT_FULL_JSON.dump(draft)
+
+    def test_adapters_are_cached(self) -> None:
+        fieldset = resolve(DRAFT_LIST_VIEW, fields="id")
+
+        assert DRAFT_LIST_VIEW.adapter(fieldset) is DRAFT_LIST_VIEW.adapter(resolve(DRAFT_LIST_VIEW, fields="id"))
@@ -0,0 +1,197 @@
+import asyncio
+import inspect
+import uuid
+from typing import AsyncIterator
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from sqlalchemy import select, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.models import IdempotencyKey, Player
+from app.core.tests.conftest import UowContext
+from app.core.utils import idempotency
+from app.core.utils.idempotency import IDEMPOTENCY_HEADER, REPLAYED_HEADER, idempotent
+from app.db.database import get_db
+from app.db.leagues import LEAGUE_HEADER
+
+calls: list[str] = []
+api = FastAPI()
+
+
+@api.post("/things/{name}")
+@idempotent
+async def create_thing(name: str) -> dict[str, str]:
+    calls.append(name)
+    await asyncio.sleep(0.2)
+    if name == "taken":
+        raise HTTPException(status_code=400, detail="Name already exists")
+    if name == "broken":
+        raise HTTPException(status_code=503, detail="Try again")
+    return {"name": name, "call": str(len(calls))}
+
+
+@pytest.fixture
+async def client(pg_engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[httpx.AsyncClient]:
+    async with pg_engine.connect() as conn:
+        try:
+            await conn.execute(text("SELECT 1 FROM idempotency_keys LIMIT 1"))
+        except ProgrammingError:
+            pytest.skip("Database is not migrated")
+    sessions = async_sessionmaker(pg_engine, class_=AsyncSession)
+    monkeypatch.setattr(idempotency, "SessionLocal", sessions)
+
+    async def override_get_db() -> AsyncIterator[AsyncSession]:
+        async with sessions() as db:
+            yield db
+
+    api.dependency_overrides[get_db] = override_get_db
+    calls.clear()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api), base_url="http://test") as client:
+            yield client
+    finally:
+        api.dependency_overrides.clear()
+
+
+def key() -> dict[str, str]:
+    return {IDEMPOTENCY_HEADER: str(uuid.uuid4())}
+
+
+class TestSignature:
+    def test_adds_header_and_keeps_parameters(self) -> None:
+        parameters = inspect.signature(create_thing).parameters
+
+        assert list(parameters) == ["name", "idempotency_request", "idempotency_db", "idempotency_key"]
+        assert [parameter["name"] for parameter in api.openapi()["paths"]["/things/{name}"]["post"]["parameters"]] == [
+            "name",
+            IDEMPOTENCY_HEADER,
+            LEAGUE_HEADER.lower(),
+        ]
+
+
+class TestIdempotent:
+    async def test_without_key_every_request_runs(self, client: httpx.AsyncClient) -> None:
+        await client.post("/things/a")
+        await client.post("/things/a")
+
+        assert calls == ["a", "a"]
+
+    async def test_retry_is_replayed(self, client: httpx.AsyncClient) -> None:
+        headers = key()
+
+        first = await client.post("/things/a", headers=headers)
+        retry = await client.post("/things/a", headers=headers)
+
+        assert calls == ["a"]
+        assert retry.json() == first.json()
+        assert retry.headers[REPLAYED_HEADER] == "true"
+        assert REPLAYED_HEADER not in first.headers
+
+    async def test_concurrent_duplicates_wait_for_the_first(self, client: httpx.AsyncClient) -> None:
+        headers = key()
+
+        responses = await asyncio.gather(*(client.post("/things/a", headers=headers) for _ in range(4)))
+
+        assert calls == ["a"]
+        assert {response.json()["call"] for response in responses} == {"1"}
+
+    async def test_client_errors_are_replayed(self, client: httpx.AsyncClient) -> None:
+        headers = key()
+
+        first = await client.post("/things/taken", headers=headers)
+        retry = await client.post("/things/taken", headers=headers)
+
+        assert calls == ["taken"]
+        assert (first.status_code, retry.status_code) == (400, 400)
+        assert retry.json() == {"detail": "Name already exists"}
+
+    async def test_server_errors_are_retried(self, client: httpx.AsyncClient) -> None:
+        headers = key()
+
+        await client.post("/things/broken", headers=headers)
+        await client.post("/things/broken", headers=headers)
+
+        assert calls == ["broken", "broken"]
+
+    async def test_key_of_another_request(self, client: httpx.AsyncClient) -> None:
+        headers = key()
+
+        await client.post("/things/a", headers=headers, json={"size": 1})
+        response = await client.post("/things/a", headers=headers, json={"size": 2})
+
+        assert response.status_code == 422
+        assert calls == ["a"]
+
+    async def test_key_of_another_if_match(self, client: httpx.AsyncClient) -> None:
+        headers = key()
+
+        await client.post("/things/a", headers={**headers, "If-Match": '"1"'})
+        response = await client.post("/things/a", headers={**headers, "If-Match": '"2"'})
+
+        assert response.status_code == 422
+        assert calls == ["a"]
+
+    async def test_key_of_another_query(self, client: httpx.AsyncClient) -> None:
+        headers = key()
+
+        await client.post("/things/a", headers=headers, params={"size": 1})
+        response = await client.post("/things/a", headers=headers, params={"size": 2})
+
+        assert response.status_code == 422
+        assert calls == ["a"]
+
+
+class TestUnitOfWork:
+    async def test_response_commits_with_the_write(
+        self, uow_context: UowContext, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        headers = key()
+        name = f"idempotent-{uuid.uuid4()}"
+        store_response = idempotency.store_response
+
+        async def failing_store_response(*_: object) -> None:
+            raise RuntimeError("Could not store the response")
+
+        monkeypatch.setattr(idempotency, "store_response", failing_store_response)
+        with pytest.raises(RuntimeError):
+            await uow_context.client.post("/players", json={"name": name}, headers=headers)
+        assert await uow_context.count(Player, Player.name == name) == 0
+
+        monkeypatch.setattr(idempotency, "store_response", store_response)
+        retry = await uow_context.client.post("/players", json={"name": name}, headers=headers)
+
+        assert retry.status_code == 200
+        assert await uow_context.count(Player, Player.name == name) == 1
+        # Stored in the write's transaction, which the test keeps open: other connections can't replay it yet
+        stored = await uow_context.conn.execute(
+            select(IdempotencyKey.status_code, IdempotencyKey.body).filter(
+                IdempotencyKey.key == headers[IDEMPOTENCY_HEADER]
+            )
+        )
+        assert stored.one() == (200, retry.content)
+
+
+class TestWaitForClaim:
+    async def test_key_released_again_and_again_times_out(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        attempts: list[str] = []
+
+        async def claim_key(key: str, *_: str) -> bool:
+            attempts.append(key)
+            assert len(attempts) < 100, "Retried without waiting"
+            return False
+
+        async def load_key(*_: str) -> None:
+            return None
+
+        monkeypatch.setattr(idempotency, "claim_key", claim_key)
+        monkeypatch.setattr(idempotency, "load_key", load_key)
+        monkeypatch.setattr(idempotency.settings, "IDEMPOTENCY_WAIT_SECONDS", 0.05)
+        monkeypatch.setattr(idempotency.settings, "IDEMPOTENCY_POLL_SECONDS", 0.01)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await idempotency._wait_for_claim("k", "POST /things/a", "hash")  # pylint: disable=protected-access
+
+        assert exc_info.value.status_code == 409
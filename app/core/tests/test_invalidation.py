@@ -0,0 +1,187 @@
+import asyncio
+import uuid
+from typing import AsyncIterator, Callable
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.config import settings
+from app.core.models import MatchResult
+from app.core.tests.conftest import UowContext, create_draft
+from app.core.utils.invalidation import (
+    DRAFT,
+    FLUSH,
+    LISTENER_NAME,
+    PLAYER,
+    LocalCache,
+    decode,
+    encode,
+    listen_for_invalidations,
+    publish,
+    response_cache,
+    tag,
+)
+
+
+def listening_cache(size: int = 10) -> LocalCache[str]:
+    cache: LocalCache[str] = LocalCache(size)
+    cache.listening = True
+    return cache
+
+
+async def eventually(condition: Callable[[], bool], seconds: float = 2.0) -> None:
+    for _ in range(int(seconds / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not met in time")
+
+
+class TestLocalCache:
+    def test_evicts_the_entries_of_a_tag(self) -> None:
+        cache = listening_cache()
+        cache.put("draft", "body", [tag(DRAFT, 1), tag(PLAYER, 7)], cache.generation)
+        cache.put("player", "body", [tag(PLAYER, 7)], cache.generation)
+        cache.put("other", "body", [tag(DRAFT, 2)], cache.generation)
+
+        cache.evict([tag(PLAYER, 7)])
+
+        assert cache.get("draft") is None
+        assert cache.get("player") is None
+        assert cache.get("other") == "body"
+        assert cache.keys == {tag(DRAFT, 2): {"other"}}
+
+    def test_drops_the_least_recently_used(self) -> None:
+        cache = listening_cache(size=2)
+        cache.put("a", "1", [], cache.generation)
+        cache.put("b", "2", [], cache.generation)
+        cache.get("a")
+        cache.put("c", "3", [], cache.generation)
+
+        assert list(cache.entries) == ["a", "c"]
+
+    def test_values_computed_across_an_eviction_are_not_stored(self) -> None:
+        cache = listening_cache()
+        generation = cache.generation
+        cache.evict([tag(DRAFT, 1)])
+
+        cache.put("draft", "stale", [tag(DRAFT, 1)], generation)
+
+        assert cache.get("draft") is None
+
+    def test_nothing_is_served_while_not_listening(self) -> None:
+        cache = listening_cache()
+        cache.put("draft", "body", [], cache.generation)
+        cache.listening = False
+
+        assert cache.get("draft") is None
+        cache.put("other", "body", [], cache.generation)
+        assert "other" not in cache.entries
+
+    def test_flush_tag_evicts_everything(self) -> None:
+        cache = listening_cache()
+        cache.put("draft", "body", [tag(DRAFT, 1)], cache.generation)
+
+        cache.evict(decode(FLUSH))
+
+        assert cache.entries == {}
+
+
+class TestPayloads:
+    def test_round_trip(self) -> None:
+        assert decode(encode([tag(DRAFT, 2), tag(PLAYER, 1), tag(DRAFT, 2)])) == {"draft:2", "player:1"}
+
+    def test_too_many_tags_flush(self) -> None:
+        assert encode(tag(DRAFT, draft_id) for draft_id in range(2000)) == FLUSH
+
+
+@pytest.mark.usefixtures("cache_on")
+class TestCachedResponses:
+    async def test_cached_draft_is_evicted_by_a_score_update(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context)).json()
+        match = draft["rounds"][0]["matches"][0]
+        first = await uow_context.client.get(f"/drafts/{draft['id']}")
+        uow_context.statements.clear()
+
+        cached = await uow_context.client.get(f"/drafts/{draft['id']}")
+        revalidated = await uow_context.client.get(
+            f"/drafts/{draft['id']}", headers={"If-None-Match": first.headers["etag"]}
+        )
+        assert uow_context.statements == []
+        assert cached.content == first.content
+        assert revalidated.status_code == 304
+
+        await uow_context.client.put(f"/matches/{match['id']}", json={"score": MatchResult.PLAYER_1_WIN.value})
+        uow_context.statements.clear()
+        updated = await uow_context.client.get(f"/drafts/{draft['id']}")
+
+        assert uow_context.statements
+        assert updated.json()["rounds"][0]["matches"][0]["score"] == MatchResult.PLAYER_1_WIN.value
+
+    async def test_renaming_a_player_evicts_the_drafts_showing_them(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context)).json()
+        await uow_context.client.get(f"/drafts/{draft['id']}")
+        await uow_context.client.get(f"/drafts/{draft['id']}", params={"include": "rounds.matches.player_1"})
+        name = f"renamed-{uuid.uuid4()}"
+
+        await uow_context.client.put(f"/players/{uow_context.player_ids[0]}", json={"name": name})
+
+        assert response_cache.entries == {}
+        standings = (await uow_context.client.get(f"/drafts/{draft['id']}")).json()["draft_players"]
+        assert name in {draft_player["player"]["name"] for draft_player in standings}
+
+    async def test_failed_writes_evict_nothing(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context)).json()
+        await uow_context.client.get(f"/drafts/{draft['id']}")
+        match = draft["rounds"][0]["matches"][0]
+
+        stale = await uow_context.client.put(
+            f"/matches/{match['id']}", json={"score": MatchResult.PLAYER_1_WIN.value, "version": match["version"] - 1}
+        )
+
+        assert stale.status_code == 409
+        assert len(response_cache.entries) == 1
+
+
+class TestListener:
+    @pytest.fixture
+    async def listener(self, pg_engine: AsyncEngine) -> AsyncIterator[LocalCache[str]]:
+        cache: LocalCache[str] = LocalCache(10)
+        task = asyncio.create_task(
+            listen_for_invalidations(cache, settings.DATABASE_URL, ping_seconds=0.1, reconnect_seconds=0.05)
+        )
+        await eventually(lambda: cache.listening)
+        yield cache
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    async def test_evicts_what_other_workers_commit(self, pg_engine: AsyncEngine, listener: LocalCache[str]) -> None:
+        listener.put("draft", "body", [tag(DRAFT, -1)], listener.generation)
+
+        async with AsyncSession(pg_engine) as db:
+            publish(db, tag(DRAFT, -1))
+            await db.rollback()
+        await asyncio.sleep(0.1)
+        assert listener.get("draft") == "body"
+
+        async with AsyncSession(pg_engine) as db:
+            publish(db, tag(DRAFT, -1))
+            await db.commit()
+        await eventually(lambda: "draft" not in listener.entries)
+
+    async def test_flushes_and_reconnects_after_losing_the_connection(
+        self, pg_engine: AsyncEngine, listener: LocalCache[str]
+    ) -> None:
+        listener.put("draft", "body", [tag(DRAFT, -1)], listener.generation)
+        flushes = listener.counts["flushes"]
+
+        async with pg_engine.connect() as conn:
+            await conn.execute(
+                text("SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE application_name = :name"),
+                {"name": LISTENER_NAME},
+            )
+
+        await eventually(lambda: listener.counts["flushes"] >= flushes + 2 and listener.listening)
+        assert listener.entries == {}
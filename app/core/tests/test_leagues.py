@@ -0,0 +1,221 @@
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List
+
+import pytest
+from sqlalchemy import insert, select, text
+
+from app.auth.models import User
+from app.auth.utils import get_current_active_user, get_current_league_member
+from app.core.models import DraftPlayer, League, LeagueMember, Match, MatchResult, Player
+from app.core.tests.conftest import UowContext, create_draft
+from app.core.utils.sync import SyncPosition, encode_token
+from app.db.leagues import DEFAULT_LEAGUE_ID, LEAGUE_HEADER
+from app.main import app
+
+
+@dataclass
+class OtherLeague:
+    league_id: int
+    headers: Dict[str, str]
+    player_ids: List[int]
+    draft: Dict[str, Any]
+
+
+@pytest.fixture
+async def other_league(uow_context: UowContext) -> OtherLeague:
+    """A second league with its own players and a draft of them."""
+    slug = f"league-{uuid.uuid4()}"
+    league_id = (
+        await uow_context.conn.execute(insert(League).values(slug=slug, name=slug).returning(League.id))
+    ).scalar_one()
+    result = await uow_context.conn.execute(
+        insert(Player).returning(Player.id),
+        [{"name": f"other-{uuid.uuid4()}", "league_id": league_id} for _ in range(4)],
+    )
+    headers = {LEAGUE_HEADER: slug}
+    player_ids = list(result.scalars())
+    draft = (await create_draft(uow_context, player_ids, headers=headers)).json()
+    return OtherLeague(league_id=league_id, headers=headers, player_ids=player_ids, draft=draft)
+
+
+class TestLeagues:
+    async def test_create_and_list(self, uow_context: UowContext) -> None:
+        slug = f"league-{uuid.uuid4()}"
+
+        created = await uow_context.client.post("/leagues", json={"slug": slug, "name": "Thursday cube"})
+        duplicate = await uow_context.client.post("/leagues", json={"slug": slug, "name": "Other"})
+        listed = await uow_context.client.get("/leagues")
+
+        assert created.status_code == 200
+        assert duplicate.status_code == 400
+        assert {"id": created.json()["id"], "slug": slug, "name": "Thursday cube"} in listed.json()
+        assert listed.json()[0]["id"] == DEFAULT_LEAGUE_ID
+
+    async def test_unknown_league(self, uow_context: UowContext) -> None:
+        response = await uow_context.client.get("/drafts", headers={LEAGUE_HEADER: f"missing-{uuid.uuid4()}"})
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "League not found"
+
+    async def test_names_are_unique_per_league(self, uow_context: UowContext, other_league: OtherLeague) -> None:
+        name = f"player-{uuid.uuid4()}"
+
+        default = await uow_context.client.post("/players", json={"name": name})
+        other = await uow_context.client.post("/players", json={"name": name}, headers=other_league.headers)
+        again = await uow_context.client.post("/players", json={"name": name}, headers=other_league.headers)
+        draft = await uow_context.client.post(
+            "/drafts",
+            json={
+                "name": other_league.draft["name"],
+                "date": date.today().isoformat(),
+                "player_ids": uow_context.player_ids,
+            },
+        )
+
+        assert default.status_code == 200
+        assert other.status_code == 200
+        assert again.status_code == 400
+        assert draft.status_code == 200
+
+
+@pytest.mark.usefixtures("cache_on")
+class TestIsolation:
+    async def test_reads_only_see_their_league(self, uow_context: UowContext, other_league: OtherLeague) -> None:
+        draft_id = other_league.draft["id"]
+        round_id = other_league.draft["rounds"][0]["id"]
+        own = await uow_context.client.get(f"/drafts/{draft_id}", headers=other_league.headers)
+
+        assert own.status_code == 200
+        assert (await uow_context.client.get(f"/drafts/{draft_id}")).status_code == 404
+        assert (await uow_context.client.get(f"/rounds/{round_id}")).status_code == 404
+        assert (await uow_context.client.get(f"/players/{other_league.player_ids[0]}")).status_code == 404
+        listed = (await uow_context.client.get("/drafts", params={"ids": draft_id})).json()
+        assert listed["missing"] == [draft_id]
+        players = (await uow_context.client.get("/players", params={"limit": 1000})).json()
+        assert not {player["id"] for player in players} & set(other_league.player_ids)
+
+    async def test_reads_bind_the_requests_league(self, uow_context: UowContext, other_league: OtherLeague) -> None:
+        default = (await create_draft(uow_context)).json()
+        paths = [
+            (f"/drafts/{draft['id']}", f"/rounds/{draft['rounds'][0]['id']}") for draft in (default, other_league.draft)
+        ]
+
+        # The validators' UNIONs are compiled once, then reused with the other league
+        assert [(await uow_context.client.get(path)).status_code for path in paths[0]] == [200, 200]
+        responses = [await uow_context.client.get(path, headers=other_league.headers) for path in paths[1]]
+
+        assert [response.status_code for response in responses] == [200, 200]
+
+    async def test_sync_only_sees_its_league(self, uow_context: UowContext, other_league: OtherLeague) -> None:
+        an_hour_ago = await uow_context.conn.execute(text("SELECT now()::timestamp - interval '1 hour'"))
+        token = encode_token(SyncPosition(since=an_hour_ago.scalar_one()))
+
+        default = (await uow_context.client.get("/sync", params={"since": token})).json()
+        other = (await uow_context.client.get("/sync", params={"since": token}, headers=other_league.headers)).json()
+
+        assert other_league.draft["id"] not in {draft["id"] for draft in default["drafts"]}
+        assert [draft["id"] for draft in other["drafts"]] == [other_league.draft["id"]]
+        assert {player["id"] for player in other["players"]} == set(other_league.player_ids)
+        assert {match["draft_id"] for match in other["matches"]} == {other_league.draft["id"]}
+
+    async def test_writes_dont_reach_other_leagues(self, uow_context: UowContext, other_league: OtherLeague) -> None:
+        draft_id = other_league.draft["id"]
+        match_id = other_league.draft["rounds"][0]["matches"][0]["id"]
+        player_id = other_league.player_ids[0]
+
+        score = await uow_context.client.put(f"/matches/{match_id}", json={"score": MatchResult.PLAYER_1_WIN.value})
+        points = await uow_context.client.patch(f"/draft-players/{draft_id}/{player_id}", json={"points": 9})
+        rename = await uow_context.client.put(f"/players/{player_id}", json={"name": "renamed"})
+        deleted = await uow_context.client.delete(f"/drafts/{draft_id}")
+        deleted_by_date = await uow_context.client.delete("/drafts", params={"since": date.today().isoformat()})
+
+        assert [score.status_code, points.status_code, rename.status_code, deleted.status_code] == [404] * 4
+        assert draft_id not in deleted_by_date.json().values()
+        untouched = await uow_context.conn.execute(
+            select(Match.score, DraftPlayer.points)
+            .join(DraftPlayer, DraftPlayer.draft_id == Match.draft_id)
+            .where(Match.id == match_id, DraftPlayer.player_id == player_id)
+        )
+        assert untouched.one() == (MatchResult.BASE.value, 0)
+        assert (await uow_context.client.get(f"/drafts/{draft_id}", headers=other_league.headers)).status_code == 200
+
+    async def test_drafts_only_seat_players_of_their_league(
+        self, uow_context: UowContext, other_league: OtherLeague
+    ) -> None:
+        response = await create_draft(uow_context, [*uow_context.player_ids[:2], *other_league.player_ids[:2]])
+
+        assert response.status_code == 400
+
+    async def test_cached_responses_are_per_league(self, uow_context: UowContext, other_league: OtherLeague) -> None:
+        draft_id = other_league.draft["id"]
+
+        await uow_context.client.get(f"/drafts/{draft_id}", headers=other_league.headers)
+        cached = await uow_context.client.get(f"/drafts/{draft_id}", headers=other_league.headers)
+        other = await uow_context.client.get(f"/drafts/{draft_id}")
+
+        assert cached.status_code == 200
+        assert other.status_code == 404
+
+
+class TestMembership:
+    @pytest.fixture
+    async def user(self, uow_context: UowContext) -> User:
+        """An active user who isn't a member of any league, writing with the real membership check."""
+        result = await uow_context.conn.execute(
+            insert(User).returning(User.id), {"email": f"{uuid.uuid4()}@example.com", "hashed_password": "x"}
+        )
+        user = User(id=result.scalar_one(), is_active=True, is_admin=False)
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        del app.dependency_overrides[get_current_league_member]
+        return user
+
+    async def test_only_members_write(self, uow_context: UowContext, other_league: OtherLeague, user: User) -> None:
+        members = f"/leagues/{other_league.league_id}/members"
+
+        def create_player() -> Any:
+            payload = {"name": f"member-{uuid.uuid4()}"}
+            return uow_context.client.post("/players", json=payload, headers=other_league.headers)
+
+        outsider = await create_player()
+        added = await uow_context.client.post(members, json={"user_id": user.id})
+        again = await uow_context.client.post(members, json={"user_id": user.id})
+        member = await create_player()
+        default = await uow_context.client.post("/players", json={"name": f"member-{uuid.uuid4()}"})
+        removed = await uow_context.client.delete(f"{members}/{user.id}")
+        removed_again = await uow_context.client.delete(f"{members}/{user.id}")
+        former = await create_player()
+
+        assert outsider.status_code == 403
+        assert added.json() == again.json() == {"league_id": other_league.league_id, "user_id": user.id}
+        assert member.status_code == 200
+        assert default.status_code == 403
+        assert [removed.status_code, removed_again.status_code, former.status_code] == [200, 404, 403]
+        assert await uow_context.count(LeagueMember, LeagueMember.user_id == user.id) == 0
+
+    async def test_reads_stay_open(self, uow_context: UowContext, other_league: OtherLeague, user: User) -> None:
+        draft_id = other_league.draft["id"]
+
+        read = await uow_context.client.get(f"/drafts/{draft_id}", headers=other_league.headers)
+        results = await uow_context.client.post(f"/drafts/{draft_id}/results", headers=other_league.headers)
+
+        assert read.status_code == 200
+        assert results.status_code == 403
+
+    async def test_admins_write_everywhere(
+        self, uow_context: UowContext, other_league: OtherLeague, user: User
+    ) -> None:
+        user.is_admin = True
+
+        response = await uow_context.client.post(
+            "/players", json={"name": f"admin-{uuid.uuid4()}"}, headers=other_league.headers
+        )
+
+        assert response.status_code == 200
+
+    async def test_unknown_users_and_leagues_are_a_404(self, uow_context: UowContext, user: User) -> None:
+        unknown_user = await uow_context.client.post(f"/leagues/{DEFAULT_LEAGUE_ID}/members", json={"user_id": -1})
+        unknown_league = await uow_context.client.post("/leagues/-1/members", json={"user_id": user.id})
+
+        assert [unknown_user.status_code, unknown_league.status_code] == [404, 404]
@@ -0,0 +1,147 @@
+from datetime import date
+from typing import Any, AsyncIterator, List, Set, Tuple
+
+import pytest
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.models import Match, Round
+from app.core.tests.conftest import UowContext, create_draft
+from app.core.utils.partitions import create_partitions, is_partition, parent_table, partition_name
+
+
+class TestPartitionNames:
+    def test_partition_names_map_to_their_table(self) -> None:
+        assert partition_name("matches", 2024) == "matches_y2024"
+        assert parent_table("matches_y2024") == "matches"
+        assert parent_table("rounds_default") == "rounds"
+        assert parent_table("drafts") == "drafts"
+        assert parent_table("draft_players_y2024") == "draft_players_y2024"
+
+    def test_is_partition(self) -> None:
+        assert is_partition("rounds_y2024")
+        assert is_partition("matches_default")
+        assert not is_partition("matches")
+        assert not is_partition("matches_y24")
+        assert not is_partition("ix_matches_y2024")
+
+
+@pytest.fixture
+async def partitioned_conn(pg_engine: AsyncEngine) -> AsyncIterator[AsyncConnection]:
+    """Connection in a transaction that is rolled back afterwards, skipped unless matches is partitioned."""
+    async with pg_engine.connect() as conn:
+        transaction = await conn.begin()
+        result = await conn.execute(
+            text("SELECT count(*) FROM pg_partitioned_table WHERE partrelid = to_regclass('matches')")
+        )
+        if not result.scalar_one():
+            await transaction.rollback()
+            pytest.skip("Partition tests need a migrated database")
+        yield conn
+        await transaction.rollback()
+
+
+async def scanned_relations(conn: AsyncConnection, statement: str, parameters: Any) -> Set[str]:
+    """Tables and partitions the plan of `statement` reads, those pruned at planning or execution excluded."""
+    result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters)
+    relations: Set[str] = set()
+    nodes = [result.scalar_one()[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        nodes.extend(node.get("Plans", []))
+        if "Relation Name" in node and node.get("Actual Loops", 1):
+            relations.add(node["Relation Name"])
+    return relations
+
+
+async def captured(conn: AsyncConnection, stmt: Any) -> List[Tuple[str, Any]]:
+    statements: List[Tuple[str, Any]] = []
+
+    def capture(_conn: Any, _cursor: Any, statement: str, parameters: Any, *_: Any) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(conn.sync_connection, "before_cursor_execute", capture)
+    try:
+        session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+        await session.execute(stmt)
+        await session.close()
+    finally:
+        event.remove(conn.sync_connection, "before_cursor_execute", capture)
+    return [(statement, parameters) for statement, parameters in statements if "SAVEPOINT" not in statement]
+
+
+class TestPartitionPruning:
+    async def test_date_range_reads_one_year(self, partitioned_conn: AsyncConnection) -> None:
+        await create_partitions(partitioned_conn, 2024, 2024)
+        stmt = select(Match.id).where(Match.draft_date >= date(2024, 3, 1), Match.draft_date < date(2024, 4, 1))
+
+        ((statement, parameters),) = await captured(partitioned_conn, stmt)
+
+        assert await scanned_relations(partitioned_conn, statement, parameters) == {"matches_y2024"}
+
+    async def test_export_since_skips_older_years(self, partitioned_conn: AsyncConnection) -> None:
+        since = date(date.today().year, 1, 1)
+        stmt = (
+            select(Match.id, Round.number)
+            .join(Round, (Round.id == Match.round_id) & (Round.draft_date == Match.draft_date))
+            .where(Match.draft_date >= since, Round.draft_date >= since)
+        )
+
+        ((statement, parameters),) = await captured(partitioned_conn, stmt)
+        relations = await scanned_relations(partitioned_conn, statement, parameters)
+
+        assert relations
+        assert all(int(name[-4:]) >= since.year for name in relations if not name.endswith("_default"))
+
+    async def test_draft_matches_load_from_the_drafts_year(self, uow_context: UowContext) -> None:
+        await create_partitions(uow_context.conn, 2024, 2024)
+        draft_id = (await create_draft(uow_context, draft_date=date(2024, 5, 1))).json()["id"]
+        stmt = select(Round).where(Round.draft_id == draft_id).options(selectinload(Round.matches))
+
+        _, (statement, parameters) = await captured(uow_context.conn, stmt)
+
+        assert await scanned_relations(uow_context.conn, statement, parameters) == {"matches_y2024"}
+
+
+class TestCreatePartitions:
+    async def test_creates_missing_years_once(self, partitioned_conn: AsyncConnection) -> None:
+        created = await create_partitions(partitioned_conn, 2990, 2991)
+        again = await create_partitions(partitioned_conn, 2990, 2991)
+
+        assert created == ["rounds_y2990", "matches_y2990", "rounds_y2991", "matches_y2991"]
+        assert again == []
+
+    async def test_new_drafts_land_in_their_years_partition(self, uow_context: UowContext) -> None:
+        await create_partitions(uow_context.conn, 2990, 2990)
+
+        draft = (await create_draft(uow_context, draft_date=date(2990, 5, 1))).json()
+
+        result = await uow_context.conn.execute(
+            text("SELECT DISTINCT tableoid::regclass::text FROM matches WHERE draft_id = :draft_id"),
+            {"draft_id": draft["id"]},
+        )
+        assert result.scalars().all() == ["matches_y2990"]
+
+    async def test_moves_rows_out_of_the_default_partition(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context, draft_date=date(2995, 5, 1))).json()
+        before = (await uow_context.client.get(f"/drafts/{draft['id']}")).json()
+
+        created = await create_partitions(uow_context.conn, 2995, 2995)
+
+        assert created == ["rounds_y2995", "matches_y2995"]
+        # Writers wait until the moved rows are back
+        result = await uow_context.conn.execute(
+            text(
+                "SELECT relation::regclass::text FROM pg_locks "
+                "WHERE pid = pg_backend_pid() AND mode = 'ExclusiveLock' AND locktype = 'relation' ORDER BY 1"
+            )
+        )
+        assert result.scalars().all() == ["matches_default", "rounds_default"]
+        for table in ("rounds", "matches"):
+            result = await uow_context.conn.execute(
+                text(f"SELECT DISTINCT tableoid::regclass::text FROM {table} WHERE draft_id = :draft_id"),
+                {"draft_id": draft["id"]},
+            )
+            assert result.scalars().all() == [partition_name(table, 2995)]
+        assert (await uow_context.client.get(f"/drafts/{draft['id']}")).json() == before
@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.core.models import DraftPlayer, Match, MatchResult
+from app.core.utils.drafts import assign_final_places, schedule_pairings
+from app.core.utils.projections import OUTCOMES, outcome_probabilities, rank_places, simulate
+
+
+def round_robin(player_count: int) -> list[tuple[int, int]]:
+    player_ids: list = list(range(1, player_count + 1))
+    if player_count % 2:
+        player_ids.append(None)
+    return [pair for round_pairings in schedule_pairings(player_ids) for pair in round_pairings]
+
+
+class TestRankPlaces:
+    @pytest.mark.parametrize("player_count", [4, 5, 8, 9])
+    def test_matches_assign_final_places(self, player_count: int) -> None:
+        rng = random.Random(player_count)
+        pairs = round_robin(player_count)
+        player_1 = np.array([player_1_id - 1 for player_1_id, _ in pairs])
+        player_2 = np.array([player_2_id - 1 for _, player_2_id in pairs])
+
+        for _ in range(50):
+            # Mostly 2-1 results, so ties and head-to-head splits are common
+            outcomes = [rng.choice([1, 1, 2, 2, 0, 3]) for _ in pairs]
+            draft_players = [DraftPlayer(player_id=player_id) for player_id in range(1, player_count + 1)]
+            matches = [
+                Match(player_1_id=player_1_id, player_2_id=player_2_id, score=OUTCOMES[outcome])
+                for (player_1_id, player_2_id), outcome in zip(pairs, outcomes, strict=True)
+            ]
+            assign_final_places(draft_players, matches)
+
+            points, places = rank_places(player_count, player_1, player_2, np.array([outcomes]))
+
+            assert points[0].tolist() == [draft_player.points for draft_player in draft_players]
+            assert places[0].tolist() == [draft_player.final_place for draft_player in draft_players]
+
+
+class TestSimulate:
+    def test_finished_draft_is_certain(self) -> None:
+        pairs = round_robin(4)
+        matches = [(player_1_id, player_2_id, MatchResult.PLAYER_1_WIN.value) for player_1_id, player_2_id in pairs]
+
+        projection = simulate([1, 2, 3, 4], matches, np.empty((0, 4)), 100, np.random.default_rng(0))
+
+        assert projection.place_probabilities.max(axis=1).tolist() == [1.0] * 4
+        assert projection.current_points.tolist() == projection.expected_points.tolist()
+
+    def test_distributions_sum_to_one(self) -> None:
+        matches = [(player_1_id, player_2_id, MatchResult.BASE.value) for player_1_id, player_2_id in round_robin(8)]
+        probabilities = np.full((len(matches), 4), 0.25)
+
+        projection = simulate(list(range(1, 9)), matches, probabilities, 1000, np.random.default_rng(0))
+
+        assert projection.place_probabilities.sum(axis=1) == pytest.approx(np.ones(8))
+        assert projection.current_points.tolist() == [0] * 8
+
+
+class TestOutcomeProbabilities:
+    def test_even_players(self) -> None:
+        probabilities = outcome_probabilities([1], [2], {1: 0.5, 2: 0.5}, full_win_share=0.4)
+
+        assert probabilities.tolist() == [[0.2, 0.3, 0.3, 0.2]]
+
+    def test_stronger_player_favoured(self) -> None:
+        probabilities = outcome_probabilities([1], [2], {1: 0.7, 2: 0.4}, full_win_share=0.5)
+
+        assert probabilities[0, :2].sum() > 0.7
+        assert probabilities.sum() == pytest.approx(1.0)
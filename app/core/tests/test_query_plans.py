@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from typing import Annotated, Any, AsyncIterator, Dict, Iterator, List, Tuple
+
+import httpx
+import pytest
+from fastapi import Header
+from sqlalchemy import event, func, select, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.auth.models import User
+from app.auth.utils import get_current_active_user, get_current_league_member
+from app.core.models import Draft, DraftPlayer, Match, MatchResult, Round
+from app.core.utils.partitions import parent_table
+from app.core.utils.sync import SyncPosition, encode_token
+from app.db.database import get_db
+from app.db.leagues import DEFAULT_LEAGUE, scope_to_league
+from app.main import app
+
+# Tables that grow with every draft, a sequential scan on them means a missing index
+LARGE_TABLES = {"drafts", "rounds", "matches", "draft_players"}
+MIN_MATCHES = 10_000
+# Reading a partition of a few pages beats its index, the planner rightly scans those
+MIN_PARTITION_PAGES = 10
+
+
+@dataclass
+class PlanContext:
+    client: httpx.AsyncClient
+    conn: AsyncConnection
+    statements: List[Tuple[str, Any]]
+    ids: Dict[str, Any]
+
+
+@pytest.fixture
+async def plan_context(pg_engine: AsyncEngine) -> AsyncIterator[PlanContext]:
+    """
+    Client whose requests run inside a transaction that is rolled back afterwards, capturing every
+    statement. Needs a seeded database, e.g. `python -m app.benchmarks seed --yes`.
+    """
+    async with pg_engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            match_count = (await conn.execute(select(func.count()).select_from(Match))).scalar_one()
+        except ProgrammingError:
+            pytest.skip("Query plans need a migrated database")
+        if match_count < MIN_MATCHES:
+            pytest.skip(f"Query plans need a database with at least {MIN_MATCHES} matches")
+
+        draft_id, round_id, player_id = (
+            await conn.execute(
+                select(Draft.id, Round.id, DraftPlayer.player_id)
+                .join(Round, Round.draft_id == Draft.id)
+                .join(DraftPlayer, DraftPlayer.draft_id == Draft.id)
+                .order_by(Draft.id)
+                .limit(1)
+            )
+        ).one()
+        match_id = (await conn.execute(select(Match.id).where(Match.round_id == round_id).limit(1))).scalar_one()
+        # A sync right after the previous one, which reads few changed rows
+        now = (await conn.execute(text("SELECT now()::timestamp"))).scalar_one()
+
+        session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        statements: List[Tuple[str, Any]] = []
+
+        def capture(_conn: Any, _cursor: Any, statement: str, parameters: Any, *_: Any) -> None:
+            statements.append((statement, parameters))
+
+        async def override_get_db(x_league: Annotated[str, Header()] = DEFAULT_LEAGUE) -> AsyncIterator[AsyncSession]:
+            await scope_to_league(session, x_league)
+            yield session
+
+        event.listen(conn.sync_connection, "before_cursor_execute", capture)
+        app.dependency_overrides[get_db] = override_get_db
+        user = User(id=0, email="plans@example.com")
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_current_league_member] = lambda: user
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                ids = {
+                    "draft": draft_id,
+                    "round": round_id,
+                    "player": player_id,
+                    "match": match_id,
+                    "sync_token": encode_token(SyncPosition(since=now)),
+                    # The second page of a sync from scratch
+                    "sync_page_token": encode_token(
+                        SyncPosition(
+                            horizon=now,
+                            after={"matches": (now, [0]), "draft_players": (now, [0, 0]), "players": (now, [0])},
+                        )
+                    ),
+                }
+                yield PlanContext(client=client, conn=conn, statements=statements, ids=ids)
+        finally:
+            app.dependency_overrides.clear()
+            event.remove(conn.sync_connection, "before_cursor_execute", capture)
+            await session.close()
+            await transaction.rollback()
+
+
+def _walk(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+async def _sequential_scans(ctx: PlanContext) -> List[str]:
+    scans: List[str] = []
+    result = await ctx.conn.execute(
+        text("SELECT relname FROM pg_class WHERE relispartition AND relpages < :pages"), {"pages": MIN_PARTITION_PAGES}
+    )
+    small_partitions = set(result.scalars())
+    for statement, parameters in list(ctx.statements):
+        if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            continue
+        result = await ctx.conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar_one()[0]["Plan"]
+        scans.extend(
+            f"{node['Relation Name']}: {statement}"
+            for node in _walk(plan)
+            if node["Node Type"] == "Seq Scan"
+            and parent_table(node.get("Relation Name", "")) in LARGE_TABLES
+            and node["Relation Name"] not in small_partitions
+        )
+    return scans
+
+
+REQUESTS = [
+    ("GET", "/drafts/{draft}", None),
+    ("GET", "/drafts?skip=0&limit=100", None),
+    ("GET", "/drafts?ids={draft}", None),
+    ("GET", "/rounds/{round}", None),
+    ("GET", "/rounds/{round}/matches", None),
+    ("GET", "/rounds?ids={round}", None),
+    ("GET", "/players/{player}", None),
+    ("GET", "/players", None),
+    ("GET", "/players/{player}/placements", None),
+    ("GET", "/sync?since={sync_token}", None),
+    ("GET", "/sync?since={sync_page_token}&limit=100", None),
+    ("PUT", "/matches/{match}", {"score": MatchResult.PLAYER_1_WIN.value}),
+    ("PATCH", "/draft-players/{draft}/{player}", {"points": 3}),
+    ("POST", "/drafts/{draft}/results", None),
+]
+
+
+@pytest.mark.parametrize(("method", "path", "payload"), REQUESTS, ids=[f"{m} {p}" for m, p, _ in REQUESTS])
+async def test_no_sequential_scans_on_large_tables(
+    plan_context: PlanContext, method: str, path: str, payload: Dict[str, Any] | None
+) -> None:
+    response = await plan_context.client.request(method, path.format(**plan_context.ids), json=payload)
+
+    assert response.status_code < 400, response.text
+    assert plan_context.statements
+    assert await _sequential_scans(plan_context) == []
@@ -0,0 +1,82 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.core.tests.conftest import UowContext, create_draft
+from app.core.utils.drafts import schedule_pairings
+from app.core.utils.seating import PairIndex, load_pair_index, optimize_seating, seat_pairs
+
+
+def first_round(player_ids: list) -> set[frozenset[int]]:
+    if len(player_ids) % 2:
+        player_ids = player_ids + [None]
+    return {frozenset(pair) for pair in schedule_pairings(player_ids)[0]}
+
+
+class TestSeatPairs:
+    def test_matches_schedule(self) -> None:
+        seats_1, seats_2, round_weights = seat_pairs(4)
+
+        assert list(zip(seats_1.tolist(), seats_2.tolist(), strict=True)) == [
+            (0, 1),
+            (2, 3),
+            (0, 3),
+            (1, 2),
+            (0, 2),
+            (3, 1),
+        ]
+        assert round_weights.tolist() == [1.0, 1.0, 0.5, 0.5, 1 / 3, 1 / 3]
+
+
+class TestOptimizeSeating:
+    def test_no_history_keeps_order(self) -> None:
+        seating = optimize_seating([4, 3, 2, 1], PairIndex([4, 3, 2, 1], {}), 0.01, np.random.default_rng(0))
+
+        assert seating.player_ids == [4, 3, 2, 1]
+        assert seating.repeat_score == seating.original_repeat_score == 0
+
+    def test_avoids_last_opponents_in_first_round(self) -> None:
+        player_ids = [1, 2, 3, 4, 5, 6]
+        pair_index = PairIndex(player_ids, {(1, 2): 1.0, (3, 4): 1.0, (6, 5): 0.5})
+
+        seating = optimize_seating(player_ids, pair_index, 0.05, np.random.default_rng(0))
+
+        assert sorted(seating.player_ids) == player_ids
+        assert seating.repeat_score < seating.original_repeat_score
+        assert first_round(seating.player_ids).isdisjoint({frozenset((1, 2)), frozenset((3, 4)), frozenset((5, 6))})
+
+    def test_odd_player_count(self) -> None:
+        player_ids = [1, 2, 3, 4, 5]
+        pair_index = PairIndex(player_ids, {(1, 2): 1.0, (3, 4): 1.0})
+
+        seating = optimize_seating(player_ids, pair_index, 0.05, np.random.default_rng(0))
+
+        assert sorted(seating.player_ids) == player_ids
+        assert first_round(seating.player_ids).isdisjoint({frozenset((1, 2)), frozenset((3, 4))})
+
+    def test_sixteen_players_improve(self) -> None:
+        rng = np.random.default_rng(0)
+        player_ids = list(range(1, 17))
+        weights = {(a, b): float(rng.random()) for a in player_ids for b in player_ids if a < b and rng.random() < 0.5}
+
+        seating = optimize_seating(player_ids, PairIndex(player_ids, weights), 0.05, rng)
+
+        assert seating.repeat_score <= seating.original_repeat_score
+
+
+class TestLoadPairIndex:
+    async def test_counts_only_the_last_drafts(self, uow_context: UowContext, monkeypatch: pytest.MonkeyPatch) -> None:
+        player_ids = uow_context.player_ids
+        for day in (1, 2, 3):
+            assert (await create_draft(uow_context, draft_date=date(2099, 1, day))).status_code == 200
+        monkeypatch.setattr(settings, "SEATING_HISTORY_DRAFTS", 2)
+
+        pair_index = await load_pair_index(uow_context.session, player_ids)
+
+        # Four players meet each other once per draft: 1 for the last one, 1/2 for the one before
+        expected = np.full((5, 5), 1.5)
+        np.fill_diagonal(expected, 0)
+        expected[4, :] = expected[:, 4] = 0
+        assert pair_index.matrix.tolist() == expected.tolist()
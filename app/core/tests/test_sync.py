@@ -0,0 +1,191 @@
+import base64
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, text, update
+
+from app.config import settings
+from app.core.models import Draft, DraftPlayer, League, Match, MatchResult, Player, Round
+from app.core.tests.conftest import UowContext, create_draft
+from app.core.utils.sync import SYNCED, SyncPosition, decode_token, encode_token, skip_tombstones
+from app.db.leagues import LEAGUE_HEADER
+
+SYNCED_NAMES = [name for name, *_ in SYNCED]
+
+
+def b64(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+class TestTokens:
+    def test_round_trip(self) -> None:
+        at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+        position = SyncPosition(since=at, horizon=at, after={"matches": (at, [3]), "draft_players": (at, [1, 2])})
+
+        assert decode_token(encode_token(SyncPosition(since=at))) == SyncPosition(since=at)
+        assert decode_token(encode_token(position)) == position
+
+    def test_tokens_of_unpaged_syncs_still_work(self) -> None:
+        assert decode_token(b64("1:2024-05-01T12:30:15")) == SyncPosition(since=datetime(2024, 5, 1, 12, 30, 15))
+
+    # Empty, not base64, unknown version, not a timestamp, not JSON, unknown table and wrong key
+    @pytest.mark.parametrize(
+        "token",
+        [
+            "",
+            "not a token",
+            b64("3:2024-05-01"),
+            b64("1:yesterday"),
+            b64("2:2024-05-01"),
+            b64('2:{"after": {"users": ["2024-05-01T00:00:00", [1]]}}'),
+            b64('2:{"after": {"draft_players": ["2024-05-01T00:00:00", [1]]}}'),
+        ],
+    )
+    def test_invalid_tokens_are_a_400(self, token: str) -> None:
+        with pytest.raises(HTTPException) as exc_info:
+            decode_token(token)
+
+        assert exc_info.value.status_code == 400
+
+
+async def create_aged_draft(uow_context: UowContext) -> Dict[str, Any]:
+    """A draft whose rows, and those of its players, were last changed an hour before the transaction began."""
+    draft = (await create_draft(uow_context)).json()
+    hour_ago = text("now() - interval '1 hour'")
+    await uow_context.conn.execute(update(Draft).where(Draft.id == draft["id"]).values(updated_at=hour_ago))
+    for model in (Round, Match, DraftPlayer):
+        await uow_context.conn.execute(update(model).where(model.draft_id == draft["id"]).values(updated_at=hour_ago))
+    await uow_context.conn.execute(
+        update(Player).where(Player.id.in_(uow_context.player_ids)).values(updated_at=hour_ago)
+    )
+    return draft  # type: ignore[no-any-return]
+
+
+async def half_an_hour_ago(uow_context: UowContext) -> str:
+    now = (await uow_context.conn.execute(text("SELECT now()::timestamp"))).scalar_one()
+    return encode_token(SyncPosition(since=now - timedelta(minutes=30)))
+
+
+async def sync_pages(uow_context: UowContext, params: Dict[str, Any], **kwargs: Any) -> List[Dict[str, Any]]:
+    """Every page of a sync, following the tokens until `has_more` is off."""
+    pages: List[Dict[str, Any]] = []
+    while not pages or pages[-1]["has_more"]:
+        response = await uow_context.client.get("/sync", params=params, **kwargs)
+        assert response.status_code == 200
+        pages.append(response.json())
+        params = {**params, "since": pages[-1]["token"]}
+    return pages
+
+
+async def sync_all(uow_context: UowContext, since: str | None = None) -> Dict[str, Any]:
+    """One body with the rows of every page of a sync, and the deletes and token of its last page."""
+    pages = await sync_pages(uow_context, {"limit": 10000} if since is None else {"since": since, "limit": 10000})
+    body: Dict[str, Any] = {name: [row for page in pages for row in page[name]] for name in SYNCED_NAMES}
+    return {**body, "deleted": pages[-1]["deleted"], "token": pages[-1]["token"]}
+
+
+class TestSync:
+    async def test_without_a_token_returns_everything(self, uow_context: UowContext) -> None:
+        draft = await create_aged_draft(uow_context)
+
+        body = await sync_all(uow_context)
+
+        assert draft["id"] in {row["id"] for row in body["drafts"]}
+        assert {row["id"] for row in body["matches"] if row["draft_id"] == draft["id"]} == {
+            match["id"] for round_ in draft["rounds"] for match in round_["matches"]
+        }
+        assert set(uow_context.player_ids) <= {row["id"] for row in body["players"]}
+        assert body["deleted"] == {"drafts": [], "players": []}
+        decode_token(body["token"])
+
+    async def test_returns_only_the_rows_changed_since_the_token(self, uow_context: UowContext) -> None:
+        draft = await create_aged_draft(uow_context)
+        match = draft["rounds"][0]["matches"][0]
+        since = await half_an_hour_ago(uow_context)
+
+        unchanged = await sync_all(uow_context, since)
+        await uow_context.client.put(f"/matches/{match['id']}", json={"score": MatchResult.PLAYER_1_WIN.value})
+        changed = await sync_all(uow_context, since)
+
+        assert [row for row in unchanged["matches"] if row["draft_id"] == draft["id"]] == []
+        assert [(row["id"], row["score"]) for row in changed["matches"] if row["draft_id"] == draft["id"]] == [
+            (match["id"], MatchResult.PLAYER_1_WIN.value)
+        ]
+        assert draft["id"] not in {row["id"] for row in changed["drafts"]}
+        assert not set(uow_context.player_ids) & {row["id"] for row in changed["players"]}
+
+    async def test_the_token_starts_at_the_oldest_running_transaction(self, uow_context: UowContext) -> None:
+        # The test's own transaction is still running, so its rows must come again with the new token
+        draft = await create_aged_draft(uow_context)
+        await uow_context.client.patch(f"/draft-players/{draft['id']}/{uow_context.player_ids[0]}", json={"points": 3})
+
+        token = (await sync_all(uow_context, await half_an_hour_ago(uow_context)))["token"]
+        again = await sync_all(uow_context, token)
+
+        assert [row["player_id"] for row in again["draft_players"] if row["draft_id"] == draft["id"]] == [
+            uow_context.player_ids[0]
+        ]
+
+    async def test_deleted_drafts_are_tombstoned(self, uow_context: UowContext) -> None:
+        draft = await create_aged_draft(uow_context)
+        since = await half_an_hour_ago(uow_context)
+
+        await uow_context.client.delete(f"/drafts/{draft['id']}")
+        body = await sync_all(uow_context, since)
+
+        assert draft["id"] in body["deleted"]["drafts"]
+        assert draft["id"] not in {row["draft_id"] for row in body["matches"]}
+
+    async def test_archived_drafts_are_not_tombstoned(self, uow_context: UowContext) -> None:
+        draft = await create_aged_draft(uow_context)
+        since = await half_an_hour_ago(uow_context)
+
+        await skip_tombstones(uow_context.session)
+        await uow_context.session.execute(delete(Draft).where(Draft.id == draft["id"]))
+        body = await sync_all(uow_context, since)
+
+        assert draft["id"] not in body["deleted"]["drafts"]
+
+    async def test_expired_tokens_are_a_410(self, uow_context: UowContext) -> None:
+        now = (await uow_context.conn.execute(text("SELECT now()::timestamp"))).scalar_one()
+        since = encode_token(SyncPosition(since=now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS + 1)))
+
+        response = await uow_context.client.get("/sync", params={"since": since})
+
+        assert response.status_code == 410
+
+
+class TestPages:
+    async def test_pages_through_more_rows_than_the_limit(self, uow_context: UowContext) -> None:
+        # A league of its own, whose rows all share the test transaction's updated_at
+        slug = f"league-{uuid.uuid4()}"
+        league_id = (
+            await uow_context.conn.execute(insert(League).values(slug=slug, name=slug).returning(League.id))
+        ).scalar_one()
+        result = await uow_context.conn.execute(
+            insert(Player).returning(Player.id),
+            [{"name": f"sync-{uuid.uuid4()}", "league_id": league_id} for _ in range(5)],
+        )
+        headers = {LEAGUE_HEADER: slug}
+        player_ids = list(result.scalars())
+        draft = (await create_draft(uow_context, player_ids[:4], headers=headers)).json()
+        await uow_context.client.delete(f"/players/{player_ids[4]}", headers=headers)
+        since = await half_an_hour_ago(uow_context)
+
+        pages = await sync_pages(uow_context, {"since": since, "limit": 2}, headers=headers)
+        everything = (await uow_context.client.get("/sync", params={"since": since}, headers=headers)).json()
+
+        # 6 matches, 4 draft players, 3 rounds, 1 draft and 4 players
+        assert len(pages) == 3
+        for name in ("matches", "draft_players", "rounds", "drafts", "players"):
+            rows = [row for page in pages for row in page[name]]
+            assert all(len(page[name]) <= 2 for page in pages)
+            assert rows == sorted(everything[name], key=lambda row: tuple(row.get(key) for key in ("id", "player_id")))
+        assert len({row["id"] for page in pages for row in page["matches"]}) == 6
+        assert [page["deleted"]["players"] for page in pages] == [[], [], [player_ids[4]]]
+        assert not everything["has_more"]
+        assert decode_token(pages[-1]["token"]) == decode_token(everything["token"])
+        assert {row["id"] for page in pages for row in page["drafts"]} == {draft["id"]}
@@ -0,0 +1,265 @@
+import uuid
+from datetime import date
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.models import User
+from app.auth.utils import get_current_active_user
+from app.core.models import Draft, DraftPlayer, Match, MatchResult, Player, Round
+from app.core.routers import drafts as drafts_router
+from app.core.tests.conftest import UowContext, create_draft
+from app.core.utils.drafts import calculate_points
+from app.db.database import get_uow
+from app.main import app
+
+
+class TestGetUow:
+    async def test_commits_once_after_the_handler(self, mock_db: AsyncMock) -> None:
+        mock_db.in_transaction.return_value = True
+        uow = get_uow(mock_db)
+
+        assert await anext(uow) is mock_db
+        with pytest.raises(StopAsyncIteration):
+            await anext(uow)
+
+        mock_db.commit.assert_awaited_once()
+        mock_db.rollback.assert_not_awaited()
+
+    async def test_rolls_back_when_the_handler_raises(self, mock_db: AsyncMock) -> None:
+        uow = get_uow(mock_db)
+        await anext(uow)
+
+        with pytest.raises(ValueError):
+            await uow.athrow(ValueError("boom"))
+
+        mock_db.rollback.assert_awaited_once()
+        mock_db.commit.assert_not_awaited()
+
+    async def test_skips_the_commit_without_a_transaction(self, mock_db: AsyncMock) -> None:
+        mock_db.in_transaction.return_value = False
+        uow = get_uow(mock_db)
+        await anext(uow)
+
+        with pytest.raises(StopAsyncIteration):
+            await anext(uow)
+
+        mock_db.commit.assert_not_awaited()
+
+
+class TestCommitsPerRequest:
+    async def test_create_draft_commits_once(self, uow_context: UowContext) -> None:
+        response = await create_draft(uow_context)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["rounds"]) == 3
+        assert all(match["player_1"]["id"] for r in body["rounds"] for match in r["matches"])
+        assert len(uow_context.commits) == 1
+
+    async def test_create_draft_with_a_wrong_player_writes_nothing(self, uow_context: UowContext) -> None:
+        drafts_before = await uow_context.count(Draft)
+
+        response = await create_draft(uow_context, [uow_context.player_ids[0], -1])
+
+        assert response.status_code == 400
+        assert uow_context.commits == []
+        assert await uow_context.count(Draft) == drafts_before
+
+    async def test_player_writes_commit_once(self, uow_context: UowContext) -> None:
+        name = f"uow-{uuid.uuid4()}"
+
+        created = await uow_context.client.post("/players", json={"name": name})
+        duplicate = await uow_context.client.post("/players", json={"name": name})
+        renamed = await uow_context.client.put(f"/players/{created.json()['id']}", json={"name": f"{name}-2"})
+        deleted = await uow_context.client.delete(f"/players/{created.json()['id']}")
+
+        assert [created.status_code, duplicate.status_code, renamed.status_code, deleted.status_code] == [
+            200,
+            400,
+            200,
+            200,
+        ]
+        assert len(uow_context.commits) == 3
+        assert await uow_context.count(Player, Player.name.startswith(name)) == 0
+
+    async def test_score_and_results_commit_once_each(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context, uow_context.player_ids[:2])).json()
+        match = draft["rounds"][0]["matches"][0]
+        draft_player = draft["draft_players"][0]
+        uow_context.commits.clear()
+
+        scored = await uow_context.client.put(
+            f"/matches/{match['id']}", json={"score": MatchResult.PLAYER_1_WIN.value, "version": match["version"]}
+        )
+        stale = await uow_context.client.put(
+            f"/matches/{match['id']}", json={"score": MatchResult.PLAYER_2_WIN.value, "version": match["version"]}
+        )
+        patched = await uow_context.client.patch(
+            f"/draft-players/{draft['id']}/{draft_player['player']['id']}", json={"deck_colors": ["white"]}
+        )
+        results = await uow_context.client.post(f"/drafts/{draft['id']}/results")
+
+        assert [scored.status_code, stale.status_code, patched.status_code, results.status_code] == [
+            200,
+            409,
+            200,
+            200,
+        ]
+        assert len(uow_context.commits) == 3
+
+    async def test_results_racing_a_draft_player_update_are_a_409(
+        self, uow_context: UowContext, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        draft = (await create_draft(uow_context)).json()
+        for db_round in draft["rounds"]:
+            for match in db_round["matches"]:
+                await uow_context.client.put(f"/matches/{match['id']}", json={"score": MatchResult.PLAYER_1_WIN.value})
+
+        async def racing_update(db_draft: Draft, db: AsyncSession) -> None:
+            # Loaded at their current version, then updated by another request before the flush. Held on
+            # to, the identity map would drop them and the calculation would load the new version.
+            loaded = (await db.execute(select(DraftPlayer).where(DraftPlayer.draft_id == db_draft.id))).scalars().all()
+            await uow_context.conn.execute(
+                update(DraftPlayer).where(DraftPlayer.draft_id == db_draft.id).values(version=DraftPlayer.version + 1)
+            )
+            await calculate_points(db_draft, db)
+            del loaded
+
+        monkeypatch.setattr(drafts_router, "calculate_points", racing_update)
+        uow_context.commits.clear()
+
+        response = await uow_context.client.post(f"/drafts/{draft['id']}/results")
+
+        assert response.status_code == 409
+        assert uow_context.commits == []
+
+    async def test_delete_draft_commits_once(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context)).json()
+        uow_context.commits.clear()
+
+        uow_context.statements.clear()
+
+        response = await uow_context.client.delete(f"/drafts/{draft['id']}")
+
+        assert response.status_code == 200
+        assert len(uow_context.commits) == 1
+        assert len(uow_context.statements) == 1
+        assert await uow_context.count(Round, Round.draft_id == draft["id"]) == 0
+        assert await uow_context.count(Match, Match.draft_id == draft["id"]) == 0
+        assert await uow_context.count(DraftPlayer, DraftPlayer.draft_id == draft["id"]) == 0
+
+    async def test_delete_missing_draft_is_a_404(self, uow_context: UowContext) -> None:
+        response = await uow_context.client.delete("/drafts/-1")
+
+        assert response.status_code == 404
+        assert uow_context.commits == []
+
+    async def test_bulk_delete_drafts_by_ids(self, uow_context: UowContext) -> None:
+        drafts = [(await create_draft(uow_context)).json() for _ in range(3)]
+        uow_context.statements.clear()
+
+        response = await uow_context.client.delete("/drafts", params={"ids": f"{drafts[0]['id']},{drafts[1]['id']},-1"})
+
+        assert response.json() == {"deleted": 2}
+        assert len(uow_context.statements) == 1
+        assert await uow_context.count(Match, Match.draft_id.in_([drafts[0]["id"], drafts[1]["id"]])) == 0
+        assert await uow_context.count(Draft, Draft.id == drafts[2]["id"]) == 1
+
+    async def test_bulk_delete_drafts_by_date_range(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context, draft_date=date(1901, 1, 2))).json()
+
+        response = await uow_context.client.delete("/drafts", params={"since": "1901-01-01", "until": "1901-01-31"})
+        unfiltered = await uow_context.client.delete("/drafts")
+
+        assert response.json() == {"deleted": 1}
+        assert await uow_context.count(DraftPlayer, DraftPlayer.draft_id == draft["id"]) == 0
+        assert unfiltered.status_code == 400
+
+    async def test_reads_do_not_commit(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context)).json()
+        uow_context.commits.clear()
+
+        await uow_context.client.get(f"/drafts/{draft['id']}")
+        await uow_context.client.get("/players")
+
+        assert uow_context.commits == []
+
+
+class TestSingleStatementUpdates:
+    async def test_update_draft_player_returns_the_joined_row(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context, uow_context.player_ids[:2])).json()
+        draft_player = draft["draft_players"][0]
+        uow_context.statements.clear()
+
+        response = await uow_context.client.patch(
+            f"/draft-players/{draft['id']}/{draft_player['player']['id']}",
+            json={"points": 3, "version": draft_player["version"]},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["points"] == 3
+        assert response.json()["version"] == draft_player["version"] + 1
+        assert response.json()["player"] == draft_player["player"]
+        assert len(uow_context.statements) == 1
+        assert "RETURNING" in uow_context.statements[0]
+
+    async def test_update_draft_player_missing_is_a_404(self, uow_context: UowContext) -> None:
+        response = await uow_context.client.patch(f"/draft-players/-1/{uow_context.player_ids[0]}", json={"points": 3})
+
+        assert response.status_code == 404
+        assert len(uow_context.statements) == 1
+
+    async def test_update_player_is_one_statement(self, uow_context: UowContext) -> None:
+        name = f"uow-{uuid.uuid4()}"
+
+        response = await uow_context.client.put(f"/players/{uow_context.player_ids[0]}", json={"name": name})
+        missing = await uow_context.client.put("/players/-1", json={"name": f"{name}-2"})
+
+        assert response.json() == {"id": uow_context.player_ids[0], "name": name}
+        assert missing.status_code == 404
+        assert len(uow_context.statements) == 2
+
+    async def test_set_score_is_one_statement(self, uow_context: UowContext) -> None:
+        draft = (await create_draft(uow_context, uow_context.player_ids[:2])).json()
+        match = draft["rounds"][0]["matches"][0]
+        uow_context.statements.clear()
+
+        scored = await uow_context.client.put(f"/matches/{match['id']}", json={"score": MatchResult.PLAYER_1_WIN.value})
+        missing = await uow_context.client.put("/matches/-1", json={"score": MatchResult.PLAYER_1_WIN.value})
+
+        assert scored.json()["version"] == match["version"] + 1
+        assert missing.status_code == 404
+        assert len(uow_context.statements) == 2
+
+    async def test_user_updates_are_one_statement(self, uow_context: UowContext) -> None:
+        result = await uow_context.conn.execute(
+            insert(User).returning(User.id), {"email": f"{uuid.uuid4()}@example.com", "hashed_password": "x"}
+        )
+        user_id = result.scalar_one()
+        uow_context.statements.clear()
+
+        activated = await uow_context.client.post(f"/users/{user_id}/activate")
+        promoted = await uow_context.client.post(f"/users/{user_id}/promote-to-admin")
+        missing = await uow_context.client.post("/users/-1/activate")
+
+        assert [activated.status_code, promoted.status_code, missing.status_code] == [200, 200, 404]
+        assert len(uow_context.statements) == 3
+
+    async def test_update_user_is_one_statement(self, uow_context: UowContext) -> None:
+        result = await uow_context.conn.execute(
+            insert(User).returning(User.id), {"email": f"{uuid.uuid4()}@example.com", "hashed_password": "x"}
+        )
+        user_id = result.scalar_one()
+        app.dependency_overrides[get_current_active_user] = lambda: User(id=user_id, is_admin=False)
+        email = f"{uuid.uuid4()}@example.com"
+        uow_context.statements.clear()
+
+        response = await uow_context.client.put(f"/users/{user_id}", json={"email": email, "password": "Secret123"})
+        forbidden = await uow_context.client.put("/users/-1", json={"email": email, "password": "Secret123"})
+
+        assert response.json()["email"] == email
+        assert forbidden.status_code == 403
+        assert len(uow_context.statements) == 1
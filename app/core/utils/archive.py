@@ -0,0 +1,333 @@
+import gzip
+import json
+import mmap
+import os
+import struct
+from collections import defaultdict
+from dataclasses import astuple, dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Date, DateTime, Table, delete, exists, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.models import Draft, DraftPlayer, Match, MatchResult, Player, Round
+from app.core.utils.batch import id_in
+from app.core.utils.sync import skip_tombstones
+from app.db.leagues import DEFAULT_LEAGUE_ID, league_of
+
+INDEX_FILE = "index.bin"
+# Draft id, season, offset and length of an index entry
+ENTRY = struct.Struct("<qqqq")
+# Parents first, so restored rows satisfy their foreign keys
+TABLES: List[Table] = [Draft.__table__, Round.__table__, DraftPlayer.__table__, Match.__table__]  # type: ignore[list-item]
+# Archived along with their drafts but never deleted by the archive
+PLAYERS: Table = Player.__table__  # type: ignore[assignment]
+
+Record = Dict[str, List[Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """An archived draft is one gzip member of its season's file, at `offset`."""
+
+    draft_id: int
+    season: int
+    offset: int
+    length: int
+
+
+class ArchiveIndex:
+    """
+    Index of the archived drafts, fixed-size entries sorted by draft id. The file is memory-mapped
+    on the first lookup and binary searched in place, and mapped again once an archive or restore
+    run replaced it.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._mmap: mmap.mmap | None = None
+        self._version: Tuple[int, int, int] | None = None
+
+    def _mapped(self) -> mmap.mmap | None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._mmap, self._version = None, None
+            return None
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if version != self._version:
+            self._mmap = None
+            if stat.st_size:
+                with open(self.path, "rb") as file:
+                    self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._version = version
+        return self._mmap
+
+    def lookup(self, draft_id: int) -> ArchiveEntry | None:
+        mapped = self._mapped()
+        if mapped is None:
+            return None
+        low, high = 0, len(mapped) // ENTRY.size
+        while low < high:
+            middle = (low + high) // 2
+            entry = ArchiveEntry(*ENTRY.unpack_from(mapped, middle * ENTRY.size))
+            if entry.draft_id == draft_id:
+                return entry
+            if entry.draft_id < draft_id:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def entries(self) -> List[ArchiveEntry]:
+        mapped = self._mapped()
+        if mapped is None:
+            return []
+        return [ArchiveEntry(*values) for values in ENTRY.iter_unpack(mapped)]
+
+
+_indexes: Dict[Path, ArchiveIndex] = {}
+
+
+def get_index(directory: Path) -> ArchiveIndex:
+    """The index of an archive directory, kept mapped between lookups."""
+    path = directory / INDEX_FILE
+    if path not in _indexes:
+        _indexes[path] = ArchiveIndex(path)
+    return _indexes[path]
+
+
+def season_path(directory: Path, season: int) -> Path:
+    return directory / f"drafts-{season}.jsonl.gz"
+
+
+def write_index(directory: Path, entries: Iterable[ArchiveEntry]) -> None:
+    """Replace the index atomically, the last entry of a draft id wins."""
+    by_id = {entry.draft_id: entry for entry in entries}
+    temporary = directory / f"{INDEX_FILE}.tmp"
+    with open(temporary, "wb") as file:
+        for draft_id in sorted(by_id):
+            file.write(ENTRY.pack(*astuple(by_id[draft_id])))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, directory / INDEX_FILE)
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Can't archive {type(value).__name__}")
+
+
+def append_records(directory: Path, season: int, records: Sequence[Tuple[int, Record]]) -> List[ArchiveEntry]:
+    """
+    Append every record as its own gzip member to the season's file, a concatenation of members
+    is still a valid gzip file of JSON lines. Synced to disk before returning.
+    """
+    entries = []
+    with open(season_path(directory, season), "ab") as file:
+        for draft_id, record in records:
+            line = json.dumps(record, default=_encode, separators=(",", ":")).encode() + b"\n"
+            member = gzip.compress(line, mtime=0)
+            entries.append(ArchiveEntry(draft_id, season, file.tell(), len(member)))
+            file.write(member)
+        file.flush()
+        os.fsync(file.fileno())
+    return entries
+
+
+def read_record(directory: Path, entry: ArchiveEntry) -> Record:
+    with open(season_path(directory, entry.season), "rb") as file:
+        file.seek(entry.offset)
+        record: Record = json.loads(gzip.decompress(file.read(entry.length)))
+    return record
+
+
+def decode_row(table: Table, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Row of `table` as archived, with dates parsed back."""
+    decoded = dict(row)
+    for column in table.columns:
+        value = decoded.get(column.name)
+        if value is None:
+            continue
+        if isinstance(column.type, DateTime):
+            decoded[column.name] = datetime.fromisoformat(value)
+        elif isinstance(column.type, Date):
+            decoded[column.name] = date.fromisoformat(value)
+    return decoded
+
+
+def finished_drafts_before(before: date) -> Any:
+    """Drafts played before `before` without an unplayed match, the ones nobody will change anymore."""
+    open_match = exists().where(
+        Match.draft_id == Draft.id, or_(Match.score.is_(None), Match.score == MatchResult.BASE.value)
+    )
+    return select(Draft.id, Draft.date).where(Draft.date < before, ~open_match).order_by(Draft.id)
+
+
+def _player_ids(record: Record) -> set[int]:
+    player_ids = {row["player_id"] for row in record["draft_players"]}
+    return player_ids | {row[key] for row in record["matches"] for key in ("player_1_id", "player_2_id")}
+
+
+async def _load_records(db: AsyncSession, draft_ids: List[int]) -> Dict[int, Record]:
+    """
+    Rows of every draft, plus those of its players. Players stay live and can be deleted once
+    their drafts are archived, reads and restores then fall back to the archived rows.
+    """
+    records: Dict[int, Record] = {draft_id: defaultdict(list) for draft_id in draft_ids}
+    for table in TABLES:
+        draft_id = table.c.id if table.name == Draft.__tablename__ else table.c.draft_id
+        # Locked until the batch is deleted: a concurrent score or points update waits and then finds
+        # no row, instead of committing in between and being deleted without ever being archived
+        result = await db.execute(select(table).where(id_in(draft_id, draft_ids)).with_for_update())
+        for row in result.mappings():
+            records[row[draft_id.name]][table.name].append(dict(row))
+
+    player_ids = set().union(*(_player_ids(record) for record in records.values()))
+    result = await db.execute(select(PLAYERS).where(id_in(PLAYERS.c.id, list(player_ids))))
+    players = {row["id"]: dict(row) for row in result.mappings()}
+    for record in records.values():
+        record[PLAYERS.name] = [players[player_id] for player_id in sorted(_player_ids(record))]
+    return records
+
+
+async def archive_drafts(db: AsyncSession, before: date, directory: Path, batch_size: int) -> int:
+    """
+    Move finished drafts played before `before` into per-season archive files, `batch_size` drafts
+    per transaction. A batch is on disk and in the index before its rows are deleted, the database
+    cascades the delete to rounds, matches and draft players.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    archived = 0
+    while True:
+        # Drafts another transaction is changing are left for a later run
+        result = await db.execute(
+            finished_drafts_before(before).limit(batch_size).with_for_update(of=Draft, skip_locked=True)
+        )
+        batch = result.all()
+        if not batch:
+            return archived
+
+        draft_ids = [draft_id for draft_id, _ in batch]
+        records = await _load_records(db, draft_ids)
+        by_season: Dict[int, List[Tuple[int, Record]]] = defaultdict(list)
+        for draft_id, draft_date in batch:
+            by_season[draft_date.year].append((draft_id, records[draft_id]))
+
+        entries = get_index(directory).entries()
+        for season, season_records in by_season.items():
+            entries += await run_in_threadpool(append_records, directory, season, season_records)
+        await run_in_threadpool(write_index, directory, entries)
+
+        # Archived drafts can still be read, sync clients shouldn't delete them
+        await skip_tombstones(db)
+        await db.execute(delete(Draft).filter(id_in(Draft.id, draft_ids)).execution_options(synchronize_session=False))
+        await db.commit()
+        archived += len(batch)
+
+
+async def _name_conflicts(db: AsyncSession, players: List[Dict[str, Any]]) -> List[str]:
+    """
+    The archived players that can't come back because they were deleted and another player of
+    their league took the name since, described for the error.
+    """
+    result = await db.execute(select(PLAYERS.c.id).where(id_in(PLAYERS.c.id, [player["id"] for player in players])))
+    live = set(result.scalars())
+    deleted = {(player["league_id"], player["name"]): player["id"] for player in players if player["id"] not in live}
+    if not deleted:
+        return []
+    result = await db.execute(
+        select(PLAYERS.c.league_id, PLAYERS.c.name, PLAYERS.c.id).where(
+            tuple_(PLAYERS.c.league_id, PLAYERS.c.name).in_(list(deleted))
+        )
+    )
+    return [
+        f"player {deleted[(league_id, name)]} {name!r} of league {league_id}, now the name of player {player_id}"
+        for league_id, name, player_id in result
+    ]
+
+
+async def restore_drafts(
+    db: AsyncSession, directory: Path, draft_ids: Sequence[int] | None = None, season: int | None = None
+) -> int:
+    """
+    Move archived drafts back into the live tables, all of them unless filtered by id or season.
+    Deleted players are restored with them. If another player of the league took one's name since,
+    nothing is restored and a ValueError lists those players.
+    """
+    entries = get_index(directory).entries()
+    chosen = [
+        entry
+        for entry in entries
+        if (draft_ids is None or entry.draft_id in draft_ids) and (season is None or entry.season == season)
+    ]
+    records = [await run_in_threadpool(read_record, directory, entry) for entry in chosen]
+    players = {
+        row["id"]: {"league_id": DEFAULT_LEAGUE_ID, **decode_row(PLAYERS, row)}
+        for record in records
+        for row in record.get(PLAYERS.name, [])
+    }
+    conflicts = await _name_conflicts(db, list(players.values()))
+    if conflicts:
+        raise ValueError(f"Can't restore players whose name was taken since: {'; '.join(conflicts)}")
+
+    if players:
+        # Players deleted since the drafts were archived come back, as changed now so sync clients get them
+        rows = [{**player, "updated_at": func.now()} for player in players.values()]
+        await db.execute(insert(PLAYERS).values(rows).on_conflict_do_nothing(index_elements=[PLAYERS.c.id]))
+    for record in records:
+        # Archives written before rounds and matches were partitioned lack their draft_date, those
+        # written before leagues their league_id
+        missing = {"draft_date": record["drafts"][0]["date"], "league_id": DEFAULT_LEAGUE_ID}
+        for table in TABLES:
+            defaults = {name: value for name, value in missing.items() if name in table.c}
+            rows = [decode_row(table, {**defaults, **row}) for row in record.get(table.name, [])]
+            if rows:
+                await db.execute(insert(table), rows)
+    await db.commit()
+
+    restored = {entry.draft_id for entry in chosen}
+    await run_in_threadpool(write_index, directory, [entry for entry in entries if entry.draft_id not in restored])
+    return len(chosen)
+
+
+def _read_archived(directory: Path, draft_id: int) -> Record | None:
+    entry = get_index(directory).lookup(draft_id)
+    return read_record(directory, entry) if entry is not None else None
+
+
+async def read_archived_draft(db: AsyncSession, directory: Path, draft_id: int) -> Dict[str, Any] | None:
+    """
+    An archived draft shaped like `DraftFull`, None if it isn't archived or archived from another
+    league than the session's. The current names of its players are loaded in one query.
+    """
+    record = await run_in_threadpool(_read_archived, directory, draft_id)
+    if record is None or record["drafts"][0].get("league_id", DEFAULT_LEAGUE_ID) != league_of(db):
+        return None
+
+    draft_players = sorted(record["draft_players"], key=lambda x: x["order"] or float("inf"))
+    matches = sorted(record["matches"], key=lambda x: x["id"])
+    # Current names of the players still live, the archived ones of those deleted since
+    players = {row["id"]: {"id": row["id"], "name": row["name"]} for row in record.get(PLAYERS.name, [])}
+    result = await db.execute(select(Player.id, Player.name).filter(id_in(Player.id, list(_player_ids(record)))))
+    players.update({player_id: {"id": player_id, "name": name} for player_id, name in result})
+
+    matches_by_round: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for match in matches:
+        matches_by_round[match["round_id"]].append(
+            {**match, "player_1": players[match["player_1_id"]], "player_2": players[match["player_2_id"]]}
+        )
+    (draft,) = record["drafts"]
+    return {
+        **draft,
+        "rounds": [
+            {**db_round, "matches": matches_by_round[db_round["id"]]}
+            for db_round in sorted(record["rounds"], key=lambda x: x["number"])
+        ],
+        "draft_players": [{**row, "player": players[row["player_id"]]} for row in draft_players],
+    }
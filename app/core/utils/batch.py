@@ -0,0 +1,44 @@
+from typing import Annotated, Any, List
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import ColumnElement, Integer, any_, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.utils.fieldsets import Fieldset, View
+
+
+def get_batch_ids(
+    ids: Annotated[str | None, Query(description="Comma separated ids to read in one request, e.g. `3,1,2`")] = None,
+) -> List[int] | None:
+    """Requested ids in request order without duplicates, None when no batch was requested."""
+    if ids is None:
+        return None
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail="ids must be comma separated integers") from err
+
+    unique = list(dict.fromkeys(parsed))
+    if len(unique) > settings.BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_IDS} ids per request")
+    return unique
+
+
+def id_in(column: Any, ids: List[int]) -> ColumnElement[bool]:
+    """`column = ANY(:ids)` with a single array parameter, so every batch size shares one statement."""
+    return column == any_(literal(ids, ARRAY(Integer)))
+
+
+async def read_batch(db: AsyncSession, view: View, fieldset: Fieldset, ids: List[int]) -> Response:
+    """
+    Rows of `view.model` with the given ids as a `Batch` response. The top level is one
+    `id = ANY(:ids)` query, every included relationship level one more `selectinload` query.
+    """
+    model: Any = view.model
+    stmt = select(model).options(*view.loader_options(fieldset)).filter(id_in(model.id, ids))
+    result = await db.execute(stmt)
+    by_id = {row.id: row for row in result.scalars().all()}
+    batch = {"items": [by_id[i] for i in ids if i in by_id], "missing": [i for i in ids if i not in by_id]}
+    return view.adapter(fieldset).response(batch)
@@ -0,0 +1,110 @@
+import asyncio
+import functools
+import inspect
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers
+
+from app.db.leagues import LEAGUE_HEADER
+
+# Request headers that change the response of a GET, requests differing in them aren't identical
+VARYING_HEADERS = ("if-none-match", "if-modified-since", LEAGUE_HEADER.lower())
+
+
+@dataclass(frozen=True)
+class SharedResponse:
+    """Everything needed to send a response again, copied before the leader's response is sent."""
+
+    status_code: int
+    body: bytes
+    raw_headers: List[Tuple[bytes, bytes]]
+
+    @classmethod
+    def of(cls, response: Response) -> "SharedResponse":
+        return cls(response.status_code, bytes(response.body), list(response.raw_headers))
+
+    def response(self) -> Response:
+        # Every request gets its own object, middlewares modify the headers they send
+        return Response(content=self.body, status_code=self.status_code, headers=Headers(raw=self.raw_headers))
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one in-flight computation: the first caller runs it,
+    the others wait for its result or exception. Nothing is kept once the computation finished.
+    """
+
+    def __init__(self) -> None:
+        self.flights: Dict[Hashable, asyncio.Future[SharedResponse]] = {}
+        self.computed: Counter[str] = Counter()
+        self.coalesced: Counter[str] = Counter()
+
+    async def do(self, key: Hashable, name: str, compute: Callable[[], Awaitable[Response]]) -> Response:
+        flight = self.flights.get(key)
+        if flight is not None:
+            try:
+                shared = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # The leader's client went away, this request runs it on its own
+                return await self.do(key, name, compute)
+            self.coalesced[name] += 1
+            return shared.response()
+
+        flight = asyncio.get_running_loop().create_future()
+        self.flights[key] = flight
+        self.computed[name] += 1
+        try:
+            response = await compute()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            # Followers raise it, the leader shouldn't log it as never retrieved
+            flight.exception()
+            raise
+        else:
+            flight.set_result(SharedResponse.of(response))
+            return response
+        finally:
+            del self.flights[key]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {"computed": self.computed[name], "coalesced": self.coalesced[name]}
+            for name in sorted(self.computed.keys() | self.coalesced.keys())
+        }
+
+
+single_flight = SingleFlight()
+
+
+def coalesced(endpoint: Callable[..., Awaitable[Response]]) -> Callable[..., Awaitable[Response]]:
+    """
+    Let concurrent identical requests to a read endpoint share one run of it and its serialized
+    response, within a worker. Requests are identical when their path, query string, league
+    and conditional headers are. The endpoint has to return a `Response` with a complete body.
+    """
+    signature = inspect.signature(endpoint)
+    parameters = list(signature.parameters.values())
+    # FastAPI passes the request to one parameter only, share the endpoint's own if it has one
+    request_name = next((parameter.name for parameter in parameters if parameter.annotation is Request), None)
+    if request_name is None:
+        request_name = "coalesce_request"
+        parameters.append(inspect.Parameter(request_name, inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+    own_request = request_name in signature.parameters
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Response:
+        request: Request = kwargs[request_name] if own_request else kwargs.pop(request_name)
+        name = f"{request.method} {request.scope['route'].path}"
+        key = (name, request.url.path, request.url.query, *(request.headers.get(header) for header in VARYING_HEADERS))
+        return await single_flight.do(key, name, lambda: endpoint(*args, **kwargs))
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)  # type: ignore[attr-defined]
+    return wrapper
@@ -0,0 +1,27 @@
+from typing import Any
+
+from fastapi import HTTPException
+
+
+def expected_version(if_match: str | None, body_version: int | None) -> int | None:
+    """
+    Version a write is based on, from the `If-Match` header (`"3"` or `3`) or the body's
+    `version`. None makes the write unconditional, like `If-Match: *`.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return body_version
+    try:
+        version = int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail="If-Match must be a version number") from err
+    if body_version is not None and body_version != version:
+        raise HTTPException(status_code=400, detail="If-Match and version don't agree")
+    return version
+
+
+def version_conflict(current: Any) -> HTTPException:
+    """409 for a write based on an outdated version, with the current state to retry from."""
+    return HTTPException(
+        status_code=409,
+        detail={"message": "Changed by another request, retry based on the current version", "current": current},
+    )
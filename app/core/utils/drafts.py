@@ -1,5 +1,5 @@
 from collections import defaultdict
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -30,6 +30,7 @@ async def populate_draft(draft: Draft, db: AsyncSession) -> Draft:
     """
     Populate a draft with rounds and matches using round-robin tournament algorithm.
     This is the main function that combines round generation and match generation.
+    Only flushes, the caller's unit of work commits.
     """
     # Get players sorted by order
     draft_players = sorted(draft.draft_players, key=lambda x: x.order or float("inf"))
@@ -41,9 +42,7 @@ async def populate_draft(draft: Draft, db: AsyncSession) -> Draft:
 
     rounds = await generate_rounds(draft, player_ids, db)
     await generate_matches(rounds, player_ids, db)
-
-    await db.commit()
-    await db.refresh(draft)
+    await db.flush()
 
     return draft
 
@@ -61,6 +60,7 @@ async def generate_rounds(draft: Draft, player_ids: List[int], db: AsyncSession)
         db_round = Round(
             number=round_num,
             draft_id=draft.id,
+            draft_date=draft.date,
         )
         db.add(db_round)
         rounds.append(db_round)
@@ -69,41 +69,58 @@ async def generate_rounds(draft: Draft, player_ids: List[int], db: AsyncSession)
     return rounds
 
 
-async def generate_matches(rounds: List[Round], player_ids: List[int], db: AsyncSession) -> List[Match]:
+def schedule_pairings(player_ids: List[int]) -> List[List[Tuple[int, int]]]:
+    """
+    Round-robin pairings for every round, players sorted inside out and rotated after each round.
+    A None entry is a dummy player for the bye, pairings against it are skipped.
+    """
     num_players = len(player_ids)
-    all_matches: List[Match] = []
     sorted_player_ids = sort_to_inside(player_ids)
 
-    for db_round in rounds:
+    pairings: List[List[Tuple[int, int]]] = []
+    for _ in range(num_players - 1):
+        round_pairings = []
         for i in range(num_players // 2):
             player1_id = sorted_player_ids[i]
             player2_id = sorted_player_ids[num_players - 1 - i]
 
             # Skip matches with dummy player (bye)
             if player1_id is not None and player2_id is not None:
-                match = Match(
-                    round_id=db_round.id,
-                    player_1_id=player1_id,
-                    player_2_id=player2_id,
-                    score=MatchResult.BASE,
-                )
-                db.add(match)
-                all_matches.append(match)
+                round_pairings.append((player1_id, player2_id))
+        pairings.append(round_pairings)
 
         # Rotate players for next round (first player stays fixed)
         sorted_player_ids = rotate_players(sorted_player_ids)
 
+    return pairings
+
+
+async def generate_matches(rounds: List[Round], player_ids: List[int], db: AsyncSession) -> List[Match]:
+    all_matches: List[Match] = []
+
+    for db_round, round_pairings in zip(rounds, schedule_pairings(player_ids), strict=False):
+        for player1_id, player2_id in round_pairings:
+            match = Match(
+                round_id=db_round.id,
+                draft_id=db_round.draft_id,
+                draft_date=db_round.draft_date,
+                player_1_id=player1_id,
+                player_2_id=player2_id,
+                score=MatchResult.BASE,
+            )
+            db.add(match)
+            all_matches.append(match)
+
     return all_matches
 
 
-def get_points_dict(draft: Draft) -> Dict[int, int]:
+def get_points_dict(matches: List[Match]) -> Dict[int, int]:
     player_points: Dict[int, int] = defaultdict(int)
-    for round_obj in draft.rounds:
-        for match in round_obj.matches:
-            player_1_points, player_2_points = POINTS_MAP[MatchResult(match.score)]
+    for match in matches:
+        player_1_points, player_2_points = POINTS_MAP[MatchResult(match.score)]
 
-            player_points[match.player_1_id] += player_1_points
-            player_points[match.player_2_id] += player_2_points
+        player_points[match.player_1_id] += player_1_points
+        player_points[match.player_2_id] += player_2_points
 
     return player_points
 
@@ -111,31 +128,34 @@ def get_points_dict(draft: Draft) -> Dict[int, int]:
 async def calculate_points(draft: Draft, db: AsyncSession) -> None:
     """
     Calculate points for all players in a draft based on match results.
-    If points and head-to-head are equal, it's a tie.
+    If points and head-to-head are equal, it's a tie. Only flushes, the caller's unit of work commits.
     """
-    # Load draft with all relationships
-    stmt = (
-        select(Draft)
-        .options(
-            selectinload(Draft.rounds).selectinload(Round.matches),
-            selectinload(Draft.draft_players),
-        )
-        .filter(Draft.id == draft.id)
-    )
+    stmt = select(Draft).options(selectinload(Draft.draft_players)).filter(Draft.id == draft.id)
     result = await db.execute(stmt)
     draft_with_relations: Draft | None = result.scalar()
 
     if not draft_with_relations:
         return
 
-    player_points: Dict[int, int] = get_points_dict(draft_with_relations)
+    matches_result = await db.execute(select(Match).filter(Match.draft_id == draft.id))
+    matches = list(matches_result.scalars().all())
+    assign_final_places(draft_with_relations.draft_players, matches)
+
+    await db.flush()
+
+
+def assign_final_places(draft_players: List[DraftPlayer], matches: List[Match]) -> None:
+    """
+    Set points and final place of every draft player from finished matches.
+    """
+    player_points: Dict[int, int] = get_points_dict(matches)
 
     # Update each draft player's points
-    for draft_player in draft.draft_players:
+    for draft_player in draft_players:
         draft_player.points = player_points.get(draft_player.player_id, 0)
 
     # Sort players by points (descending), then handle ties
-    sorted_players = sorted(draft.draft_players, key=lambda x: x.points, reverse=True)
+    sorted_players = sorted(draft_players, key=lambda x: x.points, reverse=True)
 
     # Group players by points to handle ties
     groups = []
@@ -163,17 +183,15 @@ async def calculate_points(draft: Draft, db: AsyncSession) -> None:
             current_place += 1
         else:
             # Handle tie with head-to-head - may result in sub-groups
-            ranked_subgroups = resolve_ties_with_head_to_head(group, draft)
+            ranked_subgroups = resolve_ties_with_head_to_head(group, matches)
             for subgroup in ranked_subgroups:
                 # All players in a subgroup get the same place (truly tied)
                 for player in subgroup:
                     player.final_place = current_place
                 current_place += len(subgroup)
 
-    await db.commit()
-
 
-def resolve_ties_with_head_to_head(tied_players: List[DraftPlayer], draft: Draft) -> List[List[DraftPlayer]]:
+def resolve_ties_with_head_to_head(tied_players: List[DraftPlayer], matches: List[Match]) -> List[List[DraftPlayer]]:
     """
     Resolve ties between players using head-to-head results.
     Returns a list of player groups, ordered by head-to-head record.
@@ -187,17 +205,16 @@ def resolve_ties_with_head_to_head(tied_players: List[DraftPlayer], draft: Draft
     h2h_wins = {pid: 0 for pid in player_ids}
 
     # Count head-to-head wins between tied players
-    for round_obj in draft.rounds:
-        for match in round_obj.matches:
-            if match.player_1_id in player_ids and match.player_2_id in player_ids:
-                match_result = MatchResult(match.score)
-                player_1_points, player_2_points = POINTS_MAP[match_result]
-
-                # Only count wins (3 points), not partial wins (1 point)
-                if player_1_points == 3:
-                    h2h_wins[match.player_1_id] += 1
-                elif player_2_points == 3:
-                    h2h_wins[match.player_2_id] += 1
+    for match in matches:
+        if match.player_1_id in player_ids and match.player_2_id in player_ids:
+            match_result = MatchResult(match.score)
+            player_1_points, player_2_points = POINTS_MAP[match_result]
+
+            # Only count wins (3 points), not partial wins (1 point)
+            if player_1_points == 3:
+                h2h_wins[match.player_1_id] += 1
+            elif player_2_points == 3:
+                h2h_wins[match.player_2_id] += 1
 
     # Group players by their head-to-head win count
     h2h_groups: Dict[int, List[DraftPlayer]] = {}
@@ -0,0 +1,127 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy import ColumnElement, Select, func, literal, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.models import Draft, DraftPlayer, Match, Player, Round
+from app.db.database import Base
+
+
+@dataclass(frozen=True)
+class Validators:
+    """
+    Strong ETag and Last-Modified of a response, computed from row versions and counts instead
+    of the body. The ETag hashes the rows' `xmin`, the transaction that last wrote them, which
+    every later commit changes. It is read before the body, so a concurrent write can only make
+    the ETag older than the body and cause one extra full download, never a stale 304.
+    `updated_at` is the start of its transaction and can be older than a write committed after
+    a read, Last-Modified is a hint and If-Modified-Since may answer such a write with a 304.
+    """
+
+    etag: str
+    last_modified: datetime | None
+
+    @classmethod
+    def from_rows(cls, kind: str, rows: Sequence[Sequence[Any]]) -> "Validators":
+        digest = hashlib.blake2b(repr((kind, [tuple(row) for row in rows])).encode(), digest_size=16)
+        timestamps = [value for row in rows for value in row if isinstance(value, datetime)]
+        last_modified = max(timestamps).replace(tzinfo=timezone.utc) if timestamps else None
+        return cls(etag=f'"{digest.hexdigest()}"', last_modified=last_modified)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # no-cache: clients may store the body but have to revalidate it on every use
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def is_fresh(self, request: Request) -> bool:
+        """Whether the client's copy is current. If-None-Match wins over If-Modified-Since."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            # Weak comparison, the compression middleware weakens the ETags it compresses
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return since.tzinfo is not None and self.last_modified.replace(microsecond=0) <= since
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+
+async def _aggregate_validators(db: AsyncSession, kind: str, *parts: Select[Any]) -> Validators | None:
+    """Run `(part, count, max(updated_at), versions)` aggregates in one query, None if part `kind` has no rows."""
+    result = await db.execute(union_all(*parts))
+    rows = sorted(result.all())
+    if not any(part == kind and count for part, count, *_ in rows):
+        return None
+    return Validators.from_rows(kind, rows)
+
+
+def row_version(model: type[Base]) -> ColumnElement[str]:
+    """The `xmin` of `model`'s rows, it changes with every committed write of a row."""
+    return literal_column(f"{model.__tablename__}.xmin::text")
+
+
+def _part(name: str, model: type[Base]) -> Select[Any]:
+    version = row_version(model)
+    return select(
+        literal(name).label("part"),
+        func.count().label("count"),
+        func.max(model.updated_at),  # type: ignore[attr-defined]
+        func.md5(func.string_agg(version, aggregate_order_by(literal(","), version))),
+    )
+
+
+async def draft_validators(db: AsyncSession, draft_id: int) -> Validators | None:
+    """Validators of a `DraftFull` response, None if the draft does not exist."""
+    player_ids = select(DraftPlayer.player_id).where(DraftPlayer.draft_id == draft_id)
+    return await _aggregate_validators(
+        db,
+        "draft",
+        _part("draft", Draft).where(Draft.id == draft_id),
+        _part("rounds", Round).where(Round.draft_id == draft_id),
+        _part("matches", Match).where(Match.draft_id == draft_id),
+        _part("draft_players", DraftPlayer).where(DraftPlayer.draft_id == draft_id),
+        _part("players", Player).where(Player.id.in_(player_ids)),
+    )
+
+
+async def round_validators(db: AsyncSession, round_id: int) -> Validators | None:
+    """Validators of a round and its matches, None if the round does not exist."""
+    player_ids = union_all(
+        select(Match.player_1_id).where(Match.round_id == round_id),
+        select(Match.player_2_id).where(Match.round_id == round_id),
+    )
+    return await _aggregate_validators(
+        db,
+        "round",
+        _part("round", Round).where(Round.id == round_id),
+        _part("matches", Match).where(Match.round_id == round_id),
+        _part("players", Player).where(Player.id.in_(player_ids)),
+    )
+
+
+async def player_validators(db: AsyncSession, player_id: int) -> Validators | None:
+    """Validators of a single player, None if the player does not exist."""
+    return await _aggregate_validators(db, "player", _part("player", Player).where(Player.id == player_id))
+
+
+async def page_validators(db: AsyncSession, kind: str, stmt: Select[Any]) -> Validators:
+    """Validators of a list page, `stmt` selects the `(id, row_version, updated_at)` of exactly the listed rows."""
+    result = await db.execute(stmt)
+    return Validators.from_rows(kind, result.all())
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, List, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.db.database import SessionLocal
+from app.db.leagues import LEAGUE_KEY
+
+# Rows fetched from the server-side cursor and encoded per chunk
+EXPORT_BATCH_SIZE = 2000
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value)
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_csv(rows: Sequence[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson(columns: List[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    lines = (
+        json.dumps(dict(zip(columns, row, strict=True)), default=_json_default, separators=(",", ":")) for row in rows
+    )
+    return "".join(f"{line}\n" for line in lines).encode()
+
+
+async def stream_rows(stmt: Select[Any], export_format: ExportFormat, league_id: int) -> AsyncIterator[bytes]:
+    """
+    Encode the rows of `stmt` chunk by chunk while they arrive from a server-side cursor. The session
+    lives inside the generator, request dependencies are closed before the body is sent, and is scoped
+    to the league like theirs.
+    """
+    columns = list(stmt.selected_columns.keys())
+    if export_format == ExportFormat.CSV:
+        yield encode_csv([columns])
+
+    async with SessionLocal(info={LEAGUE_KEY: league_id}) as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            if export_format == ExportFormat.CSV:
+                yield encode_csv(rows)
+            else:
+                yield encode_ndjson(columns, rows)
+
+
+def export_response(stmt: Select[Any], export_format: ExportFormat, name: str, league_id: int) -> StreamingResponse:
+    return StreamingResponse(
+        stream_rows(stmt, export_format, league_id),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'},
+    )
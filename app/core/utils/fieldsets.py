@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Annotated, Any, Dict, List, Tuple, get_args, get_origin
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+
+from app.core.utils.responses import JSONAdapter
+from app.db.database import Base
+
+# Sparse schemas compiled per view, a view has a handful of useful fieldsets
+ADAPTER_CACHE_SIZE = 64
+
+
+@dataclass(frozen=True)
+class Fieldset:
+    """
+    Parsed `fields`/`include` parameters. `include` holds the relationship paths to load, with their
+    ancestors, `fields` the dotted paths of the plain fields to keep. Levels without an entry in
+    `fields` keep all of their plain fields. None means the parameter was not given.
+    """
+
+    fields: frozenset[str] | None = None
+    include: frozenset[str] | None = None
+
+
+def _related_schema(annotation: Any) -> Tuple[type[BaseModel], bool] | None:
+    """The nested schema of a relationship field and whether it's a list, None for plain fields."""
+    if get_origin(annotation) in (list, List):
+        (item,) = get_args(annotation)
+        related = _related_schema(item)
+        return (related[0], True) if related is not None else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None
+
+
+def _split(value: str | None) -> frozenset[str] | None:
+    if value is None:
+        return None
+    return frozenset(part.strip() for part in value.split(",") if part.strip())
+
+
+def get_fieldset(
+    fields: Annotated[
+        str | None, Query(description="Comma separated fields to return, e.g. `name,draft_players.points`")
+    ] = None,
+    include: Annotated[
+        str | None, Query(description="Comma separated relationships to embed, e.g. `draft_players.player`")
+    ] = None,
+) -> Fieldset:
+    """Sparse fieldset dependency, a `View` checks it against its schema with `resolve`."""
+    return Fieldset(fields=_split(fields), include=_split(include))
+
+
+class View:
+    """
+    Sparse-fieldset view of a response schema. The included relationship paths decide the
+    `selectinload` options of the query, and a schema with just the requested fields is compiled,
+    so unrequested relationships are never touched. `container` wraps the schema of list and
+    batch responses. Schema relationship fields must be named like the ORM relationships.
+    """
+
+    def __init__(
+        self, model: type[Base], schema: type[BaseModel], full: JSONAdapter[Any], container: Any = None
+    ) -> None:
+        self.model = model
+        self.schema = schema
+        self.full = full
+        self.container = container
+        # Schema of every relationship path, "" is the top level
+        self.levels: Dict[str, type[BaseModel]] = {}
+        self._collect_levels(schema, "")
+        self._adapters: OrderedDict[Fieldset, JSONAdapter[Any]] = OrderedDict()
+
+    def _collect_levels(self, schema: type[BaseModel], path: str) -> None:
+        self.levels[path] = schema
+        for name, info in schema.model_fields.items():
+            related = _related_schema(info.annotation)
+            if related is not None:
+                self._collect_levels(related[0], f"{path}.{name}" if path else name)
+
+    def resolve(self, fieldset: Fieldset) -> Fieldset:
+        """Validate `fieldset` against the schema and add the ancestors of included paths."""
+        relations = set(self.levels) - {""}
+        if fieldset.include is None:
+            included = relations
+        else:
+            unknown = sorted(fieldset.include - relations)
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(unknown)}")
+            # Including `rounds.matches` includes `rounds` too
+            included = {path.rsplit(".", depth)[0] for path in fieldset.include for depth in range(path.count(".") + 1)}
+
+        for path in sorted(fieldset.fields or ()):
+            level, _, name = path.rpartition(".")
+            schema = self.levels.get(level)
+            if (level and level not in included) or schema is None or name not in schema.model_fields:
+                raise HTTPException(status_code=400, detail=f"Unknown field: {path}")
+            if path in relations:
+                raise HTTPException(status_code=400, detail=f"{path} is a relationship, use include")
+
+        if fieldset == Fieldset():
+            return fieldset
+        return Fieldset(fields=fieldset.fields, include=frozenset(included))
+
+    def loader_options(self, fieldset: Fieldset) -> List[_AbstractLoad]:
+        """
+        `selectinload` chains of the included relationships of a resolved fieldset, only the
+        deepest paths need one.
+        """
+        include = set(self.levels) - {""} if fieldset.include is None else fieldset.include
+        leaves = [path for path in sorted(include) if not any(other.startswith(f"{path}.") for other in include)]
+        options = []
+        for path in leaves:
+            model: Any = self.model
+            option: Any = None
+            for name in path.split("."):
+                attribute = getattr(model, name)
+                option = selectinload(attribute) if option is None else option.selectinload(attribute)
+                model = attribute.property.mapper.class_
+            options.append(option)
+        return options
+
+    def adapter(self, fieldset: Fieldset) -> JSONAdapter[Any]:
+        """Serializer of a resolved fieldset, the full schema's when no parameters were given."""
+        if fieldset == Fieldset():
+            return self.full
+        cached = self._adapters.get(fieldset)
+        if cached is not None:
+            self._adapters.move_to_end(fieldset)
+            return cached
+
+        schema = self._sparse_schema(self.schema, "", fieldset)
+        adapter: JSONAdapter[Any] = JSONAdapter(self.container[schema] if self.container is not None else schema)
+        self._adapters[fieldset] = adapter
+        if len(self._adapters) > ADAPTER_CACHE_SIZE:
+            self._adapters.popitem(last=False)
+        return adapter
+
+    def _sparse_schema(self, schema: type[BaseModel], path: str, fieldset: Fieldset) -> type[BaseModel]:
+        prefix = f"{path}." if path else ""
+        kept = {field[len(prefix) :] for field in fieldset.fields or () if field.rpartition(".")[0] == path}
+        definitions: Dict[str, Any] = {}
+        for name, info in schema.model_fields.items():
+            default = ... if info.is_required() else info.default
+            related = _related_schema(info.annotation)
+            if related is None:
+                if not kept or name in kept:
+                    definitions[name] = (info.annotation, default)
+            elif fieldset.include is not None and f"{prefix}{name}" in fieldset.include:
+                nested = self._sparse_schema(related[0], f"{prefix}{name}", fieldset)
+                definitions[name] = (list[nested] if related[1] else nested, default)  # type: ignore[valid-type]
+        return create_model(  # type: ignore[no-any-return, call-overload]
+            f"{schema.__name__}Sparse", __config__=ConfigDict(from_attributes=True), **definitions
+        )
@@ -0,0 +1,277 @@
+import heapq
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.models import Color, Draft, DraftPlayer, Match, MatchResult, Player, Round
+from app.core.utils.drafts import assign_final_places, schedule_pairings
+from app.core.utils.partitions import create_partitions
+from app.db.leagues import DEFAULT_LEAGUE_ID
+
+FIRST_NAMES = [
+    "Ada", "Bartek", "Celina", "Dawid", "Ewa", "Filip", "Gosia", "Hubert", "Iga", "Jakub",
+    "Kasia", "Leon", "Marta", "Nikola", "Olek", "Patrycja", "Rafał", "Sara", "Tomek", "Urszula",
+    "Wiktor", "Zosia", "Adam", "Basia", "Cyprian", "Dorota", "Emil", "Franek", "Grzegorz", "Hania",
+]  # fmt: skip
+SET_NAMES = [
+    "Bloomburrow", "Duskmourn", "Foundations", "Aetherdrift", "Tarkir Dragonstorm", "Final Fantasy",
+    "Edge of Eternities", "Innistrad Remastered", "Murders at Karlov Manor", "Outlaws of Thunder Junction",
+    "Modern Horizons 3", "The Lost Caverns of Ixalan", "Wilds of Eldraine", "Cube",
+]  # fmt: skip
+# Relative frequency of pod sizes, even pods are the most common
+POD_SIZES = {4: 1, 5: 1, 6: 4, 7: 2, 8: 10, 9: 2, 10: 3, 12: 1}
+COLORS = [color.value for color in Color]
+
+
+@dataclass(frozen=True)
+class GeneratorSpec:
+    players: int = 100
+    drafts: int = 1000
+    in_progress: int = 0
+    seed: int | None = None
+    batch_size: int = 500
+    drafts_per_week: float = 2.0
+    last_date: date = field(default_factory=date.today)
+    league_id: int = DEFAULT_LEAGUE_ID
+
+
+@dataclass
+class GeneratorStats:
+    players: int = 0
+    drafts: int = 0
+    draft_players: int = 0
+    rounds: int = 0
+    matches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.players + self.drafts + self.draft_players + self.rounds + self.matches
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+@dataclass(frozen=True)
+class PlayerProfile:
+    id: int
+    activity: float
+    skill: float
+    favourite_colors: List[str]
+
+
+async def _reserve_ids(conn: AsyncConnection, table_name: str, count: int) -> List[int]:
+    if count == 0:
+        return []
+    result = await conn.execute(
+        text("SELECT nextval(pg_get_serial_sequence(:table_name, 'id')) FROM generate_series(1, :count)"),
+        {"table_name": table_name, "count": count},
+    )
+    return list(result.scalars().all())
+
+
+def _pick_players(rng: random.Random, profiles: List[PlayerProfile], count: int) -> List[PlayerProfile]:
+    """
+    Weighted sampling without replacement (Efraimidis-Spirakis), so regulars show up in most drafts.
+    """
+    keyed = ((rng.random() ** (1 / profile.activity), profile) for profile in profiles)
+    return [profile for _, profile in heapq.nlargest(count, keyed, key=lambda x: x[0])]
+
+
+def _deck_colors(rng: random.Random, profile: PlayerProfile) -> List[str]:
+    color_count = rng.choices([1, 2, 3], weights=[2, 7, 1])[0]
+    colors = list(profile.favourite_colors[:1]) if rng.random() < 0.7 else []
+    while len(colors) < color_count:
+        color = rng.choice(COLORS)
+        if color not in colors:
+            colors.append(color)
+    return colors
+
+
+def _play_match(rng: random.Random, player_1: PlayerProfile, player_2: PlayerProfile) -> MatchResult:
+    skill_gap = player_1.skill - player_2.skill
+    player_1_wins = rng.random() < 1 / (1 + math.exp(-0.8 * skill_gap))
+    full_win = rng.random() < min(0.5 + 0.1 * abs(skill_gap), 0.75)
+    if player_1_wins:
+        return MatchResult.PLAYER_1_FULL_WIN if full_win else MatchResult.PLAYER_1_WIN
+    return MatchResult.PLAYER_2_FULL_WIN if full_win else MatchResult.PLAYER_2_WIN
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.drafts: List[Dict[str, Any]] = []
+        self.draft_players: List[Dict[str, Any]] = []
+        self.rounds: List[Dict[str, Any]] = []
+        self.matches: List[Dict[str, Any]] = []
+
+    async def write(self, conn: AsyncConnection, stats: GeneratorStats) -> None:
+        for model, rows in (
+            (Draft, self.drafts),
+            (DraftPlayer, self.draft_players),
+            (Round, self.rounds),
+            (Match, self.matches),
+        ):
+            if rows:
+                await conn.execute(insert(model), rows)
+        stats.drafts += len(self.drafts)
+        stats.draft_players += len(self.draft_players)
+        stats.rounds += len(self.rounds)
+        stats.matches += len(self.matches)
+
+
+def _build_draft(
+    rng: random.Random,
+    batch: _Batch,
+    league_id: int,
+    draft_id: int,
+    draft_date: date,
+    pod: List[PlayerProfile],
+    finished: bool,
+    round_ids: Iterator[int],
+    match_ids: Iterator[int],
+) -> None:
+    batch.drafts.append(
+        {"id": draft_id, "league_id": league_id, "name": f"{rng.choice(SET_NAMES)} #{draft_id}", "date": draft_date}
+    )
+
+    draft_players = [
+        DraftPlayer(
+            draft_id=draft_id,
+            player_id=profile.id,
+            order=order,
+            points=0,
+            deck_colors=_deck_colors(rng, profile),
+        )
+        for order, profile in enumerate(pod, start=1)
+    ]
+
+    player_ids: List[Any] = [profile.id for profile in pod]
+    if len(player_ids) % 2 != 0:
+        # Add a dummy player for bye if odd number of players
+        player_ids.append(None)
+
+    by_id = {profile.id: profile for profile in pod}
+    pairings = schedule_pairings(player_ids)
+    played_rounds = len(pairings) if finished else rng.randrange(len(pairings))
+    matches: List[Match] = []
+    for number, round_pairings in enumerate(pairings, start=1):
+        round_id = next(round_ids)
+        batch.rounds.append(
+            {"id": round_id, "league_id": league_id, "number": number, "draft_id": draft_id, "draft_date": draft_date}
+        )
+        for player_1_id, player_2_id in round_pairings:
+            score = MatchResult.BASE
+            if number <= played_rounds:
+                score = _play_match(rng, by_id[player_1_id], by_id[player_2_id])
+            matches.append(
+                Match(
+                    id=next(match_ids),
+                    round_id=round_id,
+                    draft_id=draft_id,
+                    draft_date=draft_date,
+                    player_1_id=player_1_id,
+                    player_2_id=player_2_id,
+                    score=score.value,
+                )
+            )
+
+    if finished:
+        assign_final_places(draft_players, matches)
+
+    batch.matches.extend(
+        {
+            "id": match.id,
+            "league_id": league_id,
+            "round_id": match.round_id,
+            "draft_id": match.draft_id,
+            "draft_date": match.draft_date,
+            "player_1_id": match.player_1_id,
+            "player_2_id": match.player_2_id,
+            "score": match.score,
+        }
+        for match in matches
+    )
+    batch.draft_players.extend(
+        {
+            "draft_id": draft_player.draft_id,
+            "league_id": league_id,
+            "player_id": draft_player.player_id,
+            "order": draft_player.order,
+            "points": draft_player.points,
+            "final_place": draft_player.final_place,
+            "deck_colors": draft_player.deck_colors,
+        }
+        for draft_player in draft_players
+    )
+
+
+async def generate_history(
+    engine: AsyncEngine, spec: GeneratorSpec, on_progress: Callable[[int], None] | None = None
+) -> GeneratorStats:
+    """
+    Insert `spec.players` new players and `spec.drafts` drafts with round-robin schedules from
+    `schedule_pairings` and results driven by hidden player skill, all in league `spec.league_id`.
+    The newest `spec.in_progress` drafts are left partially played. Rows are written with bulk inserts, one transaction per batch.
+    """
+    rng = random.Random(spec.seed)
+    stats = GeneratorStats()
+    start = time.perf_counter()
+
+    async with engine.begin() as conn:
+        player_ids = await _reserve_ids(conn, Player.__tablename__, spec.players)
+        await conn.execute(
+            insert(Player),
+            [
+                {"id": player_id, "league_id": spec.league_id, "name": f"{rng.choice(FIRST_NAMES)} #{player_id}"}
+                for player_id in player_ids
+            ],
+        )
+    stats.players = len(player_ids)
+
+    profiles = [
+        PlayerProfile(
+            id=player_id,
+            activity=rng.paretovariate(1.2),
+            skill=rng.gauss(0, 1),
+            favourite_colors=rng.sample(COLORS, 2),
+        )
+        for player_id in player_ids
+    ]
+    pod_sizes = [size for size in POD_SIZES if size <= len(profiles)]
+    pod_weights = [POD_SIZES[size] for size in pod_sizes]
+    first_date = spec.last_date - timedelta(days=int(spec.drafts * 7 / spec.drafts_per_week))
+    # Past years get their own partitions instead of filling the default one
+    async with engine.begin() as conn:
+        await create_partitions(conn, first_date.year, spec.last_date.year)
+
+    for batch_start in range(0, spec.drafts if pod_sizes else 0, spec.batch_size):
+        batch_drafts = min(spec.batch_size, spec.drafts - batch_start)
+        pods = [_pick_players(rng, profiles, rng.choices(pod_sizes, pod_weights)[0]) for _ in range(batch_drafts)]
+        round_count = sum(len(pod) - 1 if len(pod) % 2 == 0 else len(pod) for pod in pods)
+        match_count = sum(len(pod) // 2 * (len(pod) - 1 if len(pod) % 2 == 0 else len(pod)) for pod in pods)
+
+        async with engine.begin() as conn:
+            draft_ids = await _reserve_ids(conn, Draft.__tablename__, batch_drafts)
+            round_ids = iter(await _reserve_ids(conn, Round.__tablename__, round_count))
+            match_ids = iter(await _reserve_ids(conn, Match.__tablename__, match_count))
+
+            batch = _Batch()
+            for offset, (draft_id, pod) in enumerate(zip(draft_ids, pods, strict=False)):
+                index = batch_start + offset
+                draft_date = first_date + timedelta(days=int(index * 7 / spec.drafts_per_week))
+                finished = index < spec.drafts - spec.in_progress
+                _build_draft(rng, batch, spec.league_id, draft_id, draft_date, pod, finished, round_ids, match_ids)
+            await batch.write(conn, stats)
+
+        if on_progress is not None:
+            on_progress(batch_drafts)
+
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -0,0 +1,241 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import time
+from datetime import timedelta
+from typing import Annotated, Any, Awaitable, Callable
+
+from fastapi import Depends, Header, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.models import IdempotencyKey
+from app.db.database import SessionLocal, get_uow
+from app.db.leagues import DEFAULT_LEAGUE, LEAGUE_HEADER
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Set on replayed responses, so clients and logs can tell them apart
+REPLAYED_HEADER = "Idempotent-Replayed"
+# Request headers that change what a write does, hashed along with the query string and body
+HASHED_HEADERS = ("If-Match",)
+
+logger = logging.getLogger(__name__)
+
+
+async def claim_key(key: str, endpoint: str, request_hash: str) -> bool:
+    """
+    Insert the in-progress row of a key, True if this request got it and has to run the endpoint.
+    Expired rows and rows left behind by a request that died are taken over.
+    """
+    now = func.now()
+    values = {
+        "request_hash": request_hash,
+        "status_code": None,
+        "media_type": None,
+        "body": None,
+        "created_at": now,
+        "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+    }
+    stmt = (
+        insert(IdempotencyKey)
+        .values(key=key, endpoint=endpoint, **values)
+        .on_conflict_do_update(
+            index_elements=[IdempotencyKey.key, IdempotencyKey.endpoint],
+            set_=values,
+            where=or_(
+                IdempotencyKey.expires_at < now,
+                and_(
+                    IdempotencyKey.status_code.is_(None),
+                    IdempotencyKey.created_at < now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+                ),
+            ),
+        )
+        .returning(IdempotencyKey.key)
+    )
+    async with SessionLocal() as db:
+        result = await db.execute(stmt)
+        claimed = result.first() is not None
+        await db.commit()
+    return claimed
+
+
+async def load_key(key: str, endpoint: str) -> IdempotencyKey | None:
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(IdempotencyKey).filter(IdempotencyKey.key == key, IdempotencyKey.endpoint == endpoint)
+        )
+        return result.scalar()
+
+
+async def store_response(
+    db: AsyncSession, key: str, endpoint: str, status_code: int, body: bytes, media_type: str | None
+) -> None:
+    """Store the response of a claimed key in `db`'s transaction, it is replayed once that commits."""
+    await db.execute(
+        update(IdempotencyKey)
+        .filter(IdempotencyKey.key == key, IdempotencyKey.endpoint == endpoint)
+        .values(status_code=status_code, body=body, media_type=media_type or "application/json")
+    )
+
+
+async def release_key(key: str, endpoint: str) -> None:
+    """Drop an unfinished claim, so a retry of a failed request runs it again."""
+    async with SessionLocal() as db:
+        await db.execute(
+            delete(IdempotencyKey).filter(
+                IdempotencyKey.key == key, IdempotencyKey.endpoint == endpoint, IdempotencyKey.status_code.is_(None)
+            )
+        )
+        await db.commit()
+
+
+async def delete_expired_keys() -> int:
+    async with SessionLocal() as db:
+        result = await db.execute(delete(IdempotencyKey).filter(IdempotencyKey.expires_at < func.now()))
+        await db.commit()
+    return int(result.rowcount)  # type: ignore[attr-defined]
+
+
+async def clean_up_keys() -> None:
+    """Delete expired keys every `IDEMPOTENCY_CLEANUP_SECONDS`, runs for the lifetime of the app."""
+    while True:
+        try:
+            deleted = await delete_expired_keys()
+            logger.debug("Deleted %d expired idempotency keys", deleted)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Could not delete expired idempotency keys", exc_info=True)
+        await asyncio.sleep(settings.IDEMPOTENCY_CLEANUP_SECONDS)
+
+
+async def hash_request(request: Request) -> str:
+    """Hash of everything a retry has to repeat: the hashed headers, the query string and the body."""
+    digest = hashlib.sha256()
+    for header in HASHED_HEADERS:
+        digest.update(f"{header}: {request.headers.get(header, '')}\n".encode())
+    digest.update(f"?{request.url.query}\n".encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+def replay(db_key: IdempotencyKey) -> Response:
+    return Response(
+        content=db_key.body,
+        status_code=db_key.status_code,
+        media_type=db_key.media_type,
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+async def _wait_for_claim(key: str, endpoint: str, request_hash: str) -> Response | None:
+    """
+    Claim the key, or wait for the request holding it to finish. Returns the stored response
+    to replay, None once this request holds the claim.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while not await claim_key(key, endpoint, request_hash):
+        db_key = await load_key(key, endpoint)
+        if db_key is not None:
+            if db_key.request_hash != request_hash:
+                raise HTTPException(
+                    status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used for another request"
+                )
+            if db_key.status_code is not None:
+                return replay(db_key)
+        # Still running, or released or expired since the claim attempt. Either way wait before the
+        # next attempt, a holder claiming and releasing the key again and again mustn't make this spin.
+        if time.monotonic() > deadline:
+            raise HTTPException(status_code=409, detail=f"A request with this {IDEMPOTENCY_HEADER} is still running")
+        await asyncio.sleep(settings.IDEMPOTENCY_POLL_SECONDS)
+    return None
+
+
+def idempotent(endpoint: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Make a write endpoint honour the `Idempotency-Key` header. The first request with a key
+    runs the endpoint and stores its response, including 4xx errors. Retries with the same key,
+    body, query string and `If-Match` get the stored response without running the endpoint, and
+    duplicates that arrive while the first request is running wait for it. Requests without the
+    header run as usual.
+    """
+    signature = inspect.signature(endpoint)
+    parameters = [
+        *signature.parameters.values(),
+        inspect.Parameter("idempotency_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        # The endpoint's own unit of work, FastAPI resolves `get_uow` once per request
+        inspect.Parameter(
+            "idempotency_db", inspect.Parameter.KEYWORD_ONLY, annotation=AsyncSession, default=Depends(get_uow)
+        ),
+        inspect.Parameter(
+            "idempotency_key",
+            inspect.Parameter.KEYWORD_ONLY,
+            annotation=Annotated[
+                str | None,
+                Header(alias=IDEMPOTENCY_HEADER, max_length=255, description="Client generated key of the write"),
+            ],
+            default=None,
+        ),
+    ]
+
+    @functools.wraps(endpoint)
+    async def wrapper(
+        *args: Any,
+        idempotency_request: Request,
+        idempotency_db: AsyncSession,
+        idempotency_key: str | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        if idempotency_key is None:
+            return await endpoint(*args, **kwargs)
+
+        # Leagues choose their keys independently, the same key of two leagues is two writes
+        league = idempotency_request.headers.get(LEAGUE_HEADER, DEFAULT_LEAGUE)
+        key_endpoint = f"{idempotency_request.method} {idempotency_request.url.path} {league}"
+        stored = await _wait_for_claim(idempotency_key, key_endpoint, await hash_request(idempotency_request))
+        if stored is not None:
+            return stored
+
+        try:
+            result = await endpoint(*args, **kwargs)
+        except HTTPException as exc:
+            if exc.status_code >= 500:
+                await release_key(idempotency_key, key_endpoint)
+            else:
+                # Client errors are answers too, a retry would get the same one. The unit of work
+                # is rolled back, so the error is stored in a session of its own.
+                error = JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
+                async with SessionLocal() as db:
+                    await store_response(
+                        db, idempotency_key, key_endpoint, exc.status_code, bytes(error.body), error.media_type
+                    )
+                    await db.commit()
+            raise
+        except BaseException:
+            await release_key(idempotency_key, key_endpoint)
+            raise
+
+        response = result if isinstance(result, Response) else JSONResponse(jsonable_encoder(result))
+        # The response commits with the endpoint's writes: a retry either replays it or, if the commit
+        # failed and released the key, runs the write again. `get_uow`'s own commit is then a no-op.
+        try:
+            await store_response(
+                idempotency_db,
+                idempotency_key,
+                key_endpoint,
+                response.status_code,
+                bytes(response.body),
+                response.media_type,
+            )
+            await idempotency_db.commit()
+        except BaseException:
+            await release_key(idempotency_key, key_endpoint)
+            raise
+        return response
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)  # type: ignore[attr-defined]
+    return wrapper
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Generic, Hashable, Iterable, Set, Tuple, TypeVar
+
+import asyncpg
+from fastapi import Request, Response
+from sqlalchemy import ColumnElement, String, cast, event, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.utils.coalescing import SharedResponse
+from app.core.utils.etags import Validators
+
+CHANNEL = "invalidation"
+# Evicts every entry, sent instead of messages that would be too long
+FLUSH = "*"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD = 7999
+# Session info keys of the tags to evict after the commit, and of those to NOTIFY before it
+PENDING_KEY = "invalidation_tags"
+UNSENT_KEY = "invalidation_unsent_tags"
+# application_name of the listener connections, to tell them apart in pg_stat_activity
+LISTENER_NAME = "draft_mtg_invalidation_listener"
+
+V = TypeVar("V")
+
+logger = logging.getLogger(__name__)
+
+
+DRAFT = "draft"
+PLAYER = "player"
+
+
+def tag(kind: str, id_: int) -> str:
+    return f"{kind}:{id_}"
+
+
+def notify(kind: str, id_column: Any) -> ColumnElement[Any]:
+    """
+    NOTIFY of a row's tag, for the RETURNING clause of a single statement write so it publishes without
+    another round trip. Pair it with `evict_after_commit` for this worker.
+    """
+    return func.pg_notify(CHANNEL, literal(f"{kind}:") + cast(id_column, String))
+
+
+def encode(tags: Iterable[str]) -> str:
+    payload = ",".join(sorted(set(tags)))
+    return FLUSH if len(payload.encode()) > MAX_PAYLOAD else payload
+
+
+def decode(payload: str) -> Set[str]:
+    return {tag for tag in payload.split(",") if tag}
+
+
+class LocalCache(Generic[V]):
+    """
+    Per-worker LRU cache whose entries are tagged with the rows they were built from, `evict`
+    drops the entries of a tag. Entries are only served while the worker listens for the
+    invalidations of the other workers, see `listen_for_invalidations`.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.entries: OrderedDict[Hashable, Tuple[V, Set[str]]] = OrderedDict()
+        self.keys: Dict[str, Set[Hashable]] = {}
+        self.listening = False
+        # Bumped by every eviction, values computed before one may be stale and aren't stored
+        self.generation = 0
+        self.counts: Counter[str] = Counter()
+
+    def get(self, key: Hashable) -> V | None:
+        entry = self.entries.get(key) if self.listening else None
+        if entry is None:
+            self.counts["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.counts["hits"] += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value: V, tags: Iterable[str], generation: int) -> None:
+        """Store `value` unless something was evicted since `generation` was read, before computing it."""
+        if not self.listening or generation != self.generation:
+            return
+        self._remove(key)
+        tags = set(tags)
+        self.entries[key] = (value, tags)
+        for tag in tags:
+            self.keys.setdefault(tag, set()).add(key)
+        if len(self.entries) > self.size:
+            self._remove(next(iter(self.entries)))
+
+    def evict(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        self.generation += 1
+        if FLUSH in tags:
+            self.flush()
+            return
+        for tag in tags:
+            for key in self.keys.pop(tag, set()):
+                self._remove(key)
+                self.counts["evictions"] += 1
+
+    def flush(self) -> None:
+        self.generation += 1
+        self.entries.clear()
+        self.keys.clear()
+        self.counts["flushes"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"listening": self.listening, "entries": len(self.entries), **self.counts}
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self.keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.keys[tag]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A response together with its validators, so conditional requests are answered from the cache too."""
+
+    validators: Validators
+    shared: SharedResponse
+
+    @classmethod
+    def of(cls, validators: Validators, response: Response) -> "CachedResponse":
+        return cls(validators, SharedResponse.of(response))
+
+    def response(self, request: Request) -> Response:
+        if self.validators.is_fresh(request):
+            return self.validators.not_modified()
+        return self.shared.response()
+
+
+response_cache: LocalCache[CachedResponse] = LocalCache(settings.RESPONSE_CACHE_SIZE)
+
+
+def evict_after_commit(db: AsyncSession, *tags: str) -> None:
+    """Evict the entries of `tags` from this worker's cache once the session's transaction commits."""
+    db.info.setdefault(PENDING_KEY, set()).update(tags)
+
+
+def publish(db: AsyncSession, *tags: str) -> None:
+    """
+    Tell every worker to evict the entries of `tags` once the session's transaction commits. The tags
+    of a transaction go out in one NOTIFY right before its commit, NOTIFY is transactional so
+    nothing is sent if it rolls back. This worker evicts right after the commit instead of waiting
+    for its own message.
+    """
+    evict_after_commit(db, *tags)
+    db.info.setdefault(UNSENT_KEY, set()).update(tags)
+
+
+@event.listens_for(Session, "before_commit")
+def _notify(session: Session) -> None:
+    tags = session.info.pop(UNSENT_KEY, None)
+    if tags:
+        # Runs in the greenlet of the async commit, so the sync API awaits the driver
+        session.execute(select(func.pg_notify(CHANNEL, encode(tags))))
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed(session: Session) -> None:
+    tags = session.info.pop(PENDING_KEY, None)
+    if tags:
+        response_cache.evict(tags)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back(session: Session, previous_transaction: Any) -> None:
+    if not session.in_transaction():
+        session.info.pop(PENDING_KEY, None)
+        session.info.pop(UNSENT_KEY, None)
+
+
+async def listen_for_invalidations(
+    cache: LocalCache[Any],
+    dsn: str = settings.DATABASE_URL,
+    ping_seconds: float = settings.INVALIDATION_PING_SECONDS,
+    reconnect_seconds: float = settings.INVALIDATION_RECONNECT_SECONDS,
+) -> None:
+    """
+    Evict `cache` entries as other workers' invalidations arrive, on a dedicated connection outside
+    the pool. Messages sent while it is disconnected are lost, so the cache is flushed and bypassed
+    until it listens again. The connection is pinged every `ping_seconds` to notice silent drops.
+    """
+
+    def on_notification(_conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        cache.evict(decode(payload))
+
+    delay = reconnect_seconds
+    while True:
+        try:
+            conn = await asyncpg.connect(dsn, server_settings={"application_name": LISTENER_NAME})
+        except (OSError, asyncpg.PostgresError):
+            logger.warning("Could not connect to listen for invalidations, retrying in %.1fs", delay, exc_info=True)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, reconnect_seconds * 30)
+            continue
+
+        lost = asyncio.Event()
+        conn.add_termination_listener(lambda _conn, lost=lost: lost.set())
+        try:
+            await conn.add_listener(CHANNEL, on_notification)
+            # Anything may have changed since the last message this worker got
+            cache.flush()
+            cache.listening = True
+            delay = reconnect_seconds
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), ping_seconds)
+                except asyncio.TimeoutError:
+                    await asyncio.wait_for(conn.execute("SELECT 1"), ping_seconds)
+        except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError):
+            logger.warning("Lost the invalidation listener connection", exc_info=True)
+        finally:
+            cache.listening = False
+            cache.flush()
+            conn.terminate()
+        await asyncio.sleep(delay)
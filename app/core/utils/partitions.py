@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import re
+from datetime import date
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.config import settings
+
+# Range partitioned by draft_date, one partition per year. Parents before children, so a new
+# year's rounds partition exists before matches referencing it can be inserted.
+PARTITIONED_TABLES = ["rounds", "matches"]
+PARTITION_NAME = re.compile(rf"^({'|'.join(PARTITIONED_TABLES)})_(y\d{{4}}|default)$")
+# pg_advisory_xact_lock key, workers starting together create every partition once
+PARTITIONS_LOCK = 4_501_045
+
+logger = logging.getLogger(__name__)
+
+
+def partition_name(table: str, year: int) -> str:
+    return f"{table}_y{year}"
+
+
+def parent_table(name: str) -> str:
+    """Partitioned table of a partition name, other names are returned as they are."""
+    match = PARTITION_NAME.match(name)
+    return match.group(1) if match else name
+
+
+def is_partition(name: str) -> bool:
+    return PARTITION_NAME.match(name) is not None
+
+
+async def _rows_in_default(conn: AsyncConnection, start: date, stop: date) -> bool:
+    for table in PARTITIONED_TABLES:
+        result = await conn.execute(
+            text(f"SELECT EXISTS (SELECT FROM {table}_default WHERE draft_date >= :start AND draft_date < :stop)"),
+            {"start": start, "stop": stop},
+        )
+        if result.scalar():
+            return True
+    return False
+
+
+async def create_partitions(conn: AsyncConnection, first_year: int, last_year: int) -> List[str]:
+    """
+    Create the missing yearly partitions of every partitioned table, returns the created ones. Rows
+    of a year that landed in the default partitions before its partitions existed are moved into them.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITIONS_LOCK})
+    result = await conn.execute(
+        text("SELECT relname FROM pg_class WHERE relispartition AND relname LIKE ANY(:patterns)"),
+        {"patterns": [f"{table}\\_%" for table in PARTITIONED_TABLES]},
+    )
+    existing = set(result.scalars())
+    created = []
+    for year in range(first_year, last_year + 1):
+        missing = [table for table in PARTITIONED_TABLES if partition_name(table, year) not in existing]
+        if not missing:
+            continue
+        bounds = {"start": date(year, 1, 1), "stop": date(year + 1, 1, 1)}
+        # A partition can't be created while the default one holds rows of its range. Take the year's
+        # rows out through the parents, children first so deleting rounds cascades to nothing, and put
+        # them back once the partitions exist. The advisory lock only keeps other partition makers out:
+        # writers are locked out of the default partitions too, or an update committed between the copy
+        # and the delete would be lost.
+        await conn.execute(
+            text(f"LOCK TABLE {', '.join(f'{table}_default' for table in PARTITIONED_TABLES)} IN EXCLUSIVE MODE")
+        )
+        moved = await _rows_in_default(conn, **bounds)
+        if moved:
+            for table in reversed(PARTITIONED_TABLES):
+                await conn.execute(
+                    text(
+                        f"CREATE TEMPORARY TABLE moved_{table} ON COMMIT DROP AS "
+                        f"SELECT * FROM {table} WHERE draft_date >= :start AND draft_date < :stop"
+                    ),
+                    bounds,
+                )
+                await conn.execute(
+                    text(f"DELETE FROM {table} WHERE draft_date >= :start AND draft_date < :stop"), bounds
+                )
+        for table in missing:
+            name = partition_name(table, year)
+            await conn.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['stop']}')"
+                )
+            )
+            created.append(name)
+        if moved:
+            for table in PARTITIONED_TABLES:
+                await conn.execute(text(f"INSERT INTO {table} SELECT * FROM moved_{table}"))
+                await conn.execute(text(f"DROP TABLE moved_{table}"))
+    return created
+
+
+async def ensure_future_partitions(engine: AsyncEngine) -> List[str]:
+    """Partitions from this year to `PARTITIONS_AHEAD_YEARS` ahead, so new drafts never hit the default one."""
+    this_year = date.today().year
+    async with engine.begin() as conn:
+        return await create_partitions(conn, this_year, this_year + settings.PARTITIONS_AHEAD_YEARS)
+
+
+async def maintain_partitions(engine: AsyncEngine) -> None:
+    """Create upcoming partitions every `PARTITIONS_CHECK_SECONDS`, runs for the lifetime of the app."""
+    while True:
+        try:
+            created = await ensure_future_partitions(engine)
+            if created:
+                logger.info("Created partitions %s", ", ".join(created))
+        except DBAPIError:
+            logger.warning("Could not create upcoming partitions", exc_info=True)
+        await asyncio.sleep(settings.PARTITIONS_CHECK_SECONDS)
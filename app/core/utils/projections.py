@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import case, func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.models import POINTS_MAP, Match, MatchResult
+
+# Column order of every outcome array
+OUTCOMES = [
+    MatchResult.PLAYER_1_FULL_WIN,
+    MatchResult.PLAYER_1_WIN,
+    MatchResult.PLAYER_2_WIN,
+    MatchResult.PLAYER_2_FULL_WIN,
+]
+PLAYER_1_POINTS = np.array([POINTS_MAP[outcome][0] for outcome in OUTCOMES])
+PLAYER_2_POINTS = np.array([POINTS_MAP[outcome][1] for outcome in OUTCOMES])
+# Pseudo-matches every player starts with, so a few results don't make anyone a sure winner
+PRIOR_MATCHES = 10
+
+
+class OutcomeModel(str, Enum):
+    HISTORY = "history"
+    UNIFORM = "uniform"
+
+
+@dataclass
+class Projection:
+    player_ids: List[int]
+    current_points: np.ndarray  # (players,)
+    expected_points: np.ndarray  # (players,)
+    place_probabilities: np.ndarray  # (players, places), column 0 is first place
+
+
+def rank_places(
+    player_count: int, player_1: np.ndarray, player_2: np.ndarray, outcomes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Points and final places of every simulation at once, with the rules of `assign_final_places`:
+    more points first, equal points split by head-to-head wins among the tied players, still equal
+    players share a place. `player_1`/`player_2` hold player indexes per match, `outcomes` holds an
+    index into OUTCOMES per simulation and match.
+    """
+    # One-hot (matches, players) maps per-match points onto players with a matrix product
+    seats_1 = np.zeros((len(player_1), player_count))
+    seats_1[np.arange(len(player_1)), player_1] = 1
+    seats_2 = np.zeros((len(player_2), player_count))
+    seats_2[np.arange(len(player_2)), player_2] = 1
+
+    points_1 = PLAYER_1_POINTS[outcomes]
+    points_2 = PLAYER_2_POINTS[outcomes]
+    points = points_1 @ seats_1 + points_2 @ seats_2  # (simulations, players)
+
+    # A head-to-head win counts when both players of the match ended on the same points
+    tied = points[:, player_1] == points[:, player_2]
+    h2h = ((points_1 == 3) & tied) @ seats_1 + ((points_2 == 3) & tied) @ seats_2
+
+    ahead = points[:, None, :] > points[:, :, None]
+    ahead_on_h2h = (points[:, None, :] == points[:, :, None]) & (h2h[:, None, :] > h2h[:, :, None])
+    places = 1 + (ahead | ahead_on_h2h).sum(axis=2)
+    return points, places
+
+
+def outcome_probabilities(
+    player_1: Sequence[int], player_2: Sequence[int], win_rates: Dict[int, float], full_win_share: float
+) -> np.ndarray:
+    """(matches, outcomes) probabilities, match winners from the players' win rates with the log5 formula."""
+    rate_1 = np.array([win_rates.get(player_id, 0.5) for player_id in player_1])
+    rate_2 = np.array([win_rates.get(player_id, 0.5) for player_id in player_2])
+    denominator = rate_1 * (1 - rate_2) + rate_2 * (1 - rate_1)
+    player_1_wins = np.divide(rate_1 * (1 - rate_2), denominator, out=np.full_like(rate_1, 0.5), where=denominator > 0)
+    return np.stack(
+        [
+            player_1_wins * full_win_share,
+            player_1_wins * (1 - full_win_share),
+            (1 - player_1_wins) * (1 - full_win_share),
+            (1 - player_1_wins) * full_win_share,
+        ],
+        axis=1,
+    )
+
+
+def simulate(
+    player_ids: List[int],
+    matches: Sequence[Tuple[int, int, str]],
+    probabilities: np.ndarray,
+    simulations: int,
+    rng: np.random.Generator,
+) -> Projection:
+    """
+    Play the open matches `simulations` times, `probabilities` has one row per open match in
+    `matches` order. Finished matches keep their score in every simulation.
+    """
+    index = {player_id: i for i, player_id in enumerate(player_ids)}
+    player_1 = np.array([index[match[0]] for match in matches], dtype=np.intp)
+    player_2 = np.array([index[match[1]] for match in matches], dtype=np.intp)
+    open_mask = np.array([match[2] == MatchResult.BASE.value for match in matches], dtype=bool)
+    finished = [OUTCOMES.index(MatchResult(score)) for _, _, score in matches if score != MatchResult.BASE.value]
+
+    outcomes = np.empty((simulations, len(matches)), dtype=np.intp)
+    outcomes[:, ~open_mask] = finished
+    if open_mask.any():
+        # Inverse transform sampling, the count of cdf steps below u is the outcome index
+        cdf = np.cumsum(probabilities, axis=1)[:, :-1]
+        draws = rng.random((simulations, int(open_mask.sum())))
+        outcomes[:, open_mask] = (draws[:, :, None] >= cdf[None, :, :]).sum(axis=2)
+
+    player_count = len(player_ids)
+    closed = ~open_mask
+    current = np.bincount(player_1[closed], PLAYER_1_POINTS[finished], player_count)
+    current += np.bincount(player_2[closed], PLAYER_2_POINTS[finished], player_count)
+    points, places = rank_places(player_count, player_1, player_2, outcomes)
+
+    counts = np.zeros((player_count, player_count))
+    for place in range(1, player_count + 1):
+        counts[:, place - 1] = (places == place).sum(axis=0)
+    return Projection(
+        player_ids=player_ids,
+        current_points=current,
+        expected_points=points.mean(axis=0),
+        place_probabilities=counts / simulations,
+    )
+
+
+async def historical_rates(db: AsyncSession, player_ids: List[int]) -> Tuple[Dict[int, float], float]:
+    """
+    Match win rate of every player over their finished matches, and the share of 2-0 results
+    among those matches.
+    """
+    finished = Match.score != MatchResult.BASE.value
+    player_1_won = Match.score.in_([MatchResult.PLAYER_1_FULL_WIN.value, MatchResult.PLAYER_1_WIN.value])
+    full_win = Match.score.in_([MatchResult.PLAYER_1_FULL_WIN.value, MatchResult.PLAYER_2_FULL_WIN.value])
+    seats = union_all(
+        select(
+            Match.player_1_id.label("player_id"),
+            case((player_1_won, 1), else_=0).label("won"),
+            case((full_win, 1), else_=0).label("full_win"),
+        ).where(finished, Match.player_1_id.in_(player_ids)),
+        select(
+            Match.player_2_id.label("player_id"),
+            case((player_1_won, 0), else_=1).label("won"),
+            case((full_win, 1), else_=0).label("full_win"),
+        ).where(finished, Match.player_2_id.in_(player_ids)),
+    ).subquery()
+    result = await db.execute(
+        select(seats.c.player_id, func.sum(seats.c.won), func.sum(seats.c.full_win), func.count()).group_by(
+            seats.c.player_id
+        )
+    )
+    rows = result.all()
+
+    win_rates = {
+        player_id: (wins + PRIOR_MATCHES / 2) / (played + PRIOR_MATCHES) for player_id, wins, _, played in rows
+    }
+    played = sum(row[3] for row in rows)
+    full_win_share = sum(row[2] for row in rows) / played if played else 0.5
+    return win_rates, full_win_share
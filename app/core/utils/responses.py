@@ -0,0 +1,33 @@
+from typing import Any, Generic, Mapping, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+
+class JSONAdapter(Generic[T]):
+    """
+    Precompiled serializer for a response type. Validates ORM objects straight into the schema
+    and dumps them to JSON bytes in pydantic-core, skipping FastAPI's jsonable_encoder and
+    stdlib json. Routes keep `response_model=` for the OpenAPI schema and return `response(...)`.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, type_: type[T]) -> None:
+        self.type_ = type_
+        self.adapter: TypeAdapter[T] = TypeAdapter(type_)
+
+    def validate(self, obj: Any) -> T:
+        return self.adapter.validate_python(obj, from_attributes=True)
+
+    def jsonable(self, obj: Any) -> Any:
+        """JSON compatible Python data, for payloads like `HTTPException.detail`."""
+        return self.adapter.dump_python(self.validate(obj), mode="json")
+
+    def dump(self, obj: Any) -> bytes:
+        return self.adapter.dump_json(self.validate(obj))
+
+    def response(self, obj: Any, status_code: int = 200, headers: Mapping[str, str] | None = None) -> Response:
+        return Response(content=self.dump(obj), status_code=status_code, headers=headers, media_type=self.media_type)
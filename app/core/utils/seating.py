@@ -0,0 +1,140 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.models import Draft, Match
+from app.core.utils.drafts import schedule_pairings
+
+
+@dataclass
+class Seating:
+    player_ids: List[int]
+    # Sum of pair weight over round weight of every scheduled match, lower is better
+    repeat_score: float
+    original_repeat_score: float
+
+
+class PairIndex:
+    """
+    How often and how recently every pair of a set of players met. A past match weighs
+    1 / drafts ago, so last draft's opponents weigh 1 and a meeting ten drafts back weighs 0.1.
+    """
+
+    def __init__(self, player_ids: Sequence[int], weights: Dict[Tuple[int, int], float]) -> None:
+        index = {player_id: i for i, player_id in enumerate(player_ids)}
+        # The extra last row is the dummy bye player, who never repeats anything
+        self.matrix = np.zeros((len(player_ids) + 1, len(player_ids) + 1))
+        for (player_1_id, player_2_id), weight in weights.items():
+            i, j = index[player_1_id], index[player_2_id]
+            self.matrix[i, j] += weight
+            self.matrix[j, i] += weight
+
+
+async def load_pair_index(db: AsyncSession, player_ids: Sequence[int]) -> PairIndex:
+    """
+    Aggregate the past matches among `player_ids` into a `PairIndex` with a single query. Only the
+    last `SEATING_HISTORY_DRAFTS` drafts count, older meetings would weigh less than
+    1 / SEATING_HISTORY_DRAFTS each. They are read backwards from the (league_id, date, id) index,
+    and their matches from their years' partitions only.
+    """
+    recent = (
+        select(
+            Draft.id,
+            Draft.date,
+            func.row_number().over(order_by=(Draft.date.desc(), Draft.id.desc())).label("drafts_ago"),
+        )
+        .order_by(Draft.date.desc(), Draft.id.desc())
+        .limit(settings.SEATING_HISTORY_DRAFTS)
+        .subquery()
+    )
+    stmt = (
+        select(Match.player_1_id, Match.player_2_id, func.sum(1.0 / recent.c.drafts_ago))
+        .join(recent, (recent.c.id == Match.draft_id) & (recent.c.date == Match.draft_date))
+        .where(
+            Match.player_1_id.in_(player_ids),
+            Match.player_2_id.in_(player_ids),
+            # Lets the executor prune the partitions older than the window
+            Match.draft_date >= select(func.min(recent.c.date)).scalar_subquery(),
+        )
+        .group_by(Match.player_1_id, Match.player_2_id)
+    )
+    result = await db.execute(stmt)
+    weights = {(player_1_id, player_2_id): float(weight) for player_1_id, player_2_id, weight in result}
+    return PairIndex(player_ids, weights)
+
+
+def seat_pairs(seat_count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Seats of both players of every match `schedule_pairings` plays, and the weight of the match's
+    round. Round n weighs 1 / n, so repeats in the first rounds cost the most.
+    """
+    seats_1, seats_2, round_weights = [], [], []
+    for number, round_pairings in enumerate(schedule_pairings(list(range(seat_count))), start=1):
+        for seat_1, seat_2 in round_pairings:
+            seats_1.append(seat_1)
+            seats_2.append(seat_2)
+            round_weights.append(1 / number)
+    return np.array(seats_1, dtype=np.intp), np.array(seats_2, dtype=np.intp), np.array(round_weights)
+
+
+def optimize_seating(
+    player_ids: List[int], pair_index: PairIndex, budget_seconds: float, rng: np.random.Generator
+) -> Seating:
+    """
+    Steepest descent over seat swaps with random restarts until `budget_seconds` run out.
+    The caller's order is kept unless a seating with fewer early repeats is found.
+    """
+    player_count = len(player_ids)
+    # Seatings are arrays of indexes into `player_ids`, the dummy bye player sits last
+    seat_count = player_count + player_count % 2
+    seats_1, seats_2, round_weights = seat_pairs(seat_count)
+    swaps_1, swaps_2 = np.triu_indices(player_count, k=1)
+    rows = np.arange(len(swaps_1))
+
+    def scores(seatings: np.ndarray) -> np.ndarray:
+        weights: np.ndarray = pair_index.matrix[seatings[:, seats_1], seatings[:, seats_2]]
+        return weights @ round_weights
+
+    original = np.arange(seat_count)
+    original_score = float(scores(original[None])[0])
+    best, best_score = original, original_score
+    current, current_score = original, original_score
+
+    deadline = time.perf_counter() + budget_seconds
+    while best_score > 0 and player_count > 2 and time.perf_counter() < deadline:
+        # Score every seating one swap away from the current one at once
+        candidates = np.repeat(current[None], len(rows), axis=0)
+        candidates[rows, swaps_1] = current[swaps_2]
+        candidates[rows, swaps_2] = current[swaps_1]
+        candidate_scores = scores(candidates)
+        choice = int(candidate_scores.argmin())
+
+        if candidate_scores[choice] < current_score - 1e-9:
+            current, current_score = candidates[choice], float(candidate_scores[choice])
+            if current_score < best_score:
+                best, best_score = current, current_score
+        else:
+            # Local optimum, restart from a random seating
+            current = np.concatenate([rng.permutation(player_count), original[player_count:]])
+            current_score = float(scores(current[None])[0])
+
+    return Seating(
+        player_ids=[player_ids[i] for i in best[:player_count]],
+        repeat_score=round(best_score, 4),
+        original_repeat_score=round(original_score, 4),
+    )
+
+
+async def suggest_seating(db: AsyncSession, player_ids: List[int], seed: int | None = None) -> Seating:
+    """Seating of `player_ids` with the fewest repeats of past pairings in the first rounds."""
+    pair_index = await load_pair_index(db, player_ids)
+    # CPU bound, keep the event loop free for other requests
+    return await run_in_threadpool(
+        optimize_seating, player_ids, pair_index, settings.SEATING_SEARCH_MS / 1000, np.random.default_rng(seed)
+    )
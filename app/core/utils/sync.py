@@ -0,0 +1,154 @@
+import asyncio
+import base64
+import binascii
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Literal, Tuple
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import delete, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.models import Draft, DraftPlayer, Match, Player, Round, Tombstone
+from app.db.database import Base, SessionLocal
+
+TOKEN_VERSION = "2"
+# Tokens of a finished sync before it was paged, only hold its horizon
+TOKEN_VERSION_HORIZON = "1"
+# While set, the tombstones trigger doesn't record deletes, see `skip_tombstones`
+ARCHIVING_SETTING = "draft_mtg.archiving"
+# Children before their parents: a row committed between two of the reads can only bring along
+# parents the client doesn't have yet, never children of a parent it doesn't have. Pages go through
+# every table by (updated_at, key), the columns of their league_id, updated_at indexes.
+SyncedTable = Literal["matches", "draft_players", "rounds", "drafts", "players"]
+SYNCED: List[Tuple[SyncedTable, type[Base], Tuple[str, ...]]] = [
+    ("matches", Match, ("id",)),
+    ("draft_players", DraftPlayer, ("draft_id", "player_id")),
+    ("rounds", Round, ("id",)),
+    ("drafts", Draft, ("id",)),
+    ("players", Player, ("id",)),
+]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncPosition:
+    """Where a sync stands, the opaque `token` of its responses."""
+
+    # Rows changed at or after it are sent, all of them without it
+    since: datetime | None = None
+    # Read before the first page, the `since` of the next sync once the last page is sent
+    horizon: datetime | None = None
+    # The updated_at and key of the last row sent of every table with rows left, tables missing
+    # from it are done. None on the first page.
+    after: Dict[SyncedTable, Tuple[datetime, List[int]]] | None = None
+
+
+POSITION = TypeAdapter(SyncPosition)
+KEY_LENGTHS = {name: len(key) for name, _, key in SYNCED}
+
+
+def encode_token(position: SyncPosition) -> str:
+    raw = f"{TOKEN_VERSION}:".encode() + POSITION.dump_json(position, exclude_none=True)
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token: str) -> SyncPosition:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        version, _, payload = raw.partition(":")
+        if version == TOKEN_VERSION_HORIZON:
+            return SyncPosition(since=datetime.fromisoformat(payload))
+        if version != TOKEN_VERSION:
+            raise ValueError(f"Unknown token version {version}")
+        position = POSITION.validate_json(payload)
+        for name, (_, key) in (position.after or {}).items():
+            if len(key) != KEY_LENGTHS[name]:
+                raise ValueError(f"Invalid {name} key {key}")
+        return position
+    except (ValueError, ValidationError, UnicodeDecodeError, binascii.Error) as err:
+        raise HTTPException(status_code=400, detail="Invalid sync token") from err
+
+
+async def sync_horizon(db: AsyncSession) -> datetime:
+    """
+    Where the next sync has to start reading. Rows get their transaction's start, `now()`, as
+    `updated_at`, so a transaction still running commits rows older than any clock read here: the
+    horizon is the start of the oldest running transaction. Read it before the changed rows, any
+    transaction those reads don't see started after it.
+    """
+    result = await db.execute(
+        text(
+            "SELECT least(now(), min(xact_start))::timestamp FROM pg_stat_activity "
+            "WHERE datname = current_database() AND backend_type = 'client backend'"
+        )
+    )
+    return result.scalar_one()  # type: ignore[no-any-return]
+
+
+async def read_changes(
+    db: AsyncSession, position: SyncPosition, limit: int
+) -> Tuple[Dict[str, Any], Dict[SyncedTable, Tuple[datetime, List[int]]]]:
+    """
+    The next page of the rows of every synced table changed at or after `position.since`, everything
+    without it: up to `limit` rows of each table, going on after `position.after`. Returns them with
+    the position of the tables that have rows left and, once none has, the ids deleted since.
+    """
+    changes: Dict[str, Any] = {}
+    after: Dict[SyncedTable, Tuple[datetime, List[int]]] = {}
+    for name, model, key in SYNCED:
+        if position.after is not None and name not in position.after:
+            continue
+        updated_at = model.updated_at  # type: ignore[attr-defined]
+        columns = [updated_at, *(getattr(model, column) for column in key)]
+        stmt = select(model).order_by(*columns).limit(limit + 1)
+        if position.since is not None:
+            stmt = stmt.where(updated_at >= position.since)
+        if position.after is not None:
+            last_at, last_key = position.after[name]
+            stmt = stmt.where(tuple_(*columns) > (last_at, *last_key))
+        rows = (await db.execute(stmt)).scalars().all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            after[name] = (last.updated_at, [getattr(last, column) for column in key])  # type: ignore[attr-defined]
+        changes[name] = rows
+
+    deleted: Dict[str, List[int]] = {"drafts": [], "players": []}
+    if position.since is not None and not after:
+        result = await db.execute(
+            select(Tombstone.table_name, Tombstone.row_id)
+            .where(Tombstone.deleted_at >= position.since)
+            .order_by(Tombstone.id)
+        )
+        for table_name, row_id in result:
+            deleted[table_name].append(row_id)
+    return {**changes, "deleted": deleted}, after
+
+
+async def skip_tombstones(db: AsyncSession) -> None:
+    """Don't record the deletes of the current transaction, for drafts moved to the archive."""
+    await db.execute(select(func.set_config(ARCHIVING_SETTING, "on", True)))
+
+
+async def delete_expired_tombstones() -> int:
+    async with SessionLocal() as db:
+        cutoff = func.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+        result = await db.execute(delete(Tombstone).filter(Tombstone.deleted_at < cutoff))
+        await db.commit()
+    return int(result.rowcount)  # type: ignore[attr-defined]
+
+
+async def clean_up_tombstones() -> None:
+    """Delete expired tombstones every `SYNC_CLEANUP_SECONDS`, runs for the lifetime of the app."""
+    while True:
+        try:
+            deleted = await delete_expired_tombstones()
+            logger.debug("Deleted %d expired tombstones", deleted)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Could not delete expired tombstones", exc_info=True)
+        await asyncio.sleep(settings.SYNC_CLEANUP_SECONDS)
@@ -1,25 +1,105 @@
-from typing import AsyncGenerator
+import asyncio
+import logging
+import time
+from typing import Annotated, AsyncGenerator
 
+from fastapi import Depends, Header
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
 
 from app.config import settings
+from app.db.leagues import DEFAULT_LEAGUE, LEAGUE_KEY, scope_to_league
 
 
 class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
+class PoolWaits:
+    """Exponential moving average of how long connection checkouts took, in seconds."""
+
+    def __init__(self, weight: float = 0.2) -> None:
+        self.weight = weight
+        self.average = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.average += self.weight * (seconds - self.average)
+
+
+pool_waits = PoolWaits()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool recording every checkout in `pool_waits`, admission control adapts its limits to it."""
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            pool_waits.observe(time.perf_counter() - start)
+
+
 # Convert PostgreSQL URL to async version
 async_database_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
-engine = create_async_engine(async_database_url, echo=True)
+engine = create_async_engine(
+    async_database_url,
+    echo=settings.DEBUG,
+    poolclass=TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
 SessionLocal = async_sessionmaker(class_=AsyncSession, expire_on_commit=False, bind=engine)
 
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_pool() -> None:
+    """
+    Open the whole pool up front so the first requests of a fresh worker don't pay for connecting.
+    """
+
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.gather(*(ping() for _ in range(settings.DB_POOL_SIZE)))
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("Could not warm up the database pool", exc_info=True)
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+
+async def get_db(
+    x_league: Annotated[str, Header(description="Slug of the league to work in")] = DEFAULT_LEAGUE,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session of a request, scoped to the request's league so it never sees another league's rows."""
     async with SessionLocal() as db:
         try:
+            await scope_to_league(db, x_league)
             yield db
         finally:
             await db.close()
+
+
+async def get_league_id(db: AsyncSession = Depends(get_db)) -> int:
+    """League of the request, for work outside its session like streamed responses."""
+    return int(db.info[LEAGUE_KEY])
+
+
+async def get_uow(db: AsyncSession = Depends(get_db)) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Unit of work of a write request: one transaction, committed once after the handler returns
+    and rolled back if it raises. Handlers and the utils they call only flush.
+    """
+    try:
+        yield db
+    except BaseException:
+        await db.rollback()
+        raise
+    else:
+        # Nothing to do for reads, or when `idempotent` committed the writes with their response
+        if db.in_transaction():
+            await db.commit()
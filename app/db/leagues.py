@@ -0,0 +1,71 @@
+from typing import Any, Dict
+
+from fastapi import HTTPException
+from sqlalchemy import CompoundSelect, Integer, event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, ORMExecuteState, Session, mapped_column, with_loader_criteria
+
+# Request header with the slug of the league a request works in, requests without it use the default league
+LEAGUE_HEADER = "X-League"
+DEFAULT_LEAGUE = "default"
+# Created by the migration that introduced leagues, every row from before it belongs to it
+DEFAULT_LEAGUE_ID = 1
+# Session info key of the league the session is scoped to
+LEAGUE_KEY = "league_id"
+
+# Slugs never change, every worker keeps the ids it looked up
+_league_ids: Dict[str, int] = {DEFAULT_LEAGUE: DEFAULT_LEAGUE_ID}
+
+
+class LeagueScoped:
+    """
+    Models holding a league's data. A session scoped to a league only reads, updates and deletes
+    that league's rows of them and adds its new rows to that league. Rows belonging to a draft
+    copy its league, so scoped queries filter them without joining drafts.
+    """
+
+    league_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+async def scope_to_league(db: AsyncSession, slug: str) -> int:
+    """Scope the session to the league of `slug`, 404 if there is none. Returns the league's id."""
+    league_id = _league_ids.get(slug)
+    if league_id is None:
+        result = await db.execute(text("SELECT id FROM leagues WHERE slug = :slug"), {"slug": slug})
+        league_id = result.scalar()
+        if league_id is None:
+            raise HTTPException(status_code=404, detail="League not found")
+        _league_ids[slug] = league_id
+    db.info[LEAGUE_KEY] = league_id
+    return league_id
+
+
+def league_of(db: AsyncSession) -> int | None:
+    """League the session is scoped to, None for unscoped sessions like those of the CLI jobs."""
+    return db.info.get(LEAGUE_KEY)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_statement(state: ORMExecuteState) -> None:
+    league_id = state.session.info.get(LEAGUE_KEY)
+    if league_id is None or state.is_column_load or state.is_relationship_load:
+        # Relationship and column loads inherit the criteria of the statement that loaded their parents
+        return
+    if isinstance(state.statement, CompoundSelect):
+        # The ORM only applies the criteria to the first part of a top-level UNION, and caches its league.
+        # Selected from as a subquery, every part gets them with the session's league bound.
+        state.statement = select(state.statement.subquery())
+    if state.is_select or state.is_update or state.is_delete:
+        state.statement = state.statement.options(
+            with_loader_criteria(LeagueScoped, lambda cls: cls.league_id == league_id, include_aliases=True)
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _add_to_league(session: Session, _flush_context: Any, _instances: Any) -> None:
+    league_id = session.info.get(LEAGUE_KEY)
+    if league_id is None:
+        return
+    for instance in session.new:
+        if isinstance(instance, LeagueScoped) and instance.league_id is None:
+            instance.league_id = league_id
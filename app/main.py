@@ -1,11 +1,54 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.auth.routers import login, users
 from app.config import settings
-from app.core.routers import draft_players, drafts, matches, players, rounds
+from app.core.routers import draft_players, drafts, exports, leagues, matches, metrics, players, rounds, sync
+from app.core.utils.idempotency import clean_up_keys
+from app.core.utils.invalidation import listen_for_invalidations, response_cache
+from app.core.utils.partitions import maintain_partitions
+from app.core.utils.sync import clean_up_tombstones
+from app.db.database import engine, pool_waits, warm_up_pool
+from app.middleware.admission import AUTH, READ, WRITE, AdmissionMiddleware
+from app.middleware.compression import CompressionMiddleware
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await warm_up_pool()
+    tasks = [
+        asyncio.create_task(clean_up_keys()),
+        asyncio.create_task(clean_up_tombstones()),
+        asyncio.create_task(maintain_partitions(engine)),
+        asyncio.create_task(listen_for_invalidations(response_cache)),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await engine.dispose()
+
 
-app = FastAPI(title="Draft MTG API", description="API for managing MTG drafts", version="1.0.0")
+app = FastAPI(title="Draft MTG API", description="API for managing MTG drafts", version="1.0.0", lifespan=lifespan)
+# Innermost, so CORS preflights aren't limited and 503s still get CORS headers
+app.add_middleware(
+    AdmissionMiddleware,
+    limits={
+        READ: settings.ADMISSION_READ_LIMIT,
+        WRITE: settings.ADMISSION_WRITE_LIMIT,
+        AUTH: settings.ADMISSION_AUTH_LIMIT,
+    },
+    queue_size=settings.ADMISSION_QUEUE_SIZE,
+    queue_seconds=settings.ADMISSION_QUEUE_SECONDS,
+    pool_wait=lambda: pool_waits.average,
+    target_pool_wait=settings.ADMISSION_TARGET_POOL_WAIT_MS / 1000,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ORIGINS,
@@ -13,13 +56,25 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    content_types=settings.COMPRESSION_CONTENT_TYPES,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+    cache_size=settings.COMPRESSION_CACHE_SIZE,
+)
 
 
+app.include_router(leagues.router)
 app.include_router(players.router)
 app.include_router(drafts.router)
 app.include_router(draft_players.router)
 app.include_router(rounds.router)
 app.include_router(matches.router)
+app.include_router(exports.router)
+app.include_router(sync.router)
+app.include_router(metrics.router)
 app.include_router(users.router)
 app.include_router(login.router)
 
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Dict
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+READ = "read"
+WRITE = "write"
+AUTH = "auth"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+AUTH_PATHS = ("/login", "/refresh", "/logout", "/change-password", "/users")
+# Multiplicative decrease while the pool is congested, additive increase while it isn't
+DECREASE_FACTOR = 0.75
+INCREASE_STEP = 1.0
+
+
+def route_class(method: str, path: str) -> str:
+    if path.startswith(AUTH_PATHS):
+        return AUTH
+    return READ if method in SAFE_METHODS else WRITE
+
+
+class ConcurrencyLimiter:
+    """
+    Admits up to `limit` requests at once and queues up to `queue_size` more in arrival order.
+    The limit moves between 1 and `max_limit`, see `adapt`.
+    """
+
+    def __init__(self, max_limit: int, queue_size: int) -> None:
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future[None]] = deque()
+
+    @property
+    def capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, False when the queue is full or no slot freed up within `timeout` seconds."""
+        if self.in_flight < self.capacity and not self.waiters:
+            self.in_flight += 1
+            return True
+        if len(self.waiters) >= self.queue_size:
+            return False
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return False
+        except asyncio.CancelledError:
+            # The client went away right after `release` handed it the slot
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def adapt(self, pool_wait: float, target: float) -> None:
+        """
+        Shrink the limit while connection checkouts wait longer than `target`, so requests queue
+        here with a deadline rather than in the pool. Grow it back while there is demand for it.
+        """
+        if pool_wait > target:
+            self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+        elif self.waiters or self.in_flight >= self.capacity:
+            self.limit = min(float(self.max_limit), self.limit + INCREASE_STEP)
+        self._wake()
+
+    def _wake(self) -> None:
+        # Hand freed slots straight to the oldest waiters, skipping those that timed out
+        while self.waiters and self.in_flight < self.capacity:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI admission control. Requests are limited per route class (reads, writes and auth),
+    wait for a slot in a bounded queue and get a 503 with `Retry-After` once the queue is full or
+    their wait runs out. Every `adapt_seconds` the limits follow the database pool's checkout times.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: Dict[str, int],
+        queue_size: int = 64,
+        queue_seconds: float = 5.0,
+        pool_wait: Callable[[], float] = lambda: 0.0,
+        target_pool_wait: float = 0.02,
+        retry_after: int = 1,
+        adapt_seconds: float = 1.0,
+    ) -> None:
+        self.app = app
+        self.limiters = {name: ConcurrencyLimiter(limit, queue_size) for name, limit in limits.items()}
+        self.queue_seconds = queue_seconds
+        self.pool_wait = pool_wait
+        self.target_pool_wait = target_pool_wait
+        self.retry_after = retry_after
+        self.adapt_seconds = adapt_seconds
+        self.adapted_at = time.monotonic()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters.get(route_class(scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire(self.queue_seconds):
+            response = JSONResponse(
+                {"detail": "Server is busy, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+            self._adapt()
+
+    def _adapt(self) -> None:
+        now = time.monotonic()
+        if now - self.adapted_at < self.adapt_seconds:
+            return
+        self.adapted_at = now
+        pool_wait = self.pool_wait()
+        for limiter in self.limiters.values():
+            limiter.adapt(pool_wait, self.target_pool_wait)
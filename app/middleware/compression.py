@@ -0,0 +1,199 @@
+import gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli ships with the `server` extra
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+CACHEABLE_METHODS = ("GET", "HEAD")
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """Map every coding of an Accept-Encoding header to its quality value."""
+    codings: dict[str, float] = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        codings[coding.strip().lower()] = quality
+    return codings
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == BROTLI:
+            self.brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 16 + MAX_WBITS writes a gzip header and trailer
+            self.zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compress a chunk and flush it, so clients get every streamed row right away."""
+        if self.encoding == BROTLI:
+            return bytes(self.brotli.process(chunk) + self.brotli.flush())
+        return self.zlib.compress(chunk) + self.zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == BROTLI:
+            return bytes(self.brotli.finish())
+        return self.zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI gzip/brotli compression. Complete bodies of GET responses are cached already
+    compressed, keyed by a digest of the body, so hot payloads are compressed once per worker.
+    Streaming responses are compressed chunk by chunk and never cached.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = ("application/json",),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        cache_size: int = 256,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self.cache: OrderedDict[Tuple[str, bytes], bytes] = OrderedDict()
+        self.encodings = [BROTLI, GZIP] if brotli is not None else [GZIP]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, scope["method"] in CACHEABLE_METHODS, send)
+        await self.app(scope, receive, responder.send)
+
+    def choose_encoding(self, accept_encoding: str) -> str | None:
+        codings = parse_accept_encoding(accept_encoding)
+        wildcard = codings.get("*", 0.0)
+        best, best_quality = None, 0.0
+        for encoding in self.encodings:
+            quality = codings.get(encoding, wildcard)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def is_compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type.startswith(self.content_types)
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == BROTLI:
+            return bytes(brotli.compress(body, quality=self.brotli_quality))
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_cached(self, encoding: str, body: bytes) -> bytes:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is not None:
+            self.cache.move_to_end(key)
+            return compressed
+
+        compressed = self.compress(encoding, body)
+        self.cache[key] = compressed
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return compressed
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, cacheable: bool, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.cacheable = cacheable
+        self.downstream = send
+        self.start: Message | None = None
+        self.passthrough = False
+        self.stream: _StreamCompressor | None = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the headers back until the first body chunk tells whether to compress
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+        if self.stream is not None:
+            await self._send_chunk(message)
+            return
+
+        assert self.start is not None
+        headers = Headers(raw=self.start["headers"])
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if not self.middleware.is_compressible(headers) or (not more_body and len(body) < self.middleware.minimum_size):
+            self.passthrough = True
+            await self.downstream(self.start)
+            await self.downstream(message)
+            return
+
+        if more_body:
+            self.stream = _StreamCompressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            self._set_headers(None)
+            await self.downstream(self.start)
+            await self._send_chunk(message)
+            return
+
+        no_store = "no-store" in headers.get("cache-control", "")
+        if self.cacheable and self.start["status"] == 200 and not no_store:
+            compressed = self.middleware.compress_cached(self.encoding, body)
+        else:
+            compressed = self.middleware.compress(self.encoding, body)
+        self._set_headers(len(compressed))
+        await self.downstream(self.start)
+        await self.downstream({"type": "http.response.body", "body": compressed})
+
+    async def _send_chunk(self, message: Message) -> None:
+        assert self.stream is not None
+        more_body = message.get("more_body", False)
+        chunk = self.stream.compress(message.get("body", b""))
+        if not more_body:
+            chunk += self.stream.finish()
+        await self.downstream({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _set_headers(self, content_length: int | None) -> None:
+        assert self.start is not None
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        del headers["Content-Length"]
+        if content_length is not None:
+            headers["Content-Length"] = str(content_length)
+        etag = headers.get("etag")
+        if etag is not None and not etag.startswith("W/"):
+            # The compressed representation is no longer byte-identical
+            headers["ETag"] = f"W/{etag}"
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+
+from app.benchmarks.report import percentile
+from app.middleware.admission import AUTH, READ, WRITE, AdmissionMiddleware, ConcurrencyLimiter, route_class
+
+HANDLER_SECONDS = 0.01
+POOL_SIZE = 4
+
+
+def make_app(limit: int, queue_size: int, queue_seconds: float = 1.0) -> tuple[AdmissionMiddleware, List[int]]:
+    """
+    Middleware around an app whose handlers hold one of `POOL_SIZE` connections for `HANDLER_SECONDS`,
+    and the current and highest concurrency its handlers saw.
+    """
+    api = FastAPI()
+    pool = asyncio.Semaphore(POOL_SIZE)
+    in_flight: List[int] = [0, 0]
+
+    @api.get("/slow")
+    async def slow() -> dict[str, str]:
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        async with pool:
+            await asyncio.sleep(HANDLER_SECONDS)
+        in_flight[0] -= 1
+        return {"status": "ok"}
+
+    middleware = AdmissionMiddleware(
+        api, limits={READ: limit, WRITE: limit}, queue_size=queue_size, queue_seconds=queue_seconds, retry_after=2
+    )
+    return middleware, in_flight
+
+
+def client(middleware: AdmissionMiddleware) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test")
+
+
+class TestRouteClass:
+    def test_classes(self) -> None:
+        assert route_class("GET", "/drafts/1") == READ
+        assert route_class("HEAD", "/players") == READ
+        assert route_class("PUT", "/matches/1") == WRITE
+        assert route_class("POST", "/login") == AUTH
+        assert route_class("GET", "/users/me") == AUTH
+
+
+class TestConcurrencyLimiter:
+    async def test_queues_in_order_and_hands_slots_over(self) -> None:
+        limiter = ConcurrencyLimiter(max_limit=1, queue_size=2)
+        assert await limiter.acquire(1)
+
+        first = asyncio.create_task(limiter.acquire(1))
+        second = asyncio.create_task(limiter.acquire(1))
+        await asyncio.sleep(0)
+        assert not await limiter.acquire(1)  # queue full
+
+        limiter.release()
+        assert await first
+        assert not second.done()
+        limiter.release()
+        assert await second
+        assert limiter.in_flight == 1
+
+    async def test_times_out_without_taking_a_slot(self) -> None:
+        limiter = ConcurrencyLimiter(max_limit=1, queue_size=1)
+        await limiter.acquire(1)
+
+        assert not await limiter.acquire(0.01)
+
+        limiter.release()
+        assert limiter.in_flight == 0
+        assert not limiter.waiters
+
+    def test_adapts_to_pool_waits(self) -> None:
+        limiter = ConcurrencyLimiter(max_limit=8, queue_size=1)
+
+        for _ in range(20):
+            limiter.adapt(pool_wait=0.5, target=0.02)
+        assert limiter.capacity == 1
+
+        limiter.in_flight = 1
+        limiter.adapt(pool_wait=0.0, target=0.02)
+        assert limiter.capacity == 2
+        # No demand, no growth
+        limiter.in_flight = 0
+        limiter.adapt(pool_wait=0.0, target=0.02)
+        assert limiter.capacity == 2
+
+        limiter.in_flight = 100
+        for _ in range(20):
+            limiter.adapt(pool_wait=0.0, target=0.02)
+        assert limiter.capacity == 8
+
+
+class TestAdmissionMiddleware:
+    async def test_rejects_with_retry_after_once_the_queue_is_full(self) -> None:
+        middleware, in_flight = make_app(limit=2, queue_size=2)
+
+        async with client(middleware) as api:
+            responses = await asyncio.gather(*(api.get("/slow") for _ in range(10)))
+
+        statuses = sorted(response.status_code for response in responses)
+        assert statuses == [200] * 4 + [503] * 6
+        rejected = next(response for response in responses if response.status_code == 503)
+        assert rejected.headers["retry-after"] == "2"
+        assert in_flight[1] == 2
+
+    async def test_p99_stays_bounded_under_overload(self) -> None:
+        async def p99(middleware: AdmissionMiddleware, requests: int) -> tuple[float, List[int]]:
+            async def timed(api: httpx.AsyncClient) -> tuple[int, float]:
+                start = time.perf_counter()
+                response = await api.get("/slow")
+                return response.status_code, time.perf_counter() - start
+
+            async with client(middleware) as api:
+                results = await asyncio.gather(*(timed(api) for _ in range(requests)))
+            return percentile(sorted(latency for _, latency in results), 99), [status for status, _ in results]
+
+        # Unlimited, the last of 500 requests waits for 500 / POOL_SIZE handlers to run before it
+        unlimited, _ = await p99(make_app(limit=10_000, queue_size=0)[0], 500)
+        limited, statuses = await p99(make_app(limit=POOL_SIZE, queue_size=16, queue_seconds=0.1)[0], 500)
+
+        assert unlimited > 500 / POOL_SIZE * HANDLER_SECONDS
+        assert limited < unlimited / 2
+        assert statuses.count(200) >= POOL_SIZE
+        assert statuses.count(503) > 0
+
+    async def test_limits_shrink_while_the_pool_is_congested(self) -> None:
+        middleware, in_flight = make_app(limit=4, queue_size=100)
+        middleware.pool_wait = lambda: 1.0
+        middleware.adapt_seconds = 0
+
+        async with client(middleware) as api:
+            await asyncio.gather(*(api.get("/slow") for _ in range(4)))
+            in_flight[1] = 0
+            responses = await asyncio.gather(*(api.get("/slow") for _ in range(8)))
+
+        assert middleware.limiters[READ].capacity == 1
+        assert in_flight[1] == 1
+        assert all(response.status_code == 200 for response in responses)
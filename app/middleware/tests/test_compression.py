@@ -0,0 +1,96 @@
+import gzip
+import json
+from typing import AsyncIterator
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware, parse_accept_encoding
+
+PAYLOAD = json.dumps([{"id": i, "name": f"Player #{i}"} for i in range(200)]).encode()
+
+
+def make_client() -> tuple[TestClient, CompressionMiddleware]:
+    api = FastAPI()
+
+    @api.get("/big")
+    async def big() -> Response:
+        return Response(PAYLOAD, media_type="application/json", headers={"ETag": '"abc"'})
+
+    @api.get("/small")
+    async def small() -> Response:
+        return Response(b'{"id": 1}', media_type="application/json")
+
+    @api.get("/html")
+    async def html() -> Response:
+        return Response(PAYLOAD, media_type="text/html")
+
+    @api.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def rows() -> AsyncIterator[bytes]:
+            for i in range(100):
+                yield f"{i},Player #{i}\n".encode()
+
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    middleware = CompressionMiddleware(api, content_types=["application/json", "text/csv"])
+    return TestClient(middleware), middleware
+
+
+class TestParseAcceptEncoding:
+    def test_qualities(self) -> None:
+        assert parse_accept_encoding("gzip, br;q=0.5, *;q=0") == {"gzip": 1.0, "br": 0.5, "*": 0.0}
+
+    def test_empty(self) -> None:
+        assert parse_accept_encoding("") == {}
+
+
+class TestCompressionMiddleware:
+    def test_compresses_large_json(self) -> None:
+        client, _ = make_client()
+        response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"abc"'
+        assert int(response.headers["content-length"]) < len(PAYLOAD)
+        assert response.content == PAYLOAD
+
+    def test_skips_small_bodies_and_other_content_types(self) -> None:
+        client, _ = make_client()
+
+        assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+        assert "content-encoding" not in client.get("/html", headers={"Accept-Encoding": "gzip"}).headers
+
+    def test_skips_clients_without_support(self) -> None:
+        client, _ = make_client()
+        response = client.get("/big", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.content == PAYLOAD
+
+    def test_caches_compressed_bodies(self) -> None:
+        client, middleware = make_client()
+        for _ in range(3):
+            client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+        assert list(middleware.cache.values()) == [gzip.compress(PAYLOAD, compresslevel=6, mtime=0)]
+
+    def test_compresses_streams_without_caching(self) -> None:
+        client, middleware = make_client()
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text.splitlines()[-1] == "99,Player #99"
+        assert not middleware.cache
+
+    def test_prefers_brotli(self) -> None:
+        pytest.importorskip("brotli")
+        client, _ = make_client()
+        response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert response.content == PAYLOAD